@@ -6,19 +6,60 @@ from pymongo import MongoClient
 from pathlib import Path
 from dotenv import load_dotenv
 from flask_cors import CORS   # <- add this import
-from .predict import bp as predict_bp
 
 # Load .env if exists
 load_dotenv()
 
 jwt = JWTManager()
 
-def create_app():
+def connect_mongo(app):
+    """
+    Open this process's MongoClient and set app.mongo to its database. Pool
+    size, timeouts, compression and retries come from MONGO_* env vars
+    (app/mongo.py), with app.mongo_options overriding them; command durations
+    and pool check-out waits feed the /metrics endpoint.
+    """
+    from .metrics import mongo_event_listeners
+    from .mongo import client_options, describe
+    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/loansdb")
+    mongo_opts = client_options(getattr(app, "mongo_options", None))
+    client = MongoClient(MONGO_URI, event_listeners=mongo_event_listeners(), **mongo_opts)
+    print(f"[mongo] Client options: {describe(mongo_opts)} (pid {os.getpid()})")
+
+    app.mongo_client = client
+    default_db = client.get_default_database()
+    if default_db is not None:
+        app.mongo = default_db
+    else:
+        app.mongo = client["loansdb"]
+    return app.mongo
+
+
+def close_mongo(app):
+    """Close the app's MongoClient (a pre-fork master does this before forking)."""
+    client = getattr(app, "mongo_client", None)
+    if client is not None:
+        client.close()
+    app.mongo_client = None
+    app.mongo = None
+
+
+def init_mongo_workers(app):
+    """Attach the Mongo-backed background workers (started by server.start_background)."""
+    # Background scoring of loan applications (+ recovery of unscored ones)
+    from .scoring import init_scoring
+    init_scoring(app)
+
+    # Shadow scoring of a candidate model (ML_SHADOW_MODEL / ML_SHADOW_SAMPLE_PCT)
+    from .shadow import init_shadow
+    init_shadow(app)
+
+
+def create_app(start_background=True, mongo_options=None, prefork=False):
     app = Flask(__name__)
 
     # Load config from environment
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET", "change_me")
-    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/loansdb")
 
     # Enable CORS for API routes (dev). Adjust 'origins' to your frontend in production.
     # This allows the Authorization header and credentials.
@@ -32,28 +73,38 @@ def create_app():
     # Init JWT
     jwt.init_app(app)
 
-    # Connect to MongoDB
-    client = MongoClient(MONGO_URI)
+    # Per-request latency histograms + GET /metrics
+    from .metrics import init_metrics
+    init_metrics(app)
 
-    default_db = client.get_default_database()
-    if default_db is not None:
-        app.mongo = default_db
+    # MongoDB: indexes are ensured (and route plans checked) at startup. A
+    # pre-fork master (prefork=True, see wsgi.py) does this on a client it closes
+    # again, since a MongoClient is not fork-safe; each worker then opens its own
+    # client and attaches the scoring worker / shadow scorer in
+    # server.start_worker (gunicorn.conf.py's post_worker_init).
+    app.mongo_options = mongo_options
+    connect_mongo(app)
+
+    # Ensure the indexes declared in app/indexes.py exist, then explain() each
+    # route's query and warn on collection scans / in-memory sorts
+    from .indexes import init_indexes
+    init_indexes(app)
+
+    if prefork:
+        close_mongo(app)
     else:
-        app.mongo = client["loansdb"]
+        init_mongo_workers(app)
 
-    # Ensure indexes exist
-    try:
-        app.mongo.users.create_index("email", unique=True)
-        app.mongo.loan_applications.create_index("user_id")
-    except Exception as e:
-        print("Index warning:", e)
-
-    # Load ML Model
-    from .ml import load_model
-    try:
-        load_model()
-    except Exception as e:
-        print("ML load warning:", e)
+    # Password hashing pool + scoring/shadow threads, then the ML model loads and
+    # warms up on a background thread so startup is not blocked on it
+    # (/api/auth/ready turns 200 when it is done). A pre-forking server
+    # (gunicorn.conf.py / wsgi.py) does both itself: warmup in the master,
+    # Mongo client + background work in each worker after the fork.
+    app.ready = False
+    if start_background:
+        from .server import start_background as start_workers, warmup_async
+        start_workers(app)
+        warmup_async(app)
 
     # Register blueprints
     from .auth import auth_bp
@@ -1,34 +1,166 @@
 # backend/app/admin.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from bson import ObjectId
+import base64
+import csv
+import datetime
+import io
+import json
+import os
+import threading
+import time
+import zlib
+
+from .indexes import LIST_SORT
+from .shadow import drift_report
 
 admin_bp = Blueprint("admin", __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Only the fields the dashboard renders
+LIST_PROJECTION = {
+    "user_id": 1,
+    "full_name": 1,
+    "monthly_income": 1,
+    "loan_amount": 1,
+    "loan_purpose": 1,
+    "created_at": 1,
+    "ml_score": 1,
+    "ml_label": 1,
+    "model_version": 1,
+    "decision_status": 1
+}
+
+# Columns of the streaming export, in output order
+EXPORT_FIELDS = [
+    "id", "user_id", "full_name", "age", "employment_type", "monthly_income",
+    "loan_amount", "loan_purpose", "existing_debts", "credit_history_flag",
+    "credit_score", "marital_status", "location", "gender", "ml_score",
+    "ml_label", "model_version", "decision_status", "created_at"
+]
+EXPORT_BATCH_SIZE = 2000      # documents per getMore
+EXPORT_CHUNK_BYTES = 64 * 1024  # bytes buffered before each yield
+
+# Dashboard analytics cache (seconds). Per process and never invalidated: the
+# aggregates may lag any write (new applications, bulk ingest, background
+# scoring, decisions) by up to this long; responses carry generated_at.
+STATS_TTL_SECONDS = float(os.getenv("ADMIN_STATS_TTL", "30"))
+STATS_MAX_DAYS = 366
+SCORE_BUCKETS = [round(i / 10, 1) for i in range(10)] + [1.0000001]  # 10 bins over [0, 1]
+
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
 def _is_admin():
     claims = get_jwt()
     return claims and claims.get("role") == "admin"
 
+def _app_to_public(d):
+    return {
+        "id": str(d["_id"]),
+        "user_id": str(d.get("user_id")) if d.get("user_id") else None,
+        "full_name": d.get("full_name"),
+        "monthly_income": d.get("monthly_income"),
+        "loan_amount": d.get("loan_amount"),
+        "loan_purpose": d.get("loan_purpose"),
+        "created_at": d.get("created_at").isoformat() if d.get("created_at") else None,
+        "ml_score": d.get("ml_score"),
+        "ml_label": d.get("ml_label"),
+        "model_version": d.get("model_version"),
+        "decision_status": d.get("decision_status")
+    }
+
+def _encode_cursor(doc):
+    created = doc.get("created_at")
+    payload = {"t": created.isoformat() if created else None, "id": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def _decode_cursor(token):
+    payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+    created = datetime.datetime.fromisoformat(payload["t"]) if payload.get("t") else None
+    return created, ObjectId(payload["id"])
+
+def _parse_date(value):
+    d = datetime.datetime.fromisoformat(value)
+    if d.tzinfo is not None:
+        # created_at is stored as naive UTC
+        d = d.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return d
+
+def _list_filters(args):
+    """Mongo filter for the server-side filters of the listing (raises ValueError on bad input)."""
+    q = {}
+    status = args.get("status")
+    if status:
+        q["decision_status"] = status.upper()
+    if args.get("ml_label") not in (None, ""):
+        q["ml_label"] = int(args["ml_label"])
+
+    score = {}
+    if args.get("min_score") not in (None, ""):
+        score["$gte"] = float(args["min_score"])
+    if args.get("max_score") not in (None, ""):
+        score["$lte"] = float(args["max_score"])
+    if score:
+        q["ml_score"] = score
+
+    created = {}
+    if args.get("from"):
+        created["$gte"] = _parse_date(args["from"])
+    if args.get("to"):
+        created["$lt"] = _parse_date(args["to"])
+    if created:
+        q["created_at"] = created
+    return q
+
+def _after_cursor(created, oid):
+    """Documents strictly after (created, oid) in LIST_SORT order."""
+    if created is None:
+        # Already in the trailing block of documents without created_at
+        return {"created_at": None, "_id": {"$lt": oid}}
+    return {"$or": [
+        {"created_at": {"$lt": created}},
+        {"created_at": created, "_id": {"$lt": oid}},
+        {"created_at": None}
+    ]}
+
 @admin_bp.route("/loan/applications", methods=["GET"])
 @jwt_required()
 def list_applications():
     if not _is_admin():
         return jsonify({"msg":"forbidden"}), 403
-    docs = current_app.mongo.loan_applications.find().sort("created_at", -1)
-    out = []
-    for d in docs:
-        out.append({
-            "id": str(d["_id"]),
-            "user_id": str(d.get("user_id")) if d.get("user_id") else None,
-            "full_name": d.get("full_name"),
-            "monthly_income": d.get("monthly_income"),
-            "loan_amount": d.get("loan_amount"),
-            "created_at": d.get("created_at").isoformat() if d.get("created_at") else None,
-            "ml_score": d.get("ml_score"),
-            "ml_label": d.get("ml_label"),
-            "decision_status": d.get("decision_status")
-        })
-    return jsonify(out)
+
+    try:
+        limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+        query = _list_filters(request.args)
+    except (TypeError, ValueError):
+        return jsonify({"msg":"invalid filter"}), 400
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created, oid = _decode_cursor(cursor)
+        except Exception:
+            return jsonify({"msg":"invalid cursor"}), 400
+        query = {"$and": [query, _after_cursor(created, oid)]} if query else _after_cursor(created, oid)
+
+    # One extra document tells us whether there is a next page
+    docs = list(current_app.mongo.loan_applications
+                .find(query, LIST_PROJECTION)
+                .sort(LIST_SORT)
+                .limit(limit + 1))
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    return jsonify({
+        "items": [_app_to_public(d) for d in docs],
+        "next_cursor": _encode_cursor(docs[-1]) if has_more else None,
+        "limit": limit
+    })
 
 @admin_bp.route("/loan/applications/<string:app_id>/decision", methods=["PATCH"])
 @jwt_required()
@@ -53,3 +185,176 @@ def decide(app_id):
     if res.matched_count == 0:
         return jsonify({"msg":"not found"}), 404
     return jsonify({"msg":"updated", "id": app_id, "status": status})
+
+def _export_row(d):
+    row = {f: d.get(f) for f in EXPORT_FIELDS}
+    row["id"] = str(d["_id"])
+    row["user_id"] = str(d["user_id"]) if d.get("user_id") else None
+    row["created_at"] = d["created_at"].isoformat() if d.get("created_at") else None
+    return row
+
+def _ndjson_lines(docs):
+    dumps = json.JSONEncoder(default=str, separators=(",", ":")).encode
+    for d in docs:
+        yield dumps(_export_row(d)) + "\n"
+
+def _csv_lines(docs):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for d in docs:
+        row = _export_row(d)
+        writer.writerow(["" if row[f] is None else row[f] for f in EXPORT_FIELDS])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+def _chunked(lines, compress):
+    """Group lines into ~EXPORT_CHUNK_BYTES blocks, gzip-compressing on the fly if asked."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    parts, size = [], 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            data = "".join(parts).encode("utf-8")
+            parts, size = [], 0
+            if gz is not None:
+                data = gz.compress(data)
+                if not data:
+                    continue
+            yield data
+    data = "".join(parts).encode("utf-8")
+    if gz is not None:
+        data = gz.compress(data) + gz.flush()
+    if data:
+        yield data
+
+@admin_bp.route("/loan/applications/export", methods=["GET"])
+@jwt_required()
+def export_applications():
+    """Stream every matching application as NDJSON (default) or CSV, optionally gzipped."""
+    if not _is_admin():
+        return jsonify({"msg":"forbidden"}), 403
+
+    fmt = (request.args.get("format") or "ndjson").lower()
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"msg":"format must be ndjson or csv"}), 400
+    compress = request.args.get("gzip", "").lower() in ("1", "true", "yes")
+    try:
+        query = _list_filters(request.args)
+    except (TypeError, ValueError):
+        return jsonify({"msg":"invalid filter"}), 400
+
+    projection = {f: 1 for f in EXPORT_FIELDS if f != "id"}
+    docs = (current_app.mongo.loan_applications
+            .find(query, projection)
+            .sort(LIST_SORT)
+            .batch_size(EXPORT_BATCH_SIZE))
+
+    lines = _ndjson_lines(docs) if fmt == "ndjson" else _csv_lines(docs)
+    filename = "loan_applications." + fmt + (".gz" if compress else "")
+    if compress:
+        mimetype = "application/gzip"
+    else:
+        mimetype = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+
+    return Response(
+        _chunked(lines, compress),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# -----------------------
+# Dashboard analytics
+# -----------------------
+def _stats_pipeline(since):
+    return [{"$facet": {
+        "total": [{"$count": "n"}],
+        "by_status": [{"$group": {"_id": "$decision_status", "count": {"$sum": 1}}}],
+        "by_label": [{"$group": {"_id": "$ml_label", "count": {"$sum": 1}}}],
+        "score_histogram": [
+            {"$match": {"ml_score": {"$gte": 0, "$lte": 1}}},
+            {"$bucket": {"groupBy": "$ml_score", "boundaries": SCORE_BUCKETS,
+                         "output": {"count": {"$sum": 1}}}}
+        ],
+        "daily": [
+            {"$match": {"created_at": {"$gte": since}}},
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                        "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}}
+        ]
+    }}]
+
+def _compute_stats(days):
+    since = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) \
+        - datetime.timedelta(days=days - 1)
+    facets = next(current_app.mongo.loan_applications.aggregate(_stats_pipeline(since)), {})
+
+    by_status = {str(r["_id"]): r["count"] for r in facets.get("by_status", [])}
+    approved = by_status.get("APPROVED", 0)
+    rejected = by_status.get("REJECTED", 0)
+    hist = {r["_id"]: r["count"] for r in facets.get("score_histogram", [])}
+    total = facets.get("total") or [{"n": 0}]
+
+    return {
+        "total": total[0]["n"],
+        "by_status": by_status,
+        "by_ml_label": {str(r["_id"]): r["count"] for r in facets.get("by_label", [])},
+        "approval_rate": (approved / (approved + rejected)) if (approved + rejected) else None,
+        "score_histogram": [
+            {"min": lo, "max": min(hi, 1.0), "count": hist.get(lo, 0)}
+            for lo, hi in zip(SCORE_BUCKETS[:-1], SCORE_BUCKETS[1:])
+        ],
+        "daily": [{"date": r["_id"], "count": r["count"]} for r in facets.get("daily", [])],
+        "days": days,
+        "generated_at": datetime.datetime.utcnow().isoformat()
+    }
+
+@admin_bp.route("/loan/stats", methods=["GET"])
+@jwt_required()
+def loan_stats():
+    """
+    Counts, approval rate, score histogram and daily volume from one aggregation.
+    Cached per worker for STATS_TTL_SECONDS, so up to that stale after any write.
+    """
+    if not _is_admin():
+        return jsonify({"msg":"forbidden"}), 403
+    try:
+        days = max(1, min(int(request.args.get("days", 30)), STATS_MAX_DAYS))
+    except ValueError:
+        return jsonify({"msg":"invalid days"}), 400
+
+    now = time.monotonic()
+    with _stats_lock:
+        hit = _stats_cache.get(days)
+    if hit is not None and now - hit[0] < STATS_TTL_SECONDS:
+        return jsonify(hit[1])
+
+    stats = _compute_stats(days)
+    with _stats_lock:
+        _stats_cache[days] = (now, stats)
+    return jsonify(stats)
+
+# -----------------------
+# Candidate model (shadow scoring)
+# -----------------------
+@admin_bp.route("/model/shadow", methods=["GET"])
+@jwt_required()
+def shadow_report():
+    """Agreement rate and score drift of the shadow candidate against production."""
+    if not _is_admin():
+        return jsonify({"msg":"forbidden"}), 403
+    try:
+        since = _parse_date(request.args["since"]) if request.args.get("since") else None
+    except ValueError:
+        return jsonify({"msg":"invalid since"}), 400
+
+    shadow = getattr(current_app, "shadow", None)
+    live = shadow.stats() if shadow is not None else None
+    version = request.args.get("candidate_version") or (live or {}).get("candidate_version")
+
+    report = drift_report(current_app.mongo.shadow_scores, version, since)
+    report["live"] = live
+    return jsonify(report)
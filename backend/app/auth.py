@@ -1,11 +1,11 @@
 # backend/app/auth.py
 from flask import Blueprint, request, jsonify, current_app, redirect
-from werkzeug.security import generate_password_hash, check_password_hash
+from .passwords import (hash_password, hash_password_async, verify_password,
+                        needs_rehash, PasswordHasherBusy)
 from flask_jwt_extended import create_access_token
 from bson import ObjectId
 import datetime
 import os
-import requests
 from urllib.parse import urlencode
 
 auth_bp = Blueprint("auth", __name__)
@@ -20,6 +20,28 @@ def _user_to_public(user_doc):
         "created_at": user_doc.get("created_at").isoformat() if user_doc.get("created_at") else None
     }
 
+def _busy():
+    resp = jsonify({"msg":"server busy, retry shortly"})
+    resp.headers["Retry-After"] = "1"
+    return resp, 503
+
+def _rehash_in_background(users, user_id, old_hash, password):
+    """Upgrade a hash made with outdated cost parameters without delaying the login response."""
+    try:
+        fut = hash_password_async(password)
+    except PasswordHasherBusy:
+        return  # try again on a later login
+
+    def _store(f):
+        try:
+            # only replace the hash we verified, in case the password changed meanwhile
+            users.update_one({"_id": user_id, "password_hash": old_hash},
+                             {"$set": {"password_hash": f.result()}})
+        except Exception as e:
+            print("Password rehash failed:", e)
+
+    fut.add_done_callback(_store)
+
 # -----------------------
 # Health Check
 # -----------------------
@@ -34,6 +56,18 @@ def health():
         print(f"Health check failed: {e}")
         return jsonify({"status": "error", "service": "auth", "error": str(e)}), 503
 
+@auth_bp.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe: 503 until the model is warmed up (server.warmup) and MongoDB answers"""
+    if not getattr(current_app, "ready", False):
+        return jsonify({"status": "warming_up", "service": "auth"}), 503
+    try:
+        current_app.mongo.command('ping')
+        return jsonify({"status": "ready", "service": "auth"}), 200
+    except Exception as e:
+        print(f"Readiness check failed: {e}")
+        return jsonify({"status": "error", "service": "auth", "error": str(e)}), 503
+
 # -----------------------
 # Email/password flows
 # -----------------------
@@ -50,7 +84,10 @@ def register():
     if users.find_one({"email": email}):
         return jsonify({"msg":"email exists"}), 400
 
-    pw_hash = generate_password_hash(password)
+    try:
+        pw_hash = hash_password(password)
+    except PasswordHasherBusy:
+        return _busy()
     user = {
         "name": name,
         "email": email,
@@ -77,9 +114,17 @@ def login():
 
     users = current_app.mongo.users
     user = users.find_one({"email": email})
-    if not user or not user.get("password_hash") or not check_password_hash(user.get("password_hash"), password):
+    stored = user.get("password_hash") if user else None
+    try:
+        ok = bool(stored) and verify_password(stored, password)
+    except PasswordHasherBusy:
+        return _busy()
+    if not ok:
         return jsonify({"msg":"invalid credentials"}), 401
 
+    if needs_rehash(stored):
+        _rehash_in_background(users, user["_id"], stored, password)
+
     identity_str = str(user["_id"])
     token = create_access_token(identity=identity_str, additional_claims={"role": user.get("role", "user")})
 
@@ -136,6 +181,7 @@ def google_callback():
     }
 
     try:
+        import requests  # only the Google callback needs it; keep it off the import path
         token_resp = requests.post(token_endpoint, data=data, timeout=10)
         token_resp.raise_for_status()
     except Exception as e:
@@ -0,0 +1,179 @@
+# backend/app/batcher.py
+#
+# Micro-batching scheduler for single-row predictions.
+# Concurrent callers put one row each on a queue; a background thread collects
+# rows for up to PREDICT_BATCH_WINDOW_MS (or PREDICT_BATCH_MAX_SIZE rows),
+# scores them with one predict_many call and hands every caller its own result.
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from .ml import predict_many, predict_default
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+MICROBATCH_ENABLED = os.getenv("PREDICT_MICROBATCH", "1").lower() in ("1", "true", "yes")
+BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+RESULT_TIMEOUT = float(os.getenv("PREDICT_RESULT_TIMEOUT", "30"))
+
+
+def _check_count(results, expected):
+    if len(results) != expected:
+        raise ValueError(f"score_fn returned {len(results)} results for {expected} rows")
+
+
+class MicroBatcher:
+    """Collects single-row requests and scores them together."""
+
+    def __init__(self, score_fn, window_ms=BATCH_WINDOW_MS, max_size=BATCH_MAX_SIZE):
+        self.score_fn = score_fn
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_size = max(int(max_size), 1)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch = 0
+        self._size_hist = {}
+        self._errors = 0
+
+    # ------------------------------------------------------------------
+    # Caller side
+    # ------------------------------------------------------------------
+
+    def submit(self, row):
+        """Queue one row; returns a Future resolving to its prediction dict."""
+        self._ensure_started()
+        fut = Future()
+        self._queue.put((row, fut))
+        return fut
+
+    def predict(self, row, timeout=RESULT_TIMEOUT):
+        return self.submit(row).result(timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                t = threading.Thread(target=self._run, name="ml-microbatcher", daemon=True)
+                t.start()
+                self._thread = t
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # Window closed — still take whatever is already queued
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                print("[batcher] Unexpected error:", type(e).__name__, e)
+            finally:
+                # A caller must never wait out RESULT_TIMEOUT on a row this batch dropped
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(RuntimeError("micro-batch ended without a result for this row"))
+
+    def _score_batch(self, batch):
+        try:
+            results = list(self.score_fn([r for r, _ in batch]))
+            _check_count(results, len(batch))
+        except Exception as e:
+            print("[batcher] Batch predict error:", type(e).__name__, e)
+            with self._stats_lock:
+                self._errors += 1
+            # One bad row must not fail its neighbours: retry row by row
+            self._score_individually(batch, e)
+            return
+
+        self._record(len(batch))
+        for (_, fut), res in zip(batch, results):
+            fut.set_result(res)
+
+    def _score_individually(self, batch, error):
+        if len(batch) == 1:
+            batch[0][1].set_exception(error)
+            return
+        for row, fut in batch:
+            try:
+                results = list(self.score_fn([row]))
+                _check_count(results, 1)
+                fut.set_result(results[0])
+            except Exception as e:
+                fut.set_exception(e)
+
+    def _record(self, size):
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += size
+            self._max_batch = max(self._max_batch, size)
+            self._size_hist[size] = self._size_hist.get(size, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "rows": self._rows,
+                "errors": self._errors,
+                "avg_batch_size": (self._rows / self._batches) if self._batches else 0.0,
+                "max_batch_size": self._max_batch,
+                "batch_size_histogram": dict(sorted(self._size_hist.items())),
+                "window_ms": self.window * 1000.0,
+                "max_size": self.max_size,
+            }
+
+
+# ----------------------------------------------------------------------
+# PUBLIC: process-wide scheduler
+# ----------------------------------------------------------------------
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(predict_many)
+    return _batcher
+
+
+def score_one(features: dict):
+    """Score one applicant, through the micro-batcher when it is enabled."""
+    if not MICROBATCH_ENABLED:
+        return predict_default(features)
+    return get_batcher().predict(features)
@@ -0,0 +1,172 @@
+# backend/app/features.py
+#
+# Engineered model inputs, shared by training and serving.
+#
+# train/data.py adds these columns to every CSV chunk before caching it, and
+# app/ml.py derives them from the request's raw columns before scoring, so a
+# request carrying LoanAmount / Income / CreditScore / ... gets the same
+# loan_to_income, credit_bin, ... the model was trained on instead of column
+# defaults. NumPy only (no pandas): importing it costs nothing at startup.
+#
+#   derive_columns(columns, n)   column-wise batch: {name -> array-like of n values}
+#   derive_row(row)              one dict of scalars (same results, no arrays)
+#
+# Ratios are computed in float32, the dtype of the training cache, so both
+# paths produce bit-identical values; benchmarks/bench_features.py checks it.
+
+import numpy as np
+
+CREDIT_BINS = [0, 580, 670, 740, 800, 1000]
+CREDIT_LABELS = ['poor', 'fair', 'good', 'very_good', 'excellent']
+# first column present wins; HasDependents comes first, as in the original training script
+COSIGNER_COLUMNS = ['HasDependents', 'HasCoSigner', 'HasCosigner', 'Has_Cosigner']
+EMPLOYMENT_COLUMNS = ['EmploymentType', 'EmploymentStatus', 'Employment']
+TRUE_FLAGS = frozenset(['1', 'yes', 'true', 'y'])
+
+_BINS = np.asarray(CREDIT_BINS, dtype=np.float32)
+_LABELS = np.asarray(CREDIT_LABELS + [None], dtype=object)  # index 5 = out of range / missing
+
+
+def _first(names, available):
+    return next((c for c in names if c in available), None)
+
+
+def sources(available):
+    """
+    {derived column -> input columns} for the derived columns computable from
+    the column names in `available`.
+    """
+    out = {}
+    if 'LoanAmount' in available and 'Income' in available:
+        out['loan_to_income'] = ('LoanAmount', 'Income')
+    if 'MonthlyDebt' in available and 'Income' in available:
+        out['dti'] = ('MonthlyDebt', 'Income')
+    if 'CreditScore' in available:
+        out['credit_bin'] = ('CreditScore',)
+    cosigner = _first(COSIGNER_COLUMNS, available)
+    if cosigner:
+        out['has_cosigner_flag'] = (cosigner,)
+    employment = _first(EMPLOYMENT_COLUMNS, available)
+    if employment:
+        out['is_salaried'] = (employment,)
+    return out
+
+
+# ----------------------------------------------------------------------
+# BATCH
+# ----------------------------------------------------------------------
+
+def _float32(values):
+    try:
+        return np.asarray(values, dtype=np.float32)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float32)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _ratio(num, den):
+    """num / den in float32; 0 where den is 0 or either side is missing."""
+    num, den = _float32(num), _float32(den)
+    out = np.zeros(len(num), dtype=np.float32)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(num) & ~np.isnan(den))
+    return out
+
+
+def credit_bins(scores):
+    """Object array of CREDIT_LABELS for right-closed CREDIT_BINS intervals; None outside (0, 1000] / missing."""
+    x = _float32(scores)
+    idx = np.searchsorted(_BINS, x, side='left')  # NaN sorts last -> 6
+    idx[(idx < 1) | (idx > len(CREDIT_LABELS))] = len(CREDIT_LABELS) + 1
+    return _LABELS[idx - 1]
+
+
+def _string_flags(values, test):
+    """int8 test(str(v).lower()) per value, evaluated once per distinct value."""
+    memo = {}
+
+    def flag(v):
+        try:
+            return memo[v]
+        except KeyError:
+            hit = memo[v] = test(str(v).lower())
+            return hit
+        except TypeError:  # unhashable
+            return test(str(v).lower())
+    return np.fromiter(map(flag, values), dtype=np.int8, count=len(values))
+
+
+def _is_true_flag(s):
+    return s in TRUE_FLAGS
+
+
+def _is_salaried(s):
+    return 'salar' in s
+
+
+def derive_columns(columns, n=None, only=None):
+    """
+    Derived columns for a batch. `columns` maps input column -> n values
+    (list, ndarray or pandas Series); returns {name -> ndarray}: float32 ratios,
+    object credit_bin labels (None = missing) and int8 flags. `only` limits
+    the output to those derived columns.
+    """
+    out = {}
+    for name, inputs in sources(columns).items():
+        if only is not None and name not in only:
+            continue
+        if name in ('loan_to_income', 'dti'):
+            out[name] = _ratio(columns[inputs[0]], columns[inputs[1]])
+        elif name == 'credit_bin':
+            out[name] = credit_bins(columns[inputs[0]])
+        elif name == 'has_cosigner_flag':
+            out[name] = _string_flags(columns[inputs[0]], _is_true_flag)
+        else:
+            out[name] = _string_flags(columns[inputs[0]], _is_salaried)
+    return out
+
+
+# ----------------------------------------------------------------------
+# ROW
+# ----------------------------------------------------------------------
+
+def _scalar_float32(v):
+    try:
+        return np.float32(float(v))
+    except (TypeError, ValueError):
+        return np.float32(np.nan)
+
+
+def _scalar_ratio(num, den):
+    num, den = _scalar_float32(num), _scalar_float32(den)
+    if den == 0 or num != num or den != den:
+        return np.float32(0)
+    return num / den
+
+
+def _scalar_credit_bin(score):
+    x = _scalar_float32(score)
+    if not (_BINS[0] < x <= _BINS[-1]):  # also False for NaN
+        return None
+    return CREDIT_LABELS[int(np.searchsorted(_BINS, x, side='left')) - 1]
+
+
+def derive_row(row, only=None):
+    """derive_columns() for one row dict of scalars; returns {name -> scalar}."""
+    out = {}
+    for name, inputs in sources(row).items():
+        if only is not None and name not in only:
+            continue
+        if name in ('loan_to_income', 'dti'):
+            out[name] = _scalar_ratio(row[inputs[0]], row[inputs[1]])
+        elif name == 'credit_bin':
+            out[name] = _scalar_credit_bin(row[inputs[0]])
+        elif name == 'has_cosigner_flag':
+            out[name] = np.int8(_is_true_flag(str(row[inputs[0]]).lower()))
+        else:
+            out[name] = np.int8(_is_salaried(str(row[inputs[0]]).lower()))
+    return out
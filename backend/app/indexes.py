@@ -0,0 +1,181 @@
+# backend/app/indexes.py
+#
+# Declarative index specification for every collection the app queries,
+# plus a startup advisor that explain()s each route's query shape and warns
+# when the winning plan scans the collection or sorts in memory.
+
+import logging
+import os
+
+from pymongo import ASCENDING, DESCENDING
+
+
+# ----------------------------------------------------------------------
+# SORT ORDERS (shared with the routes, so the advisor explains what they run)
+# ----------------------------------------------------------------------
+
+# GET /api/loan/applications/my
+MY_APPLICATIONS_SORT = [("created_at", DESCENDING)]
+
+# GET /api/admin/loan/applications and /export: keyset order, _id breaks ties
+LIST_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+# ----------------------------------------------------------------------
+# INDEXES
+# ----------------------------------------------------------------------
+
+# collection -> [(keys, options)]
+INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"unique": True}),
+    ],
+    "loan_applications": [
+        # a user's applications, newest first (also serves plain user_id lookups)
+        ([("user_id", ASCENDING), ("created_at", DESCENDING)], {}),
+        # admin listing / export keyset pagination
+        ([("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        # admin listing filtered by status, same order
+        ([("decision_status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    ],
+    "shadow_scores": [
+        # shadow-scoring drift report
+        ([("candidate_version", ASCENDING), ("created_at", DESCENDING)], {}),
+    ],
+}
+
+# Indexes made redundant by a compound index above (same leading key). Startup
+# only reports them; drop_superseded_indexes.py removes them, as a one-off.
+SUPERSEDED = {
+    "loan_applications": ["user_id_1"],
+}
+
+
+def ensure_indexes(db):
+    """Create every index in INDEXES (no-op for existing ones) and report superseded ones."""
+    for coll_name, specs in INDEXES.items():
+        coll = db[coll_name]
+        for keys, options in specs:
+            try:
+                coll.create_index(keys, **options)
+            except Exception as e:
+                print(f"Index warning ({coll_name} {keys}):", e)
+    for coll_name, name in superseded_indexes(db):
+        print(f"[indexes] {coll_name}.{name} is superseded by a compound index; "
+              f"drop it with `python drop_superseded_indexes.py`")
+
+
+def superseded_indexes(db):
+    """[(collection, index name)] for the SUPERSEDED indexes that still exist."""
+    found = []
+    for coll_name, names in SUPERSEDED.items():
+        try:
+            existing = db[coll_name].index_information()
+        except Exception as e:
+            print(f"Index warning ({coll_name}):", e)
+            continue
+        found.extend((coll_name, name) for name in names if name in existing)
+    return found
+
+
+def drop_superseded_indexes(db):
+    """Drop every SUPERSEDED index that still exists; returns the dropped (collection, name) pairs."""
+    dropped = []
+    for coll_name, name in superseded_indexes(db):
+        db[coll_name].drop_index(name)
+        print(f"[indexes] Dropped superseded index {coll_name}.{name}")
+        dropped.append((coll_name, name))
+    return dropped
+
+
+# ----------------------------------------------------------------------
+# ADVISOR
+# ----------------------------------------------------------------------
+
+INDEX_ADVISOR_ENABLED = os.getenv("MONGO_INDEX_ADVISOR", "1").lower() in ("1", "true", "yes")
+
+# Stages that mean the index did not cover the query: a full scan, or a
+# blocking sort of the matched documents in memory
+BAD_STAGES = {"COLLSCAN": "collection scan", "SORT": "in-memory sort"}
+
+
+def route_queries():
+    """(route, collection, filter, sort, limit) for the query shapes the routes run."""
+    from bson import ObjectId
+    import datetime
+
+    from .admin import DEFAULT_PAGE_SIZE
+
+    some_user = ObjectId()
+    some_time = datetime.datetime(2000, 1, 1)
+    # the admin listing fetches one row past the page to tell whether there is a next one
+    page = DEFAULT_PAGE_SIZE + 1
+    return [
+        ("GET /api/loan/applications/my", "loan_applications",
+         {"user_id": some_user}, MY_APPLICATIONS_SORT, 0),
+        ("GET /api/admin/loan/applications", "loan_applications",
+         {}, LIST_SORT, page),
+        ("GET /api/admin/loan/applications?cursor=", "loan_applications",
+         {"$or": [{"created_at": {"$lt": some_time}},
+                  {"created_at": some_time, "_id": {"$lt": some_user}},
+                  {"created_at": None}]}, LIST_SORT, page),
+        ("GET /api/admin/loan/applications?status=", "loan_applications",
+         {"decision_status": "PENDING"}, LIST_SORT, page),
+        ("GET /api/admin/loan/applications/export", "loan_applications",
+         {}, LIST_SORT, 0),
+    ]
+
+
+def plan_stages(plan):
+    """Every stage name in an explain() plan tree (classic or SBE layout)."""
+    stages = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        for key in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+            if key in node:
+                stack.append(node[key])
+        stack.extend(node.get("inputStages", []))
+    return stages
+
+
+def advise(db, queries=None, logger=None):
+    """
+    explain() each route query and log a warning (to `logger`, the app's
+    logger from init_indexes) for every COLLSCAN or in-memory SORT in its
+    winning plan. Returns {route: [problems]}.
+    """
+    logger = logger or logging.getLogger(__name__)
+    problems = {}
+    for route, coll_name, query, sort, limit in (queries or route_queries()):
+        try:
+            cursor = db[coll_name].find(query).sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
+            plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        except Exception as e:
+            # e.g. mongomock has no explain(); nothing to advise on
+            logger.warning("[indexes] Could not explain %s: %s: %s", route, type(e).__name__, e)
+            return problems
+        found = [BAD_STAGES[s] for s in plan_stages(plan) if s in BAD_STAGES]
+        if found:
+            problems[route] = found
+            logger.warning("[indexes] WARNING %s: %s on %s (filter keys %s, sort %s); "
+                           "check INDEXES in app/indexes.py",
+                           route, ", ".join(found), coll_name, sorted(query), sort)
+    return problems
+
+
+def init_indexes(app):
+    """Ensure the declared indexes, then (MONGO_INDEX_ADVISOR=1) check the route plans."""
+    try:
+        ensure_indexes(app.mongo)
+    except Exception as e:
+        print("Index warning:", e)
+        return
+    if INDEX_ADVISOR_ENABLED:
+        advise(app.mongo, logger=app.logger)
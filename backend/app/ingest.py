@@ -0,0 +1,281 @@
+# backend/app/ingest.py
+#
+# Bulk ingestion of loan applications from partner files (CSV or NDJSON).
+#
+# Rows are validated with the same coercions as POST /api/loan/applications
+# (application_doc below is shared with it), scored a chunk at a time with one
+# predict_many call, and written with unordered insert_many, so one bad row or
+# duplicate never stops the rest. The file is streamed: memory holds one chunk,
+# however big the upload. Used by POST /api/loan/applications/bulk and by
+# ingest_applications.py.
+#
+# A file that cannot be read to the end (bad UTF-8 or gzip, a broken CSV
+# record, the client hanging up) stops the ingest at that row: the chunks
+# before it stay committed, and the report says where parsing stopped.
+
+import codecs
+import csv
+import datetime
+import gzip
+import json
+import os
+import time
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from .ml import predict_many
+from .scoring import application_features
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+# Row errors listed in the report; the counts always cover every row
+INGEST_MAX_REPORTED_ERRORS = int(os.getenv("INGEST_MAX_REPORTED_ERRORS", "1000"))
+
+FORMATS = ("csv", "ndjson")
+
+
+# ----------------------------------------------------------------------
+# VALIDATION (shared with create_application)
+# ----------------------------------------------------------------------
+
+def _text(v):
+    if isinstance(v, str):
+        v = v.strip()
+        return v or None
+    return v
+
+
+def _bool(v):
+    # CSV cells arrive as text, and bool("false") is True
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "yes", "y", "t")
+    return bool(v)
+
+
+def _score(v):
+    if isinstance(v, str):
+        v = v.strip()
+        return float(v) if v else None
+    return v
+
+
+def _coerce(data, field, fn, default=None):
+    value = data.get(field, default)
+    try:
+        return fn(_text(value) if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid {field}: {value!r}")
+
+
+def application_doc(data, user_obj_id, created_at=None):
+    """
+    Loan application document for a request body / file row.
+    Raises ValueError naming the field when a value cannot be coerced.
+    """
+    return {
+        "user_id": user_obj_id,
+        "full_name": _text(data.get("full_name")),
+        "age": _coerce(data, "age", lambda v: int(v or 0)),
+        "employment_type": _text(data.get("employment_type")),
+        "monthly_income": _coerce(data, "monthly_income", lambda v: float(v or 0)),
+        "loan_amount": _coerce(data, "loan_amount", lambda v: float(v or 0)),
+        "loan_purpose": _text(data.get("loan_purpose")),
+        "existing_debts": _coerce(data, "existing_debts", lambda v: float(v or 0)),
+        "credit_history_flag": _bool(data.get("credit_history_flag", False)),
+        "credit_score": _coerce(data, "credit_score", _score),
+        "marital_status": _text(data.get("marital_status")),
+        "location": _text(data.get("location")),
+        "gender": _text(data.get("gender")),
+        "ml_score": None,
+        "ml_label": None,
+        "model_version": None,
+        "decision_status": "PENDING",
+        "created_at": created_at or datetime.datetime.utcnow()
+    }
+
+
+# ----------------------------------------------------------------------
+# READERS
+# ----------------------------------------------------------------------
+
+def detect_format(name, content_type=None):
+    """csv / ndjson from a file name or Content-Type, else None."""
+    ct = (content_type or "").lower()
+    name = (name or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if "csv" in ct or name.endswith(".csv"):
+        return "csv"
+    if "ndjson" in ct or "jsonl" in ct or name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return None
+
+
+def open_text(stream, gzipped=False):
+    """Text reader over a binary stream (optionally gzip-compressed)."""
+    if gzipped:
+        stream = gzip.GzipFile(fileobj=stream)
+    return codecs.getreader("utf-8-sig")(stream)
+
+
+def read_rows(text, fmt):
+    """Yield (row number, dict) or (row number, ValueError) from a text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for n, row in enumerate(reader, start=1):
+            if None in row:
+                yield n, ValueError("more cells than header columns")
+            else:
+                yield n, row
+        return
+
+    n = 0
+    for line in text:
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield n, ValueError(f"invalid JSON: {e}")
+            continue
+        yield n, row if isinstance(row, dict) else ValueError("row is not an object")
+
+
+# ----------------------------------------------------------------------
+# INGEST
+# ----------------------------------------------------------------------
+
+class IngestReport:
+    def __init__(self, max_errors=INGEST_MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.received = 0
+        self.inserted = 0
+        self.scored = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.unscored = 0  # inserted without a score (chunk scoring failed, or score=False)
+        self.stopped_at_row = None  # row where reading the file failed
+        self.stop_error = None
+
+    def error(self, row, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+
+    def stop(self, row, message):
+        self.stopped_at_row = row
+        self.stop_error = message
+
+    def to_dict(self):
+        seconds = time.perf_counter() - self.started
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "scored": self.scored,
+            "unscored": self.unscored,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "seconds": round(seconds, 3),
+            "rows_per_minute": round(self.received / seconds * 60) if seconds > 0 else None,
+            "stopped_at_row": self.stopped_at_row,
+            "stop_error": self.stop_error,
+        }
+
+
+def _row_owner(row, default_user, allow_row_user):
+    raw = row.get("user_id") if allow_row_user else None
+    if raw in (None, ""):
+        if default_user is None:
+            raise ValueError("missing user_id")
+        return default_user
+    try:
+        return ObjectId(raw)
+    except Exception:
+        raise ValueError(f"invalid user_id: {raw!r}")
+
+
+def _write_chunk(collection, chunk, report, score, on_unscored):
+    """
+    Score and insert one chunk of (row number, doc). Inserted rows the chunk
+    scorer failed on go to on_unscored(_id, features) as soon as the chunk is
+    written, so no list of them builds up over the upload.
+    """
+    docs = [doc for _, doc in chunk]
+    if score:
+        try:
+            results = predict_many([application_features(d) for d in docs])
+            for doc, res in zip(docs, results):
+                doc["ml_score"] = res["default_probability"]
+                doc["ml_label"] = res["predicted_label"]
+                doc["model_version"] = res.get("model_version")
+            report.scored += len(docs)
+        except Exception as e:
+            # Inserted unscored; the scoring worker (or its recovery sweep) scores them later
+            print("Bulk ingest scoring error:", type(e).__name__, e)
+
+    failed_idx = set()
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for err in e.details.get("writeErrors", []):
+            failed_idx.add(err["index"])
+            report.error(chunk[err["index"]][0], err.get("errmsg", "write error"))
+    report.inserted += len(docs) - len(failed_idx)
+    if failed_idx and score:
+        report.scored -= sum(1 for i in failed_idx if docs[i]["ml_score"] is not None)
+    for i, d in enumerate(docs):
+        if i in failed_idx or d["ml_score"] is not None:
+            continue
+        report.unscored += 1
+        # score=False rows are left to the scoring worker's recovery sweep
+        if score and on_unscored is not None:
+            on_unscored(d["_id"], application_features(d))
+
+
+def ingest_rows(collection, rows, default_user=None, allow_row_user=False,
+                chunk_size=INGEST_CHUNK_SIZE, score=True, report=None, on_unscored=None):
+    """
+    Validate, score and insert (row number, dict | ValueError) pairs from
+    read_rows(). Rows take default_user as owner, or their own user_id column
+    when allow_row_user is set. on_unscored(_id, features) receives rows whose
+    chunk could not be scored. A read error ends the ingest after writing the
+    rows before it (report.stopped_at_row). Returns the IngestReport.
+    """
+    report = report or IngestReport()
+    created_at = datetime.datetime.utcnow()
+    chunk = []
+    rows = iter(rows)
+    last = 0
+    while True:
+        try:
+            n, row = next(rows)
+        except StopIteration:
+            break
+        except (OSError, EOFError, UnicodeDecodeError, csv.Error) as e:
+            report.stop(last + 1, f"could not read upload: {e}")
+            break
+        last = n
+        report.received += 1
+        if isinstance(row, Exception):
+            report.error(n, str(row))
+            continue
+        try:
+            doc = application_doc(row, _row_owner(row, default_user, allow_row_user), created_at)
+        except ValueError as e:
+            report.error(n, str(e))
+            continue
+        chunk.append((n, doc))
+        if len(chunk) >= chunk_size:
+            _write_chunk(collection, chunk, report, score, on_unscored)
+            chunk = []
+    if chunk:
+        _write_chunk(collection, chunk, report, score, on_unscored)
+    return report
@@ -1,9 +1,12 @@
 # backend/app/loan.py
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from bson import ObjectId
-import datetime
-from .ml import predict_default
+import time
+from .batcher import score_one
+from .ingest import FORMATS, application_doc, detect_format, ingest_rows, open_text, read_rows
+from .indexes import MY_APPLICATIONS_SORT
+from .scoring import application_features
 
 loan_bp = Blueprint("loan", __name__)
 
@@ -21,57 +24,70 @@ def create_application():
 
     data = request.get_json() or {}
 
-    app_doc = {
-        "user_id": user_obj_id,
-        "full_name": data.get("full_name"),
-        "age": int(data.get("age") or 0),
-        "employment_type": data.get("employment_type"),
-        "monthly_income": float(data.get("monthly_income") or 0),
-        "loan_amount": float(data.get("loan_amount") or 0),
-        "loan_purpose": data.get("loan_purpose"),
-        "existing_debts": float(data.get("existing_debts") or 0),
-        "credit_history_flag": bool(data.get("credit_history_flag", False)),
-        "credit_score": data.get("credit_score"),
-        "marital_status": data.get("marital_status"),
-        "location": data.get("location"),
-        "gender": data.get("gender"),
-        "ml_score": None,
-        "ml_label": None,
-        "decision_status": "PENDING",
-        "created_at": datetime.datetime.utcnow()
-    }
+    try:
+        app_doc = application_doc(data, user_obj_id)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    # Score inline when it is fast so the document is written once with its score;
+    # otherwise the background worker scores it and bulk-updates the document.
+    features = application_features(app_doc)
+    scoring = current_app.scoring
+    if scoring.should_score_inline():
+        try:
+            t0 = time.perf_counter()
+            mlres = score_one(features)
+            scoring.observe_latency(time.perf_counter() - t0)
+            app_doc["ml_score"] = mlres["default_probability"]
+            app_doc["ml_label"] = mlres["predicted_label"]
+            app_doc["model_version"] = mlres.get("model_version")
+        except Exception as e:
+            print("ML prediction error:", e)
 
     res = current_app.mongo.loan_applications.insert_one(app_doc)
     app_id = res.inserted_id
 
-    # ML prediction
-    try:
-        features = {
-            "Age": app_doc["age"],
-            "Income": app_doc["monthly_income"] * 12,
-            "LoanAmount": app_doc["loan_amount"],
-            "CreditScore": app_doc.get("credit_score"),
-            "EmploymentType": app_doc.get("employment_type"),
-            "MaritalStatus": app_doc.get("marital_status"),
-            "location": app_doc.get("location"),
-            "gender": app_doc.get("gender")
-        }
-
-        mlres = predict_default(features)
-
-        current_app.mongo.loan_applications.update_one(
-            {"_id": app_id},
-            {"$set": {
-                "ml_score": mlres["default_probability"],
-                "ml_label": mlres["predicted_label"]
-            }}
-        )
-    except Exception as e:
-        print("ML prediction error:", e)
+    if app_doc["ml_score"] is None:
+        scoring.enqueue(app_id, features)
 
     return jsonify({"msg": "Application submitted", "application_id": str(app_id)}), 201
 
 
+@loan_bp.route("/applications/bulk", methods=["POST"])
+@jwt_required()
+def bulk_applications():
+    """
+    Partner file upload, admin only: the body is the raw CSV or NDJSON file
+    (Content-Type text/csv / application/x-ndjson, or ?format=), optionally
+    gzip-encoded. Rows belong to the caller unless they carry a user_id column.
+    """
+    if (get_jwt() or {}).get("role") != "admin":
+        return jsonify({"msg": "forbidden"}), 403
+
+    try:
+        caller = ObjectId(get_jwt_identity())
+    except Exception:
+        return jsonify({"msg": "invalid user id in token"}), 401
+
+    fmt = (request.args.get("format") or detect_format(None, request.content_type) or "").lower()
+    if fmt not in FORMATS:
+        return jsonify({"msg": "unsupported format, send text/csv or application/x-ndjson"}), 415
+
+    gzipped = request.headers.get("Content-Encoding", "").lower() == "gzip"
+    rows = read_rows(open_text(request.stream, gzipped), fmt)
+    # Chunks the scorer failed on go to the background worker as they are written;
+    # ?score=0 rows are left to its recovery sweep
+    report = ingest_rows(current_app.mongo.loan_applications, rows, default_user=caller,
+                         allow_row_user=True,
+                         score=request.args.get("score", "1") != "0",
+                         on_unscored=current_app.scoring.enqueue)
+
+    if report.stopped_at_row is not None:
+        # rows before it are already committed: say how far the upload got
+        return jsonify({"msg": report.stop_error, **report.to_dict()}), 400
+    return jsonify(report.to_dict()), 200
+
+
 @loan_bp.route("/applications/my", methods=["GET"])
 @jwt_required()
 def my_applications():
@@ -82,7 +98,7 @@ def my_applications():
     except Exception:
         return jsonify({"msg": "invalid user id in token"}), 401
 
-    docs = current_app.mongo.loan_applications.find({"user_id": user_obj_id}).sort("created_at", -1)
+    docs = current_app.mongo.loan_applications.find({"user_id": user_obj_id}).sort(MY_APPLICATIONS_SORT)
 
     out = []
     for d in docs:
@@ -0,0 +1,573 @@
+# backend/app/metrics.py
+#
+# In-process metrics exposed at GET /metrics in the Prometheus text format.
+# No client library is needed: counters, histograms and callback gauges are
+# kept here behind a lock and rendered on scrape. Prometheus scrapes each pod
+# separately. Under a pre-forking server (METRICS_MULTIPROC_DIR, set by
+# gunicorn.conf.py) every process also writes its samples to a file in a
+# shared directory, and a scrape of any worker merges them: counters and
+# histograms are summed over the processes (including exited ones), gauges
+# are reported per live process with a pid label.
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from pymongo import monitoring
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+# Shared by the processes of one server; empty = each process reports its own numbers
+MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+# Seconds between writes of this process's samples to MULTIPROC_DIR
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+
+# ----------------------------------------------------------------------
+# METRIC TYPES
+# ----------------------------------------------------------------------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    @staticmethod
+    def merge(a, b):
+        return a + b
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self, samples=None):
+        lines = self._header()
+        for key, v in self.samples() if samples is None else samples:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        buckets = tuple(buckets)
+        # a repeated bound renders two identical le="" series, and Prometheus rejects the scrape
+        if any(a >= b for a, b in zip(buckets, buckets[1:])):
+            raise ValueError(f"{name}: histogram buckets must be strictly increasing, got {buckets}")
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts..., sum, count]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            return sorted((k, list(v)) for k, v in self._values.items())
+
+    @staticmethod
+    def merge(a, b):
+        return [x + y for x, y in zip(a, b)]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self, samples=None):
+        lines = self._header()
+        for key, state in self.samples() if samples is None else samples:
+            cumulative = 0
+            for bound, n in zip(self.buckets, state):
+                cumulative += n
+                le = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{le} {state[-1]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time. fn() returns a number, or {label values tuple: number}."""
+    type = "gauge"
+
+    def __init__(self, name, help, fn, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def samples(self):
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"[metrics] {self.name} collection failed:", type(e).__name__, e)
+            return []
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return sorted((k if isinstance(k, tuple) else (k,), v) for k, v in values.items())
+
+    def reset(self):
+        pass
+
+    def render(self, samples=None):
+        """samples from _merged_samples() carry the process pid as a last label value."""
+        lines = self._header()
+        labelnames = self.labelnames if samples is None else self.labelnames + ("pid",)
+        for key, v in self.samples() if samples is None else samples:
+            lines.append(f"{self.name}{_format_labels(labelnames, key)} {_format_value(v)}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render():
+    """
+    All registered metrics in the Prometheus text exposition format: this
+    process's, or with MULTIPROC_DIR the merged samples of every process.
+    """
+    lines = []
+    merged = _merged_samples() if MULTIPROC_DIR else {}
+    for metric in list(REGISTRY):
+        lines.extend(metric.render(merged.get(metric.name, []) if MULTIPROC_DIR else None))
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# MULTIPROCESS
+# ----------------------------------------------------------------------
+
+def _new_tag():
+    # pid plus start time: a recycled pid must not overwrite an exited worker's file
+    return f"{os.getpid()}-{time.time_ns()}"
+
+
+_process_tag = _new_tag()
+_flusher = None
+
+
+def _snapshot_path(tag):
+    return os.path.join(MULTIPROC_DIR, f"metrics-{tag}.json")
+
+
+def flush():
+    """Write this process's samples to MULTIPROC_DIR (atomically, readers never see half a file)."""
+    if not MULTIPROC_DIR:
+        return
+    # gauges only from serving processes (those running the flusher), not e.g. the server master
+    serving = _flusher is not None and _flusher.is_alive()
+    data = {m.name: [[list(k), v] for k, v in m.samples()] for m in list(REGISTRY)
+            if serving or not isinstance(m, CallbackGauge)}
+    path = _snapshot_path(_process_tag)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merged_samples():
+    """{metric name: samples} over every process file; gauges only from live processes."""
+    flush()
+    by_name = {m.name: m for m in REGISTRY}
+    merged = {name: {} for name in by_name}
+    for fname in os.listdir(MULTIPROC_DIR):
+        if not (fname.startswith("metrics-") and fname.endswith(".json")):
+            continue
+        pid = int(fname[len("metrics-"):].split("-")[0])
+        try:
+            with open(os.path.join(MULTIPROC_DIR, fname), encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        alive = None
+        for name, samples in data.items():
+            metric = by_name.get(name)
+            if metric is None:
+                continue
+            out = merged[name]
+            if isinstance(metric, CallbackGauge):
+                alive = _pid_alive(pid) if alive is None else alive
+                if alive:
+                    out.update((tuple(key) + (str(pid),), v) for key, v in samples)
+                continue
+            for key, v in samples:
+                key = tuple(key)
+                out[key] = v if key not in out else metric.merge(out[key], v)
+    return {name: sorted(items.items()) for name, items in merged.items()}
+
+
+def reset_multiproc_dir():
+    """Empty MULTIPROC_DIR: the server master calls this once before any worker starts."""
+    if not MULTIPROC_DIR:
+        return
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    for fname in os.listdir(MULTIPROC_DIR):
+        if fname.startswith("metrics-"):
+            os.remove(os.path.join(MULTIPROC_DIR, fname))
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        _flush_quietly()
+
+
+def start_flusher():
+    """Write this process's samples every FLUSH_INTERVAL (per process: threads do not survive fork)."""
+    global _flusher
+    if not MULTIPROC_DIR or (_flusher is not None and _flusher.is_alive()):
+        return
+    _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+    _flusher.start()
+
+
+def _flush_quietly():
+    try:
+        flush()
+    except OSError as e:
+        print("[metrics] flush failed:", type(e).__name__, e)
+
+
+def _after_fork_in_child():
+    # the parent flushed its samples to its own file before the fork, so the
+    # child starts from zero instead of counting them a second time
+    global _process_tag
+    _process_tag = _new_tag()
+    for metric in list(REGISTRY):
+        metric.reset()
+
+
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    atexit.register(_flush_quietly)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(before=_flush_quietly, after_in_child=_after_fork_in_child)
+
+
+# ----------------------------------------------------------------------
+# METRICS
+# ----------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, by route template.",
+    ("method", "endpoint", "status"))
+
+PREDICT_STAGE_SECONDS = Histogram(
+    "ml_predict_stage_seconds",
+    "Time spent in each stage of a predict_many call.",
+    ("engine", "stage"), buckets=STAGE_BUCKETS)
+
+PREDICT_ROWS = Counter(
+    "ml_predict_rows_total",
+    "Rows scored, by engine.",
+    ("engine",))
+
+INPUT_ISSUES = Counter(
+    "ml_input_issues_total",
+    "Request values the model schema could not use: unknown_column (dropped), "
+    "unknown_category (scored as unseen) or invalid_number (scored as missing).",
+    ("kind",))
+
+SCHEMA_CACHE = Counter(
+    "ml_schema_cache_total",
+    "Model bundle lookups: hit (already loaded) or miss (loaded on the request path).",
+    ("result",))
+
+MODEL_LOADS = Counter(
+    "ml_model_loads_total",
+    "Model loads, by source (pipeline, compiled, dummy).",
+    ("source",))
+
+MODEL_SWAPS = Counter(
+    "ml_model_swaps_total",
+    "Model versions swapped in (including the first load).")
+
+SHADOW_ROWS = Counter(
+    "ml_shadow_rows_total",
+    "Rows offered to the candidate model: scored, dropped (queue full) or error.",
+    ("outcome",))
+
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command round-trip time as reported by the driver.",
+    ("command", "outcome"), buckets=STAGE_BUCKETS[3:] + LATENCY_BUCKETS[-3:])
+
+MONGO_POOL_WAIT_SECONDS = Histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool (includes connecting).",
+    ("outcome",), buckets=STAGE_BUCKETS[:6] + LATENCY_BUCKETS[2:])
+
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Connection check-outs that failed, by reason (timeout = pool exhausted).",
+    ("reason",))
+
+
+# ----------------------------------------------------------------------
+# MONGO COMMAND LISTENER
+# ----------------------------------------------------------------------
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records driver-reported command durations into MONGO_COMMAND_SECONDS."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6,
+                                      command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6,
+                                      command=event.command_name, outcome="error")
+
+
+# ----------------------------------------------------------------------
+# MONGO POOL LISTENER
+# ----------------------------------------------------------------------
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Check-out wait times plus open / checked-out connection counts per server.
+    The counts back the mongo_pool_* gauges below.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = {}
+        self.checked_out = {}
+
+    def _add(self, counts, address, n):
+        key = "%s:%s" % address
+        with self._lock:
+            counts[key] = max(counts.get(key, 0) + n, 0)
+
+    def reset(self):
+        with self._lock:
+            self.open.clear()
+            self.checked_out.clear()
+
+    def snapshot(self, counts):
+        with self._lock:
+            return dict(counts)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        key = "%s:%s" % event.address
+        with self._lock:
+            self.open.pop(key, None)
+            self.checked_out.pop(key, None)
+
+    def connection_created(self, event):
+        self._add(self.open, event.address, 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(self.open, event.address, -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILURES.inc(reason=event.reason)
+        if event.duration is not None:
+            MONGO_POOL_WAIT_SECONDS.observe(event.duration, outcome="failed")
+
+    def connection_checked_out(self, event):
+        self._add(self.checked_out, event.address, 1)
+        if event.duration is not None:
+            MONGO_POOL_WAIT_SECONDS.observe(event.duration, outcome="ok")
+
+    def connection_checked_in(self, event):
+        self._add(self.checked_out, event.address, -1)
+
+
+POOL_METRICS = MongoPoolMetrics()
+
+# pymongo rebuilds its pools in a forked child; counts inherited from the master are stale
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=POOL_METRICS.reset)
+
+CallbackGauge("mongo_pool_open_connections",
+              "Connections open in this process's MongoDB pool, by server.",
+              lambda: {(k,): v for k, v in POOL_METRICS.snapshot(POOL_METRICS.open).items()},
+              ("address",))
+CallbackGauge("mongo_pool_checked_out_connections",
+              "Connections currently checked out of the MongoDB pool, by server.",
+              lambda: {(k,): v for k, v in POOL_METRICS.snapshot(POOL_METRICS.checked_out).items()},
+              ("address",))
+
+
+def mongo_event_listeners():
+    """Listeners to pass to MongoClient(event_listeners=...)."""
+    return [MongoCommandMetrics(), POOL_METRICS] if METRICS_ENABLED else []
+
+
+# ----------------------------------------------------------------------
+# FLASK WIRING
+# ----------------------------------------------------------------------
+
+_app = None
+
+
+def _scoring_queue_depth():
+    scoring = getattr(_app, "scoring", None)
+    return scoring.stats().get("queue_depth") if scoring is not None else None
+
+
+def _microbatch_queue_depth():
+    from .batcher import get_batcher, MICROBATCH_ENABLED
+    return get_batcher().stats()["queue_depth"] if MICROBATCH_ENABLED else None
+
+
+def _shadow_queue_depth():
+    shadow = getattr(_app, "shadow", None)
+    return shadow.stats().get("queue_depth") if shadow is not None else None
+
+
+CallbackGauge("loan_scoring_queue_depth",
+              "Loan applications waiting for background scoring.", _scoring_queue_depth)
+CallbackGauge("ml_microbatch_queue_depth",
+              "Single-row predictions waiting in the micro-batcher.", _microbatch_queue_depth)
+CallbackGauge("ml_shadow_queue_depth",
+              "Sampled rows waiting to be scored by the candidate model.", _shadow_queue_depth)
+
+
+def init_metrics(app):
+    """Per-request latency middleware and the /metrics endpoint."""
+    global _app
+    if not METRICS_ENABLED:
+        return
+    _app = app
+
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def _remember_status(response):
+        g._response_status = response.status_code
+        return response
+
+    # teardown runs for every request, including ones whose exception skipped
+    # after_request (propagated errors, a failing after_request hook): those count as 500
+    @app.teardown_request
+    def _record_latency(exc):
+        started = g.pop("_request_started", None)
+        status = g.pop("_response_status", None)
+        if started is not None and request.path != METRICS_PATH:
+            # Route templates, not raw paths, keep label cardinality bounded
+            rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                         method=request.method, endpoint=rule,
+                                         status=500 if exc is not None or status is None else status)
+
+    @app.route(METRICS_PATH)
+    def metrics():
+        return Response(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
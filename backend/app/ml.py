@@ -1,10 +1,15 @@
 # backend/app/ml.py
 
 import os
+import json
 import threading
-import joblib
-import pandas as pd
 import numpy as np
+# joblib, pandas and sklearn/xgboost (via unpickling) are imported on first use:
+# only the pipeline engine needs them, and routes that never score should not pay for them
+
+from . import features
+from .metrics import (PREDICT_STAGE_SECONDS, PREDICT_ROWS, SCHEMA_CACHE, MODEL_LOADS,
+                      MODEL_SWAPS, INPUT_ISSUES, CallbackGauge)
 
 
 # ----------------------------------------------------------------------
@@ -13,9 +18,36 @@ import numpy as np
 
 BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, "..", "models", "xgb_loan_model.joblib")
+DEFAULTS_PATH = os.path.join(BASE_DIR, "..", "models", "feature_defaults.json")
+COMPILED_MODEL_PATH = os.path.join(BASE_DIR, "..", "models", "xgb_loan_model.compiled.npz")
+
+# Scoring engine: "pipeline" (joblib sklearn/XGBoost pipeline), "compiled" (NumPy
+# arrays from export_compiled_model.py) or "auto" (compiled when an up-to-date export exists)
+ML_ENGINE = os.getenv("ML_ENGINE", "auto").lower()
+
+# In "auto" mode, batches larger than this go through the pipeline: the NumPy evaluator
+# wins on per-call overhead, XGBoost's C++ predictor wins on large batches
+COMPILED_MAX_ROWS = int(os.getenv("ML_COMPILED_MAX_ROWS", "512"))
+
+# Versioned model registry: models/registry/<version>/ holding model.joblib and optionally
+# feature_defaults.json + model.compiled.npz; manifest.json names the active version.
+# Without a manifest the single artifacts above are served.
+REGISTRY_DIR = os.getenv("ML_REGISTRY_DIR") or os.path.join(BASE_DIR, "..", "models", "registry")
+MANIFEST_PATH = os.path.join(REGISTRY_DIR, "manifest.json")
 
-_model = None
-_lock = threading.Lock()
+# Serve the compiled model from its memory-mapped .mmap directory when one exists
+MMAP_ENABLED = os.getenv("ML_MMAP", "1").lower() in ("1", "true", "yes")
+
+# How often (seconds) the background watcher re-checks the registry / artifacts for changes
+SCHEMA_CHECK_INTERVAL = float(os.getenv("ML_SCHEMA_CHECK_INTERVAL", "2.0"))
+MODEL_WATCH_ENABLED = os.getenv("ML_MODEL_WATCH", "1").lower() in ("1", "true", "yes")
+
+# Probability above which an applicant is labelled as a default (matches XGBClassifier.predict)
+DECISION_THRESHOLD = float(os.getenv("ML_DECISION_THRESHOLD", "0.5"))
+
+_bundle = None
+_lock = threading.RLock()
+_watcher = None
 
 
 # ----------------------------------------------------------------------
@@ -24,6 +56,7 @@ _lock = threading.Lock()
 
 def _load_model_from_disk(path):
     try:
+        import joblib
         obj = joblib.load(path)
         print(f"[ml] Loaded real model from {path}")
         return obj
@@ -32,40 +65,60 @@ def _load_model_from_disk(path):
         return None
 
 
+class _DummyModel:
+    """Fallback when no model file loads: every applicant gets P(default) = 0."""
+
+    def predict_proba(self, X):
+        out = np.zeros((len(X), 2), dtype=float)
+        out[:, 0] = 1.0
+        return out
+
+    def predict(self, X):
+        return np.zeros(len(X), dtype=int)
+
+
+def _dummy_model():
+    MODEL_LOADS.inc(source="dummy")
+    print("[ml] Loaded dummy classifier.")
+    return _DummyModel()
+
+
 # ----------------------------------------------------------------------
 # PUBLIC: GET MODEL (LAZY LOAD)
 # ----------------------------------------------------------------------
 
 def get_model():
-    global _model
-    if _model is None:
-        with _lock:
-            if _model is None:
-
-                # Real model exists?
-                if os.path.exists(MODEL_PATH):
-                    m = _load_model_from_disk(MODEL_PATH)
-                    if m is not None:
-                        _model = m
-                        return _model
-                    else:
-                        print("[ml] Failed to load real model. Using dummy.")
-
-                # Fallback dummy model
-                from sklearn.dummy import DummyClassifier
-                dummy = DummyClassifier(strategy="most_frequent")
-                dummy.fit([[0]], [0])
-                _model = dummy
-                print("[ml] Loaded dummy classifier.")
-
-    return _model
+    """The joblib pipeline of the active model version (loaded on first use)."""
+    return get_bundle().get_model()
 
 
 # ----------------------------------------------------------------------
 # COMPAT WRAPPER (some files import load_model())
 # ----------------------------------------------------------------------
 def load_model():
-    return get_model()
+    # No watcher thread here: create_app may run in a pre-fork master (see preload())
+    bundle = _load_active()
+    return bundle.compiled if bundle.compiled is not None else bundle.get_model()
+
+
+def preload(freeze=True):
+    """
+    Load the active model in a pre-fork master (e.g. gunicorn preload_app) so every
+    worker inherits it copy-on-write instead of loading its own copy. The pipeline
+    is loaded too unless ML_ENGINE=compiled. With freeze, the loaded objects are
+    then moved out of the garbage collector's reach (gc.freeze) so collections in
+    the workers do not write to, and so un-share, their pages. The watcher thread
+    is started lazily in each worker after the fork.
+    """
+    import gc
+    bundle = _load_active()
+    if bundle.has_pipeline() and (bundle.compiled is None or ML_ENGINE != "compiled"):
+        bundle.get_model()
+    if freeze:
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+    return bundle
 
 
 # ----------------------------------------------------------------------
@@ -129,117 +182,964 @@ def _get_expected_columns_from_preprocessor(model):
 
 
 # ----------------------------------------------------------------------
-# HELPERS: fill missing values using defaults or fallback heuristics
+# HELPERS: default kinds for columns no schema describes
+# ----------------------------------------------------------------------
+
+_NUMERIC_TOKENS = ('amount', 'income', 'score', 'age', 'months', 'num', 'interest',
+                   'term', 'dti', 'loan', 'ratio', 'monthly', 'count', 'balance')
+
+
+def _looks_numeric(col):
+    return any(tok in col.lower() for tok in _NUMERIC_TOKENS)
+
+
+# ----------------------------------------------------------------------
+# COMPILED TREE-ENSEMBLE EVALUATOR (NumPy only)
 # ----------------------------------------------------------------------
 
-def _fill_row_with_defaults(row_dict, expected_cols, num_defaults, cat_defaults):
-    filled = {}
+def _to_float_array(values):
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _is_missing(v):
+    return v is None or (isinstance(v, float) and v != v)
+
+
+class CompiledModel:
+    """
+    Scores rows from the flat arrays written by export_compiled_model.py:
+    imputer/scaler parameters, one-hot vocabularies and the XGBoost tree nodes.
+    Reproduces pre.transform + clf.predict_proba without sklearn or xgboost.
+    """
+
+    # rows scored per traversal chunk (bounds the rows x trees node-index matrix)
+    CHUNK_ROWS = 1024
+
+    # numeric arrays of the runtime layout, one .npy each in the memory-mapped directory
+    MMAP_ARRAYS = ("num_fill", "num_mean", "num_scale", "num_positions", "cat_offsets",
+                   "split_groups", "split_threshold", "split_default_left", "pos_split", "leaves")
+
+    def __init__(self, arrays, meta=None):
+        """
+        arrays: the export's flat arrays (npz), or with meta, the runtime layout
+        written by save_mmap() (already re-laid trees, typically memory-mapped).
+        """
+        if meta is not None:
+            self._init_runtime(arrays, meta)
+            return
+
+        self.num_columns = [str(c) for c in arrays["num_columns"]]
+        self.num_fill = arrays["num_fill"]
+        self.num_mean = arrays["num_mean"]
+        self.num_scale = arrays["num_scale"]
+        self.num_positions = arrays["num_positions"]
+        # exports written before these were recorded scale everything in float64
+        n_num = len(self.num_columns)
+        self.num_input_float32 = (arrays["num_input_float32"] if "num_input_float32" in arrays
+                                  else np.zeros(n_num, dtype=bool))
+        self.num_math_float32 = (arrays["num_math_float32"] if "num_math_float32" in arrays
+                                 else np.zeros(n_num, dtype=bool))
+
+        self.cat_columns = [str(c) for c in arrays["cat_columns"]]
+        self.cat_fill = [str(v) for v in arrays["cat_fill"]]
+        self.cat_offsets = arrays["cat_offsets"]
+        vocab = [str(v) for v in arrays["cat_vocab"]]
+        bounds = arrays["cat_vocab_bounds"]
+        self.cat_vocab = [vocab[bounds[j]:bounds[j + 1]] for j in range(len(self.cat_columns))]
+        self.cat_lookup = [{v: i for i, v in enumerate(vs)} for vs in self.cat_vocab]
+
+        self.n_features = int(arrays["n_features"])
+        self.sparse = bool(arrays["sparse"])
+
+        self.base_margin = float(arrays["base_margin"])
+        self.source_sha256 = str(arrays["source_sha256"])
+        self._build_complete_trees(arrays)
+        self._init_float32_params()
+
+    def _init_runtime(self, arrays, meta):
+        for name in self.MMAP_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.num_columns = list(meta["num_columns"])
+        n_num = len(self.num_columns)
+        self.num_input_float32 = np.asarray(meta.get("num_input_float32", [False] * n_num), dtype=bool)
+        self.num_math_float32 = np.asarray(meta.get("num_math_float32", [False] * n_num), dtype=bool)
+        self.cat_columns = list(meta["cat_columns"])
+        self.cat_fill = list(meta["cat_fill"])
+        self.cat_vocab = [list(vs) for vs in meta["cat_vocab"]]
+        self.cat_lookup = [{v: i for i, v in enumerate(vs)} for vs in self.cat_vocab]
+        self.n_features = int(meta["n_features"])
+        self.sparse = bool(meta["sparse"])
+        self.base_margin = float(meta["base_margin"])
+        self.source_sha256 = str(meta["source_sha256"])
+        self.depth = int(meta["depth"])
+        self.n_trees = int(meta["n_trees"])
+        self.n_splits = int(meta["n_splits"])
+        self.split_groups = [tuple(int(v) for v in g) for g in self.split_groups]
+        self._init_float32_params()
+
+    def _init_float32_params(self):
+        # imputer fill / scaler parameters as a float32 branch applies them
+        self.num_fill32 = np.asarray(self.num_fill, dtype=np.float32)
+        self.num_mean32 = np.asarray(self.num_mean, dtype=np.float32)
+        self.num_scale32 = np.asarray(self.num_scale, dtype=np.float32)
+
+    def save_mmap(self, path):
+        """
+        Write the runtime layout as a directory of uncompressed .npy files plus
+        meta.json, replacing any existing directory at path. Loaded with
+        load_mmap(), every worker maps the same file pages read-only.
+        """
+        import shutil
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        arrays = {name: getattr(self, name) for name in self.MMAP_ARRAYS}
+        arrays["split_groups"] = np.asarray(self.split_groups, dtype=np.int64).reshape(-1, 3)
+        for name, value in arrays.items():
+            np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(value))
+        meta = {
+            "num_columns": self.num_columns, "cat_columns": self.cat_columns,
+            "cat_fill": self.cat_fill, "cat_vocab": self.cat_vocab,
+            "num_input_float32": [bool(v) for v in self.num_input_float32],
+            "num_math_float32": [bool(v) for v in self.num_math_float32],
+            "n_features": self.n_features, "sparse": self.sparse,
+            "base_margin": self.base_margin, "source_sha256": self.source_sha256,
+            "depth": self.depth, "n_trees": self.n_trees, "n_splits": self.n_splits,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        # Swap directories; processes that still map the old files keep their inodes
+        old = path + ".old"
+        if os.path.exists(path):
+            shutil.rmtree(old, ignore_errors=True)
+            os.rename(path, old)
+        os.rename(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load_mmap(cls, path):
+        """Memory-map a directory written by save_mmap() read-only."""
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        # np.asarray drops the memmap subclass (cheaper indexing); the buffer stays mapped
+        arrays = {name: np.asarray(np.load(os.path.join(path, name + ".npy"), mmap_mode="r"))
+                  for name in cls.MMAP_ARRAYS}
+        return cls(arrays, meta)
+
+    def _build_complete_trees(self, arrays):
+        """
+        Re-lay every tree as a complete binary tree of the ensemble depth so a row's
+        path is pure index arithmetic (child = 2 * pos + 1 + went_right). Split
+        decisions are evaluated once per real split node; padding positions under
+        shallow leaves always go left and every padded leaf carries the leaf value.
+        """
+        left, right = arrays["tree_left"], arrays["tree_right"]
+        feature, threshold = arrays["tree_feature"], arrays["tree_threshold"]
+        default_left, leaf_value = arrays["tree_default_left"], arrays["tree_leaf_value"]
+        roots = arrays["tree_roots"]
+        depth = max(int(arrays["tree_depth"]), 1)
+        n_inner, n_leaves = (1 << depth) - 1, 1 << depth
+
+        split_nodes = np.flatnonzero(left != np.arange(len(left)))
+        split_col = np.full(len(left), len(split_nodes), dtype=np.int64)  # last column: "go left"
+        split_col[split_nodes] = np.arange(len(split_nodes))
+
+        pos_split = np.full((len(roots), n_inner), len(split_nodes), dtype=np.int64)
+        leaves = np.zeros((len(roots), n_leaves), dtype=np.float32)
+        for t, root in enumerate(roots):
+            stack = [(int(root), 0, 0)]
+            while stack:
+                node, pos, level = stack.pop()
+                if level == depth:
+                    leaves[t, pos - n_inner] = leaf_value[node]
+                elif left[node] == node:
+                    # leaf above full depth: its left-most padded leaf is reached
+                    first = pos
+                    for _ in range(depth - level):
+                        first = 2 * first + 1
+                    leaves[t, first - n_inner] = leaf_value[node]
+                else:
+                    pos_split[t, pos] = split_col[node]
+                    stack.append((int(left[node]), 2 * pos + 1, level + 1))
+                    stack.append((int(right[node]), 2 * pos + 2, level + 1))
+
+        # Group split columns by feature so decisions are one broadcast compare per feature
+        order = np.argsort(feature[split_nodes], kind="stable")
+        remap = np.empty(len(split_nodes) + 1, dtype=np.int64)
+        remap[order] = np.arange(len(split_nodes))
+        remap[-1] = len(split_nodes)
+        split_feature = feature[split_nodes][order]
+        bounds = np.flatnonzero(np.diff(split_feature)) + 1
+        starts = np.concatenate(([0], bounds)).astype(np.int64)
+        ends = np.concatenate((bounds, [len(split_feature)])).astype(np.int64)
+
+        self.depth = depth
+        self.n_trees = len(roots)
+        self.n_splits = len(split_nodes)
+        self.split_groups = [(int(split_feature[a]), int(a), int(b)) for a, b in zip(starts, ends)]
+        self.split_threshold = threshold[split_nodes][order]
+        self.split_default_left = default_left[split_nodes][order]
+        # flat lookups: tree t, position p -> split column; tree t, leaf l -> value
+        self.pos_split = remap[pos_split].ravel()
+        self.leaves = leaves.ravel()
+
+    @property
+    def columns(self):
+        return self.num_columns + self.cat_columns
+
+    @property
+    def kinds(self):
+        kinds = {c: 'numeric' for c in self.num_columns}
+        kinds.update({c: 'categorical' for c in self.cat_columns})
+        return kinds
+
+    def transform(self, columns, n):
+        """columns: {input column -> list of n values}. Returns the (n, n_features) float32 matrix."""
+        X = np.zeros((n, self.n_features), dtype=np.float32)
+
+        for j, c in enumerate(self.num_columns):
+            v = _to_float_array(columns[c])
+            if self.num_input_float32[j]:
+                # the training frame held this column as float32 (ModelSchema.frame_dtypes)
+                v = v.astype(np.float32)
+            if self.num_math_float32[j]:
+                # an all-float32 branch is imputed and scaled in float32 by sklearn;
+                # float64 arithmetic lands 1 ulp off and flips splits on cut points
+                v = np.where(np.isnan(v), self.num_fill32[j], v)
+                X[:, self.num_positions[j]] = (v - self.num_mean32[j]) / self.num_scale32[j]
+            else:
+                v = np.where(np.isnan(v), self.num_fill[j], v)
+                X[:, self.num_positions[j]] = (v - self.num_mean[j]) / self.num_scale[j]
+
+        rows = np.arange(n)
+        for j, c in enumerate(self.cat_columns):
+            lookup = self.cat_lookup[j]
+            fill = self.cat_fill[j]
+            idx = np.fromiter(
+                (lookup.get(fill if _is_missing(v) else str(v), -1) for v in columns[c]),
+                dtype=np.int64, count=n)
+            hit = idx >= 0
+            X[rows[hit], self.cat_offsets[j] + idx[hit]] = 1.0
+
+        if self.sparse:
+            # XGBoost treats entries absent from a CSR matrix as missing
+            X[X == 0] = np.nan
+        return X
+
+    def _split_decisions(self, Xc):
+        """(n_splits + 1, rows) booleans: does the row go left at each split? Last row is always True."""
+        go_left = np.empty((self.n_splits + 1, Xc.shape[0]), dtype=bool)
+        go_left[-1] = True
+        for f, a, b in self.split_groups:
+            x = Xc[:, f]
+            np.greater(self.split_threshold[a:b, None], x, out=go_left[a:b])
+            if self.sparse:
+                missing = np.isnan(x)
+                if missing.any():
+                    go_left[a:b, missing] = self.split_default_left[a:b, None]
+        return go_left
+
+    def margin(self, X):
+        n = X.shape[0]
+        n_inner, n_leaves = (1 << self.depth) - 1, 1 << self.depth
+        tree_ids = np.arange(self.n_trees, dtype=np.intp)
+        inner_base = tree_ids * n_inner
+        leaf_base = tree_ids * n_leaves - n_inner
+        out = np.empty(n, dtype=np.float64)
+        for start in range(0, n, self.CHUNK_ROWS):
+            Xc = np.ascontiguousarray(X[start:start + self.CHUNK_ROWS])
+            m = Xc.shape[0]
+            go_left = self._split_decisions(Xc).ravel()
+            split_base = self.pos_split * m
+            row_ids = np.arange(m, dtype=np.intp)[:, None]
+
+            pos = np.zeros((m, self.n_trees), dtype=np.intp)
+            for _ in range(self.depth):
+                went_right = ~go_left.take(split_base.take(pos + inner_base) + row_ids)
+                pos *= 2
+                pos += 1
+                pos += went_right
+            out[start:start + m] = self.leaves.take(pos + leaf_base).sum(axis=1, dtype=np.float64)
+        return out + self.base_margin
+
+    def predict_proba(self, columns, n):
+        """P(default) for n rows given column-wise input values."""
+        return 1.0 / (1.0 + np.exp(-self.margin(self.transform(columns, n))))
+
 
-    for c in expected_cols:
+def _file_sha256(path):
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
-        if c in row_dict:
-            # User provided value
-            filled[c] = row_dict[c]
+
+def mmap_path_for(compiled_path):
+    """Memory-mapped directory written next to a compiled export (x.compiled.npz -> x.compiled.mmap)."""
+    return os.path.splitext(compiled_path)[0] + ".mmap"
+
+
+def _load_compiled(source, model_sha256=None):
+    """
+    Load the source's compiled model if the engine setting allows it and it was
+    exported from the source's current model file; None otherwise.
+    The memory-mapped directory is preferred: its pages are shared by every worker
+    through the page cache. The .npz is the fallback (private copy per process).
+    """
+    path = source.compiled_path
+    mmap_dir = mmap_path_for(path)
+    use_mmap = MMAP_ENABLED and os.path.isdir(mmap_dir)
+    if ML_ENGINE == "pipeline" or not (use_mmap or os.path.exists(path)):
+        if ML_ENGINE == "compiled":
+            print(f"[ml] ML_ENGINE=compiled but {path} is missing. Using pipeline.")
+        return None
+    try:
+        if use_mmap:
+            path = mmap_dir
+            compiled = CompiledModel.load_mmap(mmap_dir)
+        else:
+            with np.load(path, allow_pickle=False) as arrays:
+                compiled = CompiledModel(arrays)
+    except Exception as e:
+        print(f"[ml] ERROR loading compiled model: {type(e).__name__}: {e}")
+        return None
+
+    if model_sha256 is not None and model_sha256 != compiled.source_sha256:
+        # an export of another model file: never score with it, whatever the engine setting
+        if ML_ENGINE == "compiled":
+            print(f"[ml] WARNING: ML_ENGINE=compiled but {path} was exported from a different model "
+                  f"file than {source.model_path}. Refusing it and using the pipeline; "
+                  f"re-run export_compiled_model.py.")
+        else:
+            print("[ml] Compiled model is stale (model file changed). Re-run export_compiled_model.py.")
+        return None
+
+    print(f"[ml] Loaded compiled model from {path}")
+    return compiled
+
+
+# ----------------------------------------------------------------------
+# MODEL SCHEMA: column order, dtypes and defaults compiled once per model
+# ----------------------------------------------------------------------
+
+def _file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_feature_defaults(path):
+    """Return (numeric, categorical) default dicts from feature_defaults.json."""
+    if not os.path.exists(path):
+        return {}, {}
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            d = json.load(fh)
+        print("[ml] Loaded feature defaults.")
+        return d.get("numeric", {}) or {}, d.get("categorical", {}) or {}
+    except Exception as e:
+        print("[ml] ERROR reading feature_defaults.json. Using fallback defaults:", e)
+        return {}, {}
+
+
+def _column_kinds_from_preprocessor(model):
+    """Map input column -> 'numeric' / 'categorical' using the ColumnTransformer branch names."""
+    kinds = {}
+    steps = getattr(model, "named_steps", None) or {}
+    pre = steps.get('pre') or steps.get('preprocessor')
+    for name, _, cols_spec in getattr(pre, "transformers_", None) or []:
+        if not isinstance(cols_spec, (list, tuple)):
             continue
+        if name.startswith('num'):
+            kind = 'numeric'
+        elif name.startswith('cat'):
+            kind = 'categorical'
+        else:
+            continue
+        for c in cols_spec:
+            kinds.setdefault(c, kind)
+    return kinds
+
 
-        # Default → numeric
-        if c in num_defaults:
-            filled[c] = num_defaults[c]
+def _categories_from_preprocessor(model):
+    """Map categorical input column -> categories its one-hot encoder knows."""
+    steps = getattr(model, "named_steps", None) or {}
+    pre = steps.get('pre') or steps.get('preprocessor')
+    out = {}
+    for name, trans, cols_spec in getattr(pre, "transformers_", None) or []:
+        ohe = getattr(trans, "named_steps", {}).get("ohe") if name.startswith('cat') else None
+        if ohe is None or not isinstance(cols_spec, (list, tuple)):
             continue
+        for c, cats in zip(cols_spec, getattr(ohe, "categories_", [])):
+            out[c] = [str(v) for v in cats]
+    return out
+
 
-        # Default → categorical
-        if c in cat_defaults:
-            filled[c] = cat_defaults[c]
+def _imputer_fills_from_preprocessor(model):
+    """Map input column -> the value its branch's SimpleImputer fills missing entries with."""
+    steps = getattr(model, "named_steps", None) or {}
+    pre = steps.get('pre') or steps.get('preprocessor')
+    out = {}
+    for name, trans, cols_spec in getattr(pre, "transformers_", None) or []:
+        if not isinstance(cols_spec, (list, tuple)) or not name.startswith(('num', 'cat')):
             continue
+        imputer = next((st for st in getattr(trans, "named_steps", {}).values()
+                        if type(st).__name__ == "SimpleImputer"), None)
+        for c, fill in zip(cols_spec, getattr(imputer, "statistics_", [])):
+            out[c] = float(fill) if name.startswith('num') else str(fill)
+    return out
+
+
+def serving_schema_path_for(model_path):
+    """Serving schema written by training next to a model (x.joblib -> x.schema.json)."""
+    return os.path.splitext(model_path)[0] + ".schema.json"
+
+
+def _read_serving_schema(path, model_sha256=None):
+    """The training-time serving schema at path, or None when absent, unreadable or stale."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            d = json.load(fh)
+        columns = d["columns"]
+        if not all(c.get("kind") in ("numeric", "categorical") and "name" in c for c in columns):
+            raise ValueError("every column needs a name and a numeric/categorical kind")
+    except Exception as e:
+        print("[ml] ERROR reading serving schema. Using feature defaults:", e)
+        return None
+    if model_sha256 is not None and d.get("model_sha256") not in (None, model_sha256):
+        print(f"[ml] Serving schema {path} belongs to another model file. Using feature defaults.")
+        return None
+    print(f"[ml] Loaded serving schema ({len(columns)} columns).")
+    return d
+
+
+def serving_frame_dtypes(spec):
+    """
+    {numeric column -> np.float32} for the serving schema's columns that the
+    training cache held as float32 / int8 / int16: the pipeline saw them (and
+    scaled them) in float32, so both engines cast them back before scoring.
+    """
+    return {c["name"]: np.float32 for c in spec["columns"]
+            if c["kind"] == "numeric" and c.get("dtype") in ("float32", "int8", "int16")}
+
+
+def _normalize_key(name):
+    """Case- and separator-insensitive form of a column name: 'loan_amount' -> 'loanamount'."""
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+def _numeric_column(values):
+    """float64 array of values (None / unparsable -> NaN) and the number of unparsable ones."""
+    try:
+        return np.asarray(values, dtype=np.float64), 0
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        invalid = 0
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+                if not (v is None or v == ""):
+                    invalid += 1
+        return out, invalid
+
+
+class ModelSchema:
+    """
+    Everything predict_default needs to turn a partial request into model input:
+    column order, a kind per column, the default used when a column is absent,
+    the known categories of each categorical column, a key lookup that
+    resolves exact names, case/separator variants ('loan_amount', 'income') in
+    O(1) per key, and the engineered columns (app/features.py) derived from
+    the request's raw columns exactly as training derived them. Built once
+    per loaded model and rebuilt only when the model, its serving schema or
+    the defaults file changes on disk.
+    """
+
+    # distinct non-column request keys remembered per schema (bounds the cache)
+    KEY_CACHE_MAX = 1024
+
+    __slots__ = ("columns", "dtypes", "defaults", "numeric_defaults", "categorical_defaults",
+                 "strict", "signature", "origin", "categories", "lookup", "column_set", "derived",
+                 "derived_inputs", "frame_dtypes", "_key_cache")
+
+    def __init__(self, columns, dtypes, defaults, numeric_defaults,
+                 categorical_defaults, strict, signature, categories=None, origin="defaults",
+                 frame_dtypes=None):
+        self.columns = tuple(columns)
+        self.dtypes = dtypes
+        self.defaults = defaults
+        self.numeric_defaults = numeric_defaults
+        self.categorical_defaults = categorical_defaults
+        # strict: columns came from the model itself, so unknown input keys are dropped
+        self.strict = strict
+        self.signature = signature
+        # "serving_schema" (written by training) or "defaults" (feature_defaults.json + model)
+        self.origin = origin
+        # column -> {category or its lowercase form -> category}
+        self.categories = {
+            c: {**{str(v).strip().lower(): str(v) for v in cats}, **{str(v): str(v) for v in cats}}
+            for c, cats in (categories or {}).items()
+        }
+        self.column_set = frozenset(self.columns)
+        self.lookup = {_normalize_key(c): c for c in self.columns}
+        self.lookup.update((c, c) for c in self.columns)
+        # derived column -> its input columns, for the derived columns the model takes
+        # whose inputs it also takes; those are computed, never defaulted
+        self.derived = {c: src for c, src in features.sources(self.column_set).items() if c in self.column_set}
+        self.derived_inputs = frozenset(i for src in self.derived.values() for i in src)
+        # numeric column -> the dtype training fed the pipeline (float32 from the cache);
+        # the pipeline frame uses it so scaled values round exactly as they did in training
+        self.frame_dtypes = frame_dtypes or {}
+        self._key_cache = {}
+
+    def column_for(self, key):
+        """The model column a request key names, or None."""
+        c = self.lookup.get(key)
+        if c is not None:
+            return c
+        try:
+            return self._key_cache[key]
+        except KeyError:
+            c = self.lookup.get(_normalize_key(key))
+            if len(self._key_cache) < self.KEY_CACHE_MAX:
+                self._key_cache[key] = c
+            return c
+
+    def canonical(self, row_dict):
+        """row_dict with its keys resolved to model columns; unknown keys dropped when strict."""
+        if not self.columns or self.column_set.issuperset(row_dict):
+            return row_dict
+        out = {}
+        unknown = 0
+        for k, v in row_dict.items():
+            c = self.column_for(k)
+            if c is None:
+                unknown += 1
+                if not self.strict:
+                    out.setdefault(k, v)
+            elif k == c or c not in out:
+                out[c] = v  # an exact name wins over a variant of it
+        if unknown and self.strict:
+            INPUT_ISSUES.inc(unknown, kind="unknown_column")
+        return out
+
+    def fill(self, row_dict):
+        """Return a full row in column order, defaults filled for absent columns."""
+        if not self.columns:
+            return dict(row_dict)
+        row_dict = self.canonical(row_dict)
+        defaults = self.defaults
+        filled = {c: row_dict[c] if c in row_dict else defaults[c] for c in self.columns}
+        if self.derived:
+            for c, v in features.derive_row(filled, only=self.derived).items():
+                filled[c] = defaults[c] if v is None else v
+        if not self.strict:
+            for k, v in row_dict.items():
+                filled.setdefault(k, v)
+        return filled
+
+    def vectorize(self, rows):
+        """
+        Column-wise model input for rows: {column -> float64 array} for numeric
+        columns, {column -> list of canonical category strings} for categorical
+        ones, defaults filled. Numbers sent as strings are parsed; values that are
+        not numbers become NaN (the imputer's median), categories are matched
+        case-insensitively, missing categories take the default. Derived columns
+        are computed from their inputs (absent inputs take their defaults,
+        missing ones stay missing, as in training); values sent for them are
+        ignored. Rows must already be canonical().
+        """
+        data = {}
+        raw = {}
+        invalid = unknown = 0
+        for c, d in self.defaults.items():
+            if c in self.derived:
+                continue
+            values = [r[c] if c in r else d for r in rows]
+            if self.dtypes.get(c) == 'numeric':
+                data[c], bad = _numeric_column(values)
+                invalid += bad
+                continue
+            if c in self.derived_inputs:
+                raw[c] = list(values)  # before missing values take the default
+            cats = self.categories.get(c) or {}
+            for i, v in enumerate(values):
+                if _is_missing(v):
+                    values[i] = d  # what the imputer would fill in; the same in both engines
+                    continue
+                if cats:
+                    hit = cats.get(v) if isinstance(v, str) else None
+                    if hit is None:
+                        hit = cats.get(str(v).strip().lower())
+                    if hit is None:
+                        unknown += 1  # scored like an unseen category (all one-hot columns zero)
+                    else:
+                        values[i] = hit
+            data[c] = values
+        if self.derived:
+            inputs = {c: raw[c] if c in raw else data[c] for c in self.derived_inputs}
+            for c, v in features.derive_columns(inputs, only=self.derived).items():
+                if self.dtypes.get(c) == 'numeric':
+                    data[c] = v.astype(np.float64)
+                else:
+                    d = self.defaults[c]
+                    data[c] = [d if x is None else x for x in v.tolist()]
+        if invalid:
+            INPUT_ISSUES.inc(invalid, kind="invalid_number")
+        if unknown:
+            INPUT_ISSUES.inc(unknown, kind="unknown_category")
+        return data
 
-        # Heuristic fallback
-        if any(tok in c.lower() for tok in
-               ['amount','income','score','age','months','num','interest',
-                'term','dti','loan','ratio','monthly','count','balance']):
-            filled[c] = 0.0
+
+def _schema_from_serving(spec, signature, model_columns):
+    """ModelSchema from a training-time serving schema, or None if it does not fit the model."""
+    columns = [c["name"] for c in spec["columns"]]
+    if model_columns and set(model_columns) != set(columns):
+        print("[ml] Serving schema columns do not match the model. Using feature defaults.")
+        return None
+    dtypes = {c["name"]: c["kind"] for c in spec["columns"]}
+    defaults = {c["name"]: c.get("default", 0.0 if c["kind"] == "numeric" else "missing")
+                for c in spec["columns"]}
+    numeric = {c: v for c, v in defaults.items() if dtypes[c] == 'numeric'}
+    categorical = {c: v for c, v in defaults.items() if dtypes[c] == 'categorical'}
+    categories = {c["name"]: c["categories"] for c in spec["columns"] if c.get("categories")}
+    frame_dtypes = serving_frame_dtypes(spec)
+    return ModelSchema(columns, dtypes, defaults, numeric, categorical, True, signature,
+                       categories, origin="serving_schema", frame_dtypes=frame_dtypes)
+
+
+def _build_schema(model, signature, compiled=None, defaults_path=DEFAULTS_PATH, serving=None):
+    if compiled is not None:
+        columns = compiled.columns
+    else:
+        columns = _get_expected_columns_from_preprocessor(model)
+
+    if serving is not None:
+        schema = _schema_from_serving(serving, signature, columns)
+        if schema is not None:
+            return schema
+
+    num_defaults, cat_defaults = _read_feature_defaults(defaults_path)
+    strict = bool(columns)
+    if not columns:
+        # Can't read the layout from the model: fall back to the defaults file keys
+        columns = list(num_defaults) + [c for c in cat_defaults if c not in num_defaults]
+        if columns:
+            print(f"[ml] Using fallback columns: {columns}")
+
+    kinds = compiled.kinds if compiled is not None else _column_kinds_from_preprocessor(model)
+    # A missing value must become what training imputed (median / mode), not the
+    # defaults file's value: for a categorical that can be a category the model
+    # never saw (credit_bin "missing" for a request without a CreditScore).
+    if compiled is not None:
+        fills = dict(zip(compiled.num_columns, (float(v) for v in compiled.num_fill)))
+        # export_compiled_model.py writes "None" for a categorical branch without an imputer
+        fills.update((c, f) for c, f in zip(compiled.cat_columns, compiled.cat_fill) if f != "None")
+    else:
+        fills = _imputer_fills_from_preprocessor(model)
+    num_defaults = {**num_defaults, **{c: v for c, v in fills.items() if kinds.get(c) == 'numeric'}}
+    cat_defaults = {**cat_defaults, **{c: v for c, v in fills.items() if kinds.get(c) == 'categorical'}}
+    dtypes = {}
+    defaults = {}
+    for c in columns:
+        if c in kinds:
+            dtypes[c] = kinds[c]
+        elif c in num_defaults:
+            dtypes[c] = 'numeric'
+        elif c in cat_defaults:
+            dtypes[c] = 'categorical'
+        else:
+            dtypes[c] = 'numeric' if _looks_numeric(c) else 'categorical'
+
+        if c in fills:
+            defaults[c] = fills[c]
+        elif c in num_defaults:
+            defaults[c] = num_defaults[c]
+        elif c in cat_defaults:
+            defaults[c] = cat_defaults[c]
         else:
-            filled[c] = "missing"
+            defaults[c] = 0.0 if dtypes[c] == 'numeric' else "missing"
+
+    if compiled is not None:
+        categories = {c: list(v) for c, v in zip(compiled.cat_columns, compiled.cat_vocab)}
+    else:
+        categories = _categories_from_preprocessor(model)
+    return ModelSchema(columns, dtypes, defaults, num_defaults, cat_defaults, strict, signature, categories)
+
 
-    return filled
+def get_schema():
+    """Return the ModelSchema of the active model version."""
+    return get_bundle().schema
 
 
 # ----------------------------------------------------------------------
-# PUBLIC: MAIN PREDICT FUNCTION
+# MODEL REGISTRY + HOT SWAP
 # ----------------------------------------------------------------------
 
-def predict_default(input_dict: dict):
+class ModelSource:
+    """Where one model version's artifacts live on disk."""
+
+    __slots__ = ("version", "model_path", "defaults_path", "compiled_path", "schema_path", "signature")
+
+    def __init__(self, version, model_path, defaults_path, compiled_path):
+        self.version = version
+        self.model_path = model_path
+        self.defaults_path = defaults_path
+        self.compiled_path = compiled_path
+        self.schema_path = serving_schema_path_for(model_path)
+        # Changes when the version pointer or any artifact file changes
+        self.signature = (version, _file_mtime(model_path), _file_mtime(defaults_path),
+                          _file_mtime(compiled_path), _file_mtime(self.schema_path),
+                          _file_mtime(os.path.join(mmap_path_for(compiled_path), "meta.json")))
+
+
+def read_manifest(path=None):
+    """The registry manifest ({"active": ..., "versions": {...}}), or None when there is none."""
+    path = path or MANIFEST_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except Exception as e:
+        print("[ml] ERROR reading registry manifest:", e)
+        return None
+
+
+def _registry_source(version):
+    d = os.path.join(REGISTRY_DIR, version)
+    return ModelSource(version, os.path.join(d, "model.joblib"),
+                       os.path.join(d, "feature_defaults.json"),
+                       os.path.join(d, "model.compiled.npz"))
+
+
+def _current_source():
+    """The artifacts that should be serving right now."""
+    manifest = read_manifest()
+    active = (manifest or {}).get("active")
+    if active:
+        return _registry_source(active)
+    # No registry: the single model file; the version is derived from its hash at load
+    return ModelSource(None, MODEL_PATH, DEFAULTS_PATH, COMPILED_MODEL_PATH)
+
+
+def source_for(spec):
     """
-    Accepts partial feature dictionary from frontend.
-    Returns:
-    {
-        "predicted_label": int,
-        "default_probability": float
-    }
+    ModelSource for a registry version name or a path to a .joblib file (relative
+    paths are resolved against backend/). A file's compiled export is expected
+    next to it as <name>.compiled.npz and its serving schema as <name>.schema.json;
+    feature defaults (used without a serving schema) come from DEFAULTS_PATH.
     """
+    if os.path.isdir(os.path.join(REGISTRY_DIR, spec)):
+        return _registry_source(spec)
+    path = spec if os.path.isabs(spec) else os.path.join(BASE_DIR, "..", spec)
+    return ModelSource(None, path, DEFAULTS_PATH, os.path.splitext(path)[0] + ".compiled.npz")
 
-    model = get_model()
 
-    # ------------------------------------------------------------------
-    # Load defaults JSON (medians + modes)
-    # ------------------------------------------------------------------
-    defaults_path = os.path.join(BASE_DIR, "..", "models", "feature_defaults.json")
-    num_defaults = {}
-    cat_defaults = {}
+class ModelBundle:
+    """
+    One loaded model version: schema, compiled evaluator and (lazily) the joblib
+    pipeline. Bundles are never mutated after a swap; predict_many takes one
+    reference per call, so a call in flight finishes on the version it started with.
+    """
 
-    if os.path.exists(defaults_path):
-        try:
-            import json
-            with open(defaults_path, "r", encoding="utf-8") as fh:
-                d = json.load(fh)
-            num_defaults = d.get("numeric", {}) or {}
-            cat_defaults = d.get("categorical", {}) or {}
-            print("[ml] Loaded feature defaults.")
-        except Exception as e:
-            print("[ml] ERROR reading feature_defaults.json. Using fallback defaults:", e)
+    def __init__(self, source):
+        self.source = source
+        self.signature = source.signature
+        self._model = None
+        self._model_lock = threading.Lock()
 
-    # ------------------------------------------------------------------
-    # Obtain expected columns from preprocessor
-    # ------------------------------------------------------------------
-    expected_cols = _get_expected_columns_from_preprocessor(model)
-    
-    if not expected_cols:
-        # If we can't extract from model, use defaults file keys + input keys
-        expected_cols = list(set(list(num_defaults.keys()) + list(cat_defaults.keys()) + list(input_dict.keys())))
-        print(f"[ml] Using fallback columns: {expected_cols}")
+        model_sha256 = None
+        if os.path.exists(source.model_path):
+            model_sha256 = _file_sha256(source.model_path)
+        self.version = source.version or (f"local-{model_sha256[:12]}" if model_sha256 else "dummy")
+
+        serving = _read_serving_schema(source.schema_path, model_sha256)
+        self.compiled = _load_compiled(source, model_sha256)
+        if self.compiled is not None:
+            MODEL_LOADS.inc(source="compiled")
+            self.schema = _build_schema(None, self.signature, self.compiled, source.defaults_path, serving)
+        else:
+            self.schema = _build_schema(self.get_model(), self.signature,
+                                        defaults_path=source.defaults_path, serving=serving)
+
+    def get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    m = None
+                    if os.path.exists(self.source.model_path):
+                        m = _load_model_from_disk(self.source.model_path)
+                        if m is not None:
+                            MODEL_LOADS.inc(source="pipeline")
+                        else:
+                            print("[ml] Failed to load real model. Using dummy.")
+                    self._model = m if m is not None else _dummy_model()
+        return self._model
 
-    if expected_cols:
-        row = _fill_row_with_defaults(input_dict, expected_cols, num_defaults, cat_defaults)
+    def has_pipeline(self):
+        return os.path.exists(self.source.model_path)
+
+    def warm(self):
+        """Load every engine this version may use and score one default row through each."""
+        row = [dict(self.schema.defaults)]
+        if self.compiled is not None:
+            self.compiled.predict_proba(self.schema.vectorize(row), 1)
+        if self.compiled is None or (ML_ENGINE != "compiled" and self.has_pipeline()):
+            _predict_proba(self.get_model(), _build_frame(self.schema, row, self.schema.vectorize(row)))
+        return self
+
+
+def _swap(bundle):
+    global _bundle
+    with _lock:
+        old, _bundle = _bundle, bundle
+    MODEL_SWAPS.inc()
+    if old is not None:
+        print(f"[ml] Model swapped: {old.version} -> {bundle.version}")
     else:
-        # No expected columns → use provided fields directly
-        row = dict(input_dict)
-    
-    print(f"[ml] Input: {input_dict}")
-    print(f"[ml] Row after defaults: {row}")
+        print(f"[ml] Serving model version {bundle.version}")
+
+
+def _load_active():
+    """The active ModelBundle, loading it (on this thread) if nothing is loaded yet."""
+    bundle = _bundle
+    if bundle is None:
+        with _lock:
+            bundle = _bundle
+            if bundle is None:
+                SCHEMA_CACHE.inc(result="miss")
+                bundle = ModelBundle(_current_source())
+                _swap(bundle)
+                return bundle
+    SCHEMA_CACHE.inc(result="hit")
+    return bundle
 
-    X = pd.DataFrame([row])
 
-    # ------------------------------------------------------------------
-    # Prediction logic — skip SMOTE at prediction
-    # ------------------------------------------------------------------
+def get_bundle():
+    """The active ModelBundle; loads it on first use and starts the registry watcher."""
+    bundle = _load_active()
+    if MODEL_WATCH_ENABLED:
+        _ensure_watcher()
+    return bundle
+
+
+def reload_model(force=False):
+    """
+    Load the currently active version off the request path, warm it and swap it in.
+    Returns the bundle now serving. Safe to call from any thread.
+    """
+    source = _current_source()
+    current = _bundle
+    if not force and current is not None and current.signature == source.signature:
+        return current
     try:
-        # If pipeline contains SMOTE, manually pre → clf
-        if hasattr(model, "named_steps") and 'smote' in model.named_steps:
-            pre = model.named_steps.get('pre', None)
-            clf = model.named_steps.get('clf', None)
-
-            if pre is not None and clf is not None:
-                X_trans = pre.transform(X)
-                proba = float(clf.predict_proba(X_trans)[:, 1][0])
-                pred = int(clf.predict(X_trans)[0])
-            else:
-                # fallback — try pipeline directly
-                proba = float(model.predict_proba(X)[:, 1][0])
-                pred = int(model.predict(X)[0])
+        bundle = ModelBundle(source).warm()
+    except Exception as e:
+        # Keep serving the old version
+        print(f"[ml] ERROR loading model version {source.version}: {type(e).__name__}: {e}")
+        return current
+    _swap(bundle)
+    return bundle
 
-        else:
-            # Normal pipeline
-            proba = float(model.predict_proba(X)[:, 1][0])
-            pred = int(model.predict(X)[0])
+
+class ModelWatcher:
+    """Background thread that polls the registry and hot-swaps new versions."""
+
+    def __init__(self, interval=SCHEMA_CHECK_INTERVAL):
+        self.interval = max(float(interval), 0.1)
+        self.pid = os.getpid()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ml-model-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                reload_model()
+            except Exception as e:
+                print("[ml] Model watcher error:", type(e).__name__, e)
+
+
+def _ensure_watcher():
+    global _watcher
+    # Threads do not survive fork: each worker process runs its own watcher
+    if _watcher is None or _watcher.pid != os.getpid():
+        with _lock:
+            if _watcher is None or _watcher.pid != os.getpid():
+                _watcher = ModelWatcher().start()
+
+
+def model_version():
+    return get_bundle().version
+
+
+CallbackGauge("ml_model_info", "Model version currently serving (value is always 1).",
+              lambda: {(_bundle.version,): 1} if _bundle is not None else None, ("version",))
+
+
+# ----------------------------------------------------------------------
+# HELPERS: frame building + scoring
+# ----------------------------------------------------------------------
+
+def _build_frame(schema, rows, data):
+    """Build one DataFrame for all rows from the filled column-wise data."""
+    import pandas as pd
+    if not schema.columns:
+        return pd.DataFrame(rows)
+
+    columns = list(schema.columns)
+    for c, dtype in schema.frame_dtypes.items():
+        data[c] = data[c].astype(dtype)
+    if not schema.strict:
+        for r in rows:
+            for k in r:
+                if k not in data:
+                    data[k] = [x.get(k) for x in rows]
+                    columns.append(k)
+    return pd.DataFrame(data, columns=columns)
+
+
+def _predict_proba(model, X, engine="pipeline"):
+    """
+    Return P(default) for every row of X with a single pass through the model.
+    SMOTE is skipped at prediction (pre → clf manually); for pre → clf pipelines
+    the transform and predict stages are timed separately.
+    """
+    try:
+        steps = getattr(model, "named_steps", None)
+        if steps is not None and set(steps) <= {"pre", "smote", "clf"} \
+                and "pre" in steps and "clf" in steps:
+            with PREDICT_STAGE_SECONDS.time(engine=engine, stage="transform"):
+                Xt = steps["pre"].transform(X)
+            with PREDICT_STAGE_SECONDS.time(engine=engine, stage="predict"):
+                return steps["clf"].predict_proba(Xt)[:, 1].astype(float)
+
+        # Other pipelines (or a bare estimator) — one call
+        with PREDICT_STAGE_SECONDS.time(engine=engine, stage="predict"):
+            return model.predict_proba(X)[:, 1].astype(float)
 
     except Exception as e:
         # Fallback
@@ -247,16 +1147,108 @@ def predict_default(input_dict: dict):
         import traceback
         traceback.print_exc()
         try:
-            pred = int(model.predict(X)[0])
-            proba = float(pred)
+            return np.asarray(model.predict(X), dtype=float)
         except Exception as e2:
             print("[ml] Fallback predict also failed:", e2)
-            pred = 0
-            proba = 0.0
+            return np.zeros(len(X), dtype=float)
+
+
+# ----------------------------------------------------------------------
+# PUBLIC: BATCH PREDICT
+# ----------------------------------------------------------------------
+
+# key -> fn; one hook per key however many apps register it
+_prediction_hooks = {}
+
+
+def add_prediction_hook(fn, key=None):
+    """
+    Call fn(rows, results) after every predict_many (used by shadow scoring).
+    Registering again under the same key (default: fn itself) replaces the
+    earlier hook, so repeated create_app() calls do not stack hooks.
+    """
+    _prediction_hooks[fn if key is None else key] = fn
+
+
+def remove_prediction_hook(key):
+    _prediction_hooks.pop(key, None)
 
-    print(f"[ml] Result: pred={pred}, proba={proba}")
-    return {
-        "predicted_label": pred,
-        "default_probability": proba
+
+def score_with(bundle, rows, engine_prefix=""):
+    """
+    Score rows with one specific ModelBundle. Each stage (key resolution +
+    defaults fill, DataFrame build, transform, predict) is recorded in the
+    ml_predict_stage_seconds histogram served at /metrics, under
+    engine=<engine_prefix><engine>.
+    """
+    schema = bundle.schema
+    compiled = bundle.compiled
+
+    use_compiled = compiled is not None and (
+        ML_ENGINE == "compiled"
+        or len(rows) <= COMPILED_MAX_ROWS
+        or not bundle.has_pipeline()  # no pipeline on disk to fall back to
+    )
+    engine = engine_prefix + ("compiled" if use_compiled else "pipeline")
+    with PREDICT_STAGE_SECONDS.time(engine=engine, stage="defaults_fill"):
+        rows = [schema.canonical(r) for r in rows]
+        data = schema.vectorize(rows)
+
+    if use_compiled:
+        with PREDICT_STAGE_SECONDS.time(engine=engine, stage="transform"):
+            X = compiled.transform(data, len(rows))
+        with PREDICT_STAGE_SECONDS.time(engine=engine, stage="predict"):
+            proba = 1.0 / (1.0 + np.exp(-compiled.margin(X)))
+    else:
+        with PREDICT_STAGE_SECONDS.time(engine=engine, stage="frame_build"):
+            X = _build_frame(schema, rows, data)
+        proba = _predict_proba(bundle.get_model(), X, engine)
+    labels = proba > DECISION_THRESHOLD
+    PREDICT_ROWS.inc(len(rows), engine=engine)
+
+    version = bundle.version
+    return [
+        {"predicted_label": int(l), "default_probability": float(p), "model_version": version}
+        for p, l in zip(proba.tolist(), labels.tolist())
+    ]
+
+
+def predict_many(rows):
+    """
+    Score a list of partial feature dictionaries in one model call.
+    Returns one {"predicted_label", "default_probability", "model_version"} dict
+    per row, in order.
+    """
+    if not rows:
+        return []
+
+    # One bundle for the whole call: a concurrent hot swap does not affect it
+    results = score_with(get_bundle(), rows)
+
+    for hook in list(_prediction_hooks.values()):
+        try:
+            hook(rows, results)
+        except Exception as e:
+            print("[ml] Prediction hook error:", type(e).__name__, e)
+    return results
+
+
+# ----------------------------------------------------------------------
+# PUBLIC: MAIN PREDICT FUNCTION
+# ----------------------------------------------------------------------
+
+def predict_default(input_dict: dict):
+    """
+    Accepts partial feature dictionary from frontend.
+    Returns:
+    {
+        "predicted_label": int,
+        "default_probability": float
     }
+    """
+    print(f"[ml] Input: {input_dict}")
+
+    out = predict_many([input_dict])[0]
 
+    print(f"[ml] Result: pred={out['predicted_label']}, proba={out['default_probability']}")
+    return out
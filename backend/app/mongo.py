@@ -0,0 +1,88 @@
+# backend/app/mongo.py
+#
+# MongoClient settings for create_app(). Everything comes from MONGO_* env vars
+# (or create_app(mongo_options=...)), and an unset variable leaves the value in
+# MONGO_URI / the driver default alone. Keyword options win over URI options in
+# pymongo, which is why only the configured ones are passed.
+
+import importlib.util
+import os
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+# option name -> (env var, parser, default); default None = driver / URI default
+_INT = int
+_BOOL = lambda v: str(v).lower() in ("1", "true", "yes")
+
+CLIENT_OPTIONS = {
+    # Per worker process: request threads + scoring/shadow threads, with headroom
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", _INT, 32),
+    # Keep a couple of connections open so the first requests after idle skip the handshake
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", _INT, 2),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", _INT, 300000),
+    # Fail a request that waits this long for a pooled connection instead of queueing forever
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", _INT, 5000),
+    # Driver default is 30 s, far longer than any client waits for a response
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", _INT, 5000),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", _INT, 5000),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", _INT, None),
+    "retryWrites": ("MONGO_RETRY_WRITES", _BOOL, True),
+    "retryReads": ("MONGO_RETRY_READS", _BOOL, True),
+    "w": ("MONGO_WRITE_CONCERN", lambda v: int(v) if str(v).isdigit() else v, None),
+    "appname": ("MONGO_APP_NAME", str, "loan-backend"),
+}
+
+# Tried in order; the server picks the first one it also supports
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy")
+
+# compressor -> module pymongo needs for it
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+# ----------------------------------------------------------------------
+# OPTIONS
+# ----------------------------------------------------------------------
+
+def available_compressors(requested=None):
+    """The requested wire compressors whose Python module is installed."""
+    requested = MONGO_COMPRESSORS if requested is None else requested
+    names = [c.strip().lower() for c in requested.split(",") if c.strip()]
+    usable = [c for c in names if c in _COMPRESSOR_MODULES
+              and importlib.util.find_spec(_COMPRESSOR_MODULES[c]) is not None]
+    skipped = sorted(set(names) - set(usable))
+    if skipped:
+        print(f"[mongo] Compressors not available (module missing): {', '.join(skipped)}")
+    return usable
+
+
+def client_options(overrides=None):
+    """
+    Keyword arguments for MongoClient(): env-configured pool, timeout, retry
+    and compression settings, updated with `overrides` (None values drop an option).
+    """
+    opts = {}
+    for name, (env, parse, default) in CLIENT_OPTIONS.items():
+        raw = os.getenv(env)
+        value = parse(raw) if raw not in (None, "") else default
+        if value is not None:
+            opts[name] = value
+
+    compressors = available_compressors()
+    if compressors:
+        opts["compressors"] = ",".join(compressors)
+
+    for name, value in (overrides or {}).items():
+        if value is None:
+            opts.pop(name, None)
+        else:
+            opts[name] = value
+    return opts
+
+
+def describe(opts):
+    """One-line summary of the pool settings for the startup log."""
+    keys = ("maxPoolSize", "minPoolSize", "waitQueueTimeoutMS", "serverSelectionTimeoutMS", "compressors")
+    return ", ".join(f"{k}={opts[k]}" for k in keys if k in opts)
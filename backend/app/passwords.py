@@ -0,0 +1,151 @@
+# backend/app/passwords.py
+#
+# Password hashing and verification on a bounded process pool.
+#
+# scrypt / pbkdf2 are deliberately CPU-bound; running them on the request thread
+# lets a login spike starve every other endpoint in the worker (including
+# /api/predict). Hashes run in a small ProcessPoolExecutor instead, with a cap
+# on outstanding jobs so a spike is rejected (503) rather than queued forever.
+# A hash that does not finish within PASSWORD_HASH_TIMEOUT is rejected the same
+# way, and a pool whose worker process died is replaced and the job retried once.
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+# Any werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000".
+# Changing it rehashes users' passwords on their next successful login.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Jobs allowed in flight (running + queued) per worker before new ones are refused
+PASSWORD_HASH_QUEUE_PER_WORKER = int(os.getenv("PASSWORD_HASH_QUEUE_PER_WORKER", "8"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has its maximum number of jobs, or a job timed out."""
+
+
+_pool = None
+_pool_pid = None
+_slots = None
+_pool_lock = threading.Lock()
+_method_prefix = None
+
+
+def _mp_context():
+    # fork is cheap and does not re-import the app's __main__ in the children
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+def _start_pool():
+    # caller holds _pool_lock
+    global _pool, _pool_pid, _slots
+    workers = max(PASSWORD_HASH_WORKERS, 1)
+    _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+    _slots = threading.BoundedSemaphore(workers * max(PASSWORD_HASH_QUEUE_PER_WORKER, 1))
+    _pool_pid = os.getpid()
+
+
+def get_pool():
+    """The process's hashing pool; recreated after a fork (e.g. a preloading server)."""
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _start_pool()
+    return _pool
+
+
+def _replace_pool(broken):
+    """Swap in a fresh pool after one of broken's worker processes died."""
+    with _pool_lock:
+        if _pool is broken:
+            print("[passwords] Hashing pool broken (worker process died); starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            _start_pool()
+
+
+def init_password_pool():
+    """Start the pool's worker processes now (called from create_app, before other threads start)."""
+    get_pool().submit(len, "").result()
+
+
+def _submit(fn, *args, retry=True):
+    """(pool, future) of fn(*args) on the hashing pool; a broken pool is replaced once."""
+    pool = get_pool()
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        fut = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        slots.release()
+        if not retry:
+            raise
+        _replace_pool(pool)
+        return _submit(fn, *args, retry=False)
+    except Exception:
+        slots.release()
+        raise
+    fut.add_done_callback(lambda _: slots.release())
+    return pool, fut
+
+
+def _call(fn, *args):
+    """
+    fn(*args) on the hashing pool, waiting at most PASSWORD_HASH_TIMEOUT.
+    PasswordHasherBusy when the pool is full or the job times out; a job lost
+    to a dead worker process is retried once on a fresh pool.
+    """
+    for attempt in (0, 1):
+        pool, fut = _submit(fn, *args)
+        try:
+            return fut.result(timeout=PASSWORD_HASH_TIMEOUT)
+        except FutureTimeout:
+            fut.cancel()  # frees its slot if it never started
+            raise PasswordHasherBusy() from None
+        except BrokenProcessPool:
+            if attempt:
+                raise
+            _replace_pool(pool)
+
+
+# ----------------------------------------------------------------------
+# PUBLIC
+# ----------------------------------------------------------------------
+
+def hash_password_async(password):
+    return _submit(generate_password_hash, password, PASSWORD_HASH_METHOD)[1]
+
+
+def hash_password(password):
+    return _call(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(pw_hash, password):
+    if not pw_hash:
+        return False
+    return _call(check_password_hash, pw_hash, password)
+
+
+def _configured_prefix():
+    # werkzeug expands defaults ("scrypt" -> "scrypt:32768:8:1"), so compare against a real hash
+    global _method_prefix
+    if _method_prefix is None:
+        _method_prefix = generate_password_hash("", PASSWORD_HASH_METHOD).split("$", 1)[0]
+    return _method_prefix
+
+
+def needs_rehash(pw_hash):
+    """True when pw_hash was produced with a different algorithm or cost than configured."""
+    return bool(pw_hash) and pw_hash.split("$", 1)[0] != _configured_prefix()
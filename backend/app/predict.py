@@ -1,14 +1,44 @@
+import os
 from flask import Blueprint, request, jsonify
-from .ml import predict_default
+from .ml import predict_many, model_version
+from .batcher import score_one, get_batcher, MICROBATCH_ENABLED
 
 bp = Blueprint("predict", __name__, url_prefix="/api")
 
+# Upper bound on rows accepted by one /predict/batch call
+PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "10000"))
+
 @bp.route("/predict", methods=["POST"])
 def route_predict():
     try:
         data = request.get_json(force=True) or {}
-        out = predict_default(data)
+        out = score_one(data)
         return jsonify(out), 200
     except Exception as e:
         print("Predict error:", e)
         return jsonify({"message": "ML prediction failed", "error": str(e)}), 500
+
+@bp.route("/predict/batch", methods=["POST"])
+def route_predict_batch():
+    data = request.get_json(force=True, silent=True)
+    # Accept either a bare list of rows or {"rows": [...]}
+    rows = data.get("rows") if isinstance(data, dict) else data
+    if not isinstance(rows, list):
+        return jsonify({"message": "expected a list of rows or {\"rows\": [...]}"}), 400
+    if len(rows) > PREDICT_BATCH_MAX_ROWS:
+        return jsonify({"message": f"too many rows (max {PREDICT_BATCH_MAX_ROWS})"}), 413
+    if not all(isinstance(r, dict) for r in rows):
+        return jsonify({"message": "every row must be an object"}), 400
+
+    try:
+        results = predict_many(rows)
+        return jsonify({"count": len(results), "results": results}), 200
+    except Exception as e:
+        print("Batch predict error:", e)
+        return jsonify({"message": "ML prediction failed", "error": str(e)}), 500
+
+@bp.route("/predict/stats", methods=["GET"])
+def route_predict_stats():
+    stats = get_batcher().stats() if MICROBATCH_ENABLED else {}
+    return jsonify({"microbatch_enabled": MICROBATCH_ENABLED, "batcher": stats,
+                    "model_version": model_version()}), 200
@@ -0,0 +1,277 @@
+# backend/app/scoring.py
+#
+# Scoring of loan applications outside the request path.
+#
+# create_application either scores inline and inserts the document with its
+# ml_score in a single write, or (when scoring is slow, or LOAN_SCORING_MODE=async)
+# inserts it with ml_score: null and hands it to the ScoringWorker below.
+# The worker drains an in-memory queue in batches, scores each batch with one
+# predict_many call and writes the results back with a single bulk_write.
+# A recovery sweep re-queues any ml_score: null documents, e.g. after a restart,
+# one page (the queue's free capacity) per lease tick, resuming after the last
+# _id it queued. Only the holder of a lease document in scoring_locks sweeps,
+# so N workers (and pods) do not each score every unscored document.
+
+import datetime
+import os
+import queue
+import socket
+import threading
+import time
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from .ml import predict_many
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+# inline | async | auto (inline while recent scoring latency is under the budget)
+SCORING_MODE = os.getenv("LOAN_SCORING_MODE", "auto").lower()
+INLINE_BUDGET_MS = float(os.getenv("SCORING_INLINE_BUDGET_MS", "50"))
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "2"))
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "256"))
+# Seconds between recovery sweeps for unscored applications (0 = only at startup)
+SWEEP_INTERVAL = float(os.getenv("SCORING_SWEEP_INTERVAL", "300"))
+# Most applications queued at once; the sweep only tops the queue up to this
+QUEUE_CAPACITY = int(os.getenv("SCORING_QUEUE_CAPACITY", "4096"))
+# Seconds to the next lease tick while a sweep has more pages to queue
+SWEEP_RESUME_INTERVAL = 2.0
+
+# Weight of the newest sample in the scoring-latency moving average
+_EWMA_ALPHA = 0.2
+
+# Lease taken by the worker that runs the recovery sweep
+LOCK_COLLECTION = "scoring_locks"
+SWEEP_LOCK_ID = "recovery_sweep"
+# Lease length when sweeping only at startup (SCORING_SWEEP_INTERVAL=0)
+STARTUP_SWEEP_LEASE = 300.0
+
+
+def application_features(app_doc):
+    """Model input for a stored loan application."""
+    return {
+        "Age": app_doc.get("age"),
+        "Income": (app_doc.get("monthly_income") or 0) * 12,
+        "LoanAmount": app_doc.get("loan_amount"),
+        "CreditScore": app_doc.get("credit_score"),
+        "EmploymentType": app_doc.get("employment_type"),
+        "MaritalStatus": app_doc.get("marital_status"),
+        "location": app_doc.get("location"),
+        "gender": app_doc.get("gender")
+    }
+
+
+class ScoringWorker:
+    """Background pool that scores pending applications in batches."""
+
+    def __init__(self, collection, workers=SCORING_WORKERS, batch_size=SCORING_BATCH_SIZE,
+                 mode=SCORING_MODE, inline_budget_ms=INLINE_BUDGET_MS, sweep_interval=SWEEP_INTERVAL,
+                 queue_capacity=QUEUE_CAPACITY):
+        self.collection = collection
+        self.workers = max(int(workers), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.mode = mode
+        self.inline_budget = inline_budget_ms / 1000.0
+        self.sweep_interval = sweep_interval
+        self.queue_capacity = max(int(queue_capacity), self.batch_size)
+        self._queue = queue.Queue()
+        self._sweep_after = None  # _id the unfinished sweep resumes after
+        self._sweep_more = False
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._latency = None
+        self._threads = []
+        self._stop = threading.Event()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._threads:
+            return self
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"scoring-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._sweep_loop, name="scoring-sweep", daemon=True)
+        t.start()
+        self._threads.append(t)
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Request side
+    # ------------------------------------------------------------------
+
+    def should_score_inline(self):
+        if self.mode == "inline":
+            return True
+        if self.mode == "async":
+            return False
+        # auto: inline until scoring is observed to be slow or a backlog builds up
+        if self._queue.qsize() >= self.batch_size:
+            return False
+        return self._latency is None or self._latency <= self.inline_budget
+
+    def observe_latency(self, seconds):
+        """Feed the moving average with the latency of scoring one application."""
+        prev = self._latency
+        self._latency = seconds if prev is None else prev + _EWMA_ALPHA * (seconds - prev)
+
+    def enqueue(self, app_id, features):
+        with self._pending_lock:
+            if app_id in self._pending:
+                return False
+            self._pending.add(app_id)
+        self._queue.put((app_id, features))
+        return True
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _take_batch(self):
+        try:
+            batch = [self._queue.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                self.score_batch(batch)
+            except Exception as e:
+                # Documents stay ml_score: null and are picked up by the next sweep
+                print("Background scoring error:", type(e).__name__, e)
+            finally:
+                with self._pending_lock:
+                    for app_id, _ in batch:
+                        self._pending.discard(app_id)
+
+    def score_batch(self, batch):
+        t0 = time.perf_counter()
+        results = predict_many([features for _, features in batch])
+        if batch:
+            # per application, like the inline calls it is compared against: a large
+            # backlog batch must not push every later request onto the async path
+            self.observe_latency((time.perf_counter() - t0) / len(batch))
+
+        ops = [
+            UpdateOne(
+                {"_id": app_id, "ml_score": None},
+                {"$set": {
+                    "ml_score": res["default_probability"],
+                    "ml_label": res["predicted_label"],
+                    "model_version": res.get("model_version")
+                }}
+            )
+            for (app_id, _), res in zip(batch, results)
+        ]
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def recover(self):
+        """
+        Queue the next page of applications still waiting for a score: at most
+        the queue's free capacity, in _id order after the previous page. Returns
+        how many were queued; sweep_pending() is True while pages remain.
+        """
+        limit = self.queue_capacity - self._queue.qsize()
+        if limit <= 0:
+            self._sweep_more = True  # the workers are behind; the next tick resumes from the same _id
+            return 0
+        query = {"ml_score": None}
+        if self._sweep_after is not None:
+            query["_id"] = {"$gt": self._sweep_after}
+        docs = list(self.collection.find(query).sort("_id", 1).limit(limit))
+        queued = 0
+        for doc in docs:
+            if self.enqueue(doc["_id"], application_features(doc)):
+                queued += 1
+        # a short page means the sweep reached the end; the next one starts over
+        self._sweep_more = len(docs) == limit
+        self._sweep_after = docs[-1]["_id"] if self._sweep_more else None
+        if queued:
+            print(f"Scoring recovery: queued {queued} unscored applications"
+                  + (" (more to come)" if self.sweep_pending() else ""))
+        return queued
+
+    def sweep_pending(self):
+        return self._sweep_more
+
+    def acquire_sweep_lease(self):
+        """
+        Take or renew the recovery-sweep lease in LOCK_COLLECTION. True when this
+        worker holds it: the lease is free, expired or already ours. The lease
+        outlives one sweep interval, so the holder keeps it while it is alive.
+        """
+        lease = self.sweep_interval * 1.5 if self.sweep_interval > 0 else STARTUP_SWEEP_LEASE
+        now = datetime.datetime.utcnow()
+        locks = self.collection.database[LOCK_COLLECTION]
+        try:
+            doc = locks.find_one_and_update(
+                {"_id": SWEEP_LOCK_ID, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + datetime.timedelta(seconds=lease)}},
+                upsert=True, return_document=ReturnDocument.AFTER)
+        except DuplicateKeyError:
+            return False  # held by another worker: the upsert collided with its document
+        return doc is not None and doc.get("owner") == self.owner
+
+    def _sweep_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.acquire_sweep_lease():
+                    self.recover()
+                else:
+                    # another worker sweeps; start over if this one takes over later
+                    self._sweep_after, self._sweep_more = None, False
+            except Exception as e:
+                print("Scoring recovery error:", type(e).__name__, e)
+            if self.sweep_pending():
+                wait = SWEEP_RESUME_INTERVAL
+            elif self.sweep_interval > 0:
+                wait = self.sweep_interval
+            else:
+                return
+            if self._stop.wait(wait):
+                return
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize(),
+            "pending": len(self._pending),
+            "sweep_pending": self.sweep_pending(),
+            "latency_ms": self._latency * 1000.0 if self._latency is not None else None,
+        }
+
+
+def init_scoring(app):
+    """
+    Attach a ScoringWorker to the app as app.scoring. It is started by
+    server.start_background (per worker under a pre-forking server).
+    """
+    app.scoring = ScoringWorker(app.mongo.loan_applications)
+    return app.scoring
@@ -0,0 +1,127 @@
+# backend/app/server.py
+#
+# Process-level plumbing for running the app under a pre-forking server
+# (gunicorn.conf.py): CPU-quota-aware sizing, model warmup before the
+# readiness probe passes, and opening the Mongo client and (re)starting
+# background threads in each worker.
+
+import math
+import os
+import threading
+import time
+
+
+# ----------------------------------------------------------------------
+# CPU QUOTA
+# ----------------------------------------------------------------------
+
+def _read(path):
+    try:
+        with open(path) as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_quota():
+    """
+    CPUs this container may use: the cgroup CPU limit when one is set (a k8s
+    `limits.cpu: 500m` reads as 0.5), else the CPUs the process is pinned to.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return max(int(quota) / int(period), 0.01)
+    # cgroup v1
+    quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return max(int(quota) / int(period), 0.01)
+    try:
+        return float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return float(os.cpu_count() or 1)
+
+
+def worker_count(cpus=None):
+    """
+    One worker process per (rounded-up) CPU: scoring and hashing are CPU-bound,
+    so more processes than cores only adds memory and context switches.
+    I/O waits (MongoDB) are covered by threads inside each worker.
+    """
+    cpus = cpu_quota() if cpus is None else cpus
+    return max(1, math.ceil(cpus - 0.25)) if cpus >= 1 else 1
+
+
+# ----------------------------------------------------------------------
+# WARMUP + BACKGROUND WORK
+# ----------------------------------------------------------------------
+
+def warmup(app, prefork=True):
+    """
+    Load the model and score one dummy row before the app reports ready.
+    In a pre-forking server this runs once in the master (preload), so the
+    workers inherit a loaded model; app.ready gates GET /api/auth/ready.
+    """
+    from .ml import preload, score_with
+
+    t0 = time.perf_counter()
+    bundle = preload(freeze=prefork)
+    # score_with, not predict_many: no watcher thread or shadow hook in a pre-fork master
+    score_with(bundle, [dict(bundle.schema.defaults)])
+    app.ready = True
+    print(f"[server] Warmed up model {bundle.version} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return app
+
+
+def warmup_async(app):
+    """Run warmup() on a background thread (single-process servers); returns the thread."""
+    def run():
+        try:
+            warmup(app, prefork=False)
+        except Exception as e:
+            print("ML load warning:", e)
+
+    t = threading.Thread(target=run, name="ml-warmup", daemon=True)
+    t.start()
+    return t
+
+
+def start_background(app):
+    """
+    Start the per-process background work: password hashing pool, metrics
+    flusher, application scoring worker and shadow scorer. Threads and pools do not survive fork(),
+    so a pre-forking server calls this in each worker after the fork.
+    """
+    from .passwords import init_password_pool
+    try:
+        init_password_pool()
+    except Exception as e:
+        print("Password pool warning:", e)
+
+    from .metrics import start_flusher
+    start_flusher()
+
+    scoring = getattr(app, "scoring", None)
+    if scoring is not None:
+        scoring.start()
+    shadow = getattr(app, "shadow", None)
+    if shadow is not None:
+        shadow.start()
+    return app
+
+
+def start_worker(app):
+    """
+    gunicorn post_worker_init: open this worker's own MongoClient when the app
+    was built in a pre-fork master (create_app(prefork=True) closes its client
+    before the fork), attach the scoring worker / shadow scorer to it, then
+    start_background().
+    """
+    if getattr(app, "mongo", None) is None:
+        from . import connect_mongo, init_mongo_workers
+        connect_mongo(app)
+        init_mongo_workers(app)
+    return start_background(app)
@@ -0,0 +1,270 @@
+# backend/app/shadow.py
+#
+# Shadow scoring of a candidate model on live traffic.
+#
+# When ML_SHADOW_MODEL names a candidate (a registry version or a .joblib path such
+# as models/xgb_improved.joblib), every predict_many call offers a random
+# ML_SHADOW_SAMPLE_PCT percent of its rows to a background thread. That thread scores
+# them with the candidate and stores primary and candidate scores side by side in
+# the shadow_scores collection. The primary response never waits for the candidate:
+# offering a row is a non-blocking put on a bounded queue (rows are dropped when it
+# is full), and the candidate may use at most ML_SHADOW_MAX_DUTY of one core.
+
+import datetime
+import os
+import queue
+import random
+import threading
+import time
+
+from . import ml
+from .metrics import SHADOW_ROWS
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+SHADOW_MODEL = os.getenv("ML_SHADOW_MODEL", "").strip()
+SHADOW_SAMPLE_PCT = float(os.getenv("ML_SHADOW_SAMPLE_PCT", "0"))
+SHADOW_QUEUE_MAX = int(os.getenv("ML_SHADOW_QUEUE_MAX", "1000"))
+SHADOW_BATCH_SIZE = int(os.getenv("ML_SHADOW_BATCH_SIZE", "256"))
+# Fraction of wall time the candidate may spend scoring (0.1 = 10% of one core)
+SHADOW_MAX_DUTY = float(os.getenv("ML_SHADOW_MAX_DUTY", "0.1"))
+
+# ml.add_prediction_hook key of the active shadow scorer
+HOOK_KEY = "shadow"
+
+# Score differences (candidate - primary) bucketed by the drift report
+DRIFT_BOUNDARIES = [-1.0, -0.2, -0.1, -0.05, -0.01, 0.01, 0.05, 0.1, 0.2, 1.0001]
+
+
+class ShadowScorer:
+    """Scores a sample of live rows with a candidate model off the request path."""
+
+    def __init__(self, collection, spec, sample_pct=SHADOW_SAMPLE_PCT, queue_max=SHADOW_QUEUE_MAX,
+                 batch_size=SHADOW_BATCH_SIZE, max_duty=SHADOW_MAX_DUTY):
+        self.collection = collection
+        self.spec = spec
+        self.rate = min(max(sample_pct, 0.0), 100.0) / 100.0
+        self.batch_size = max(int(batch_size), 1)
+        self.max_duty = min(max(max_duty, 0.01), 1.0)
+        self.candidate = None
+        self._queue = queue.Queue(maxsize=max(int(queue_max), 1))
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._offered = 0
+        self._dropped = 0
+        self._scored = 0
+        self._errors = 0
+        self._busy_seconds = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="ml-shadow", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Request side: sample and enqueue, never block
+    # ------------------------------------------------------------------
+
+    def offer(self, rows, results):
+        if self.candidate is None or self.rate <= 0:
+            return
+        now = datetime.datetime.utcnow()
+        sampled = dropped = 0
+        for row, res in zip(rows, results):
+            if random.random() >= self.rate:
+                continue
+            sampled += 1
+            try:
+                self._queue.put_nowait((row, res, now))
+            except queue.Full:
+                dropped += 1
+        if sampled:
+            with self._stats_lock:
+                self._offered += sampled
+                self._dropped += dropped
+            if dropped:
+                SHADOW_ROWS.inc(dropped, outcome="dropped")
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _load_candidate(self):
+        source = ml.source_for(self.spec)
+        if not any(os.path.exists(p) for p in (source.model_path, source.compiled_path,
+                                                ml.mmap_path_for(source.compiled_path))):
+            print(f"[shadow] Candidate model {self.spec} not found. Shadow scoring disabled.")
+            return None
+        bundle = ml.ModelBundle(source).warm()
+        print(f"[shadow] Scoring {self.rate * 100:g}% of traffic with candidate {bundle.version}")
+        return bundle
+
+    def _take_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            self.candidate = self._load_candidate()
+        except Exception as e:
+            print("[shadow] Candidate load error:", type(e).__name__, e)
+        if self.candidate is None:
+            return
+
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            t0 = time.perf_counter()
+            try:
+                self.score_batch(batch)
+            except Exception as e:
+                print("[shadow] Scoring error:", type(e).__name__, e)
+                with self._stats_lock:
+                    self._errors += len(batch)
+                SHADOW_ROWS.inc(len(batch), outcome="error")
+            busy = time.perf_counter() - t0
+            with self._stats_lock:
+                self._busy_seconds += busy
+            # Idle long enough that scoring stays under max_duty of wall time
+            self._stop.wait(busy * (1.0 - self.max_duty) / self.max_duty)
+
+    def score_batch(self, batch):
+        candidate = self.candidate
+        t0 = time.perf_counter()
+        scores = ml.score_with(candidate, [row for row, _, _ in batch], engine_prefix="shadow_")
+        per_row_ms = (time.perf_counter() - t0) * 1000.0 / len(batch)
+
+        docs = [
+            {
+                "created_at": created_at,
+                "features": row,
+                "primary_version": primary.get("model_version"),
+                "primary_score": primary["default_probability"],
+                "primary_label": primary["predicted_label"],
+                "candidate_version": cand["model_version"],
+                "candidate_score": cand["default_probability"],
+                "candidate_label": cand["predicted_label"],
+                "candidate_ms": per_row_ms,
+            }
+            for (row, primary, created_at), cand in zip(batch, scores)
+        ]
+        self.collection.insert_many(docs, ordered=False)
+        with self._stats_lock:
+            self._scored += len(docs)
+        SHADOW_ROWS.inc(len(docs), outcome="scored")
+        return len(docs)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "candidate": self.spec,
+                "candidate_version": self.candidate.version if self.candidate is not None else None,
+                "sample_pct": self.rate * 100.0,
+                "max_duty": self.max_duty,
+                "queue_depth": self._queue.qsize(),
+                "offered": self._offered,
+                "dropped": self._dropped,
+                "scored": self._scored,
+                "errors": self._errors,
+                "busy_seconds": self._busy_seconds,
+            }
+
+
+def drift_report(collection, candidate_version=None, since=None):
+    """
+    Agreement rate and score drift between primary and candidate, from the
+    shadow_scores collection, in one aggregation.
+    """
+    match = {}
+    if candidate_version:
+        match["candidate_version"] = candidate_version
+    if since is not None:
+        match["created_at"] = {"$gte": since}
+
+    diff = {"$subtract": ["$candidate_score", "$primary_score"]}
+    pipeline = [
+        {"$match": match},
+        {"$facet": {
+            "summary": [{"$group": {
+                "_id": None,
+                "count": {"$sum": 1},
+                "agree": {"$sum": {"$cond": [{"$eq": ["$primary_label", "$candidate_label"]}, 1, 0]}},
+                "newly_flagged": {"$sum": {"$cond": [
+                    {"$and": [{"$eq": ["$primary_label", 0]}, {"$eq": ["$candidate_label", 1]}]}, 1, 0]}},
+                "newly_cleared": {"$sum": {"$cond": [
+                    {"$and": [{"$eq": ["$primary_label", 1]}, {"$eq": ["$candidate_label", 0]}]}, 1, 0]}},
+                "mean_primary": {"$avg": "$primary_score"},
+                "mean_candidate": {"$avg": "$candidate_score"},
+                "mean_diff": {"$avg": diff},
+                "mean_abs_diff": {"$avg": {"$abs": diff}},
+                "max_abs_diff": {"$max": {"$abs": diff}},
+                "candidate_ms": {"$avg": "$candidate_ms"},
+                "first": {"$min": "$created_at"},
+                "last": {"$max": "$created_at"},
+            }}],
+            "diff_histogram": [
+                {"$bucket": {"groupBy": diff, "boundaries": DRIFT_BOUNDARIES,
+                             "default": "other", "output": {"count": {"$sum": 1}}}}
+            ],
+            "versions": [{"$group": {"_id": {"primary": "$primary_version",
+                                             "candidate": "$candidate_version"},
+                                     "count": {"$sum": 1}}}],
+        }},
+    ]
+    facets = next(iter(collection.aggregate(pipeline)), {})
+
+    summary = (facets.get("summary") or [{}])[0]
+    summary.pop("_id", None)
+    count = summary.get("count", 0)
+    summary["count"] = count
+    summary["agreement_rate"] = (summary.get("agree", 0) / count) if count else None
+    for k in ("first", "last"):
+        if summary.get(k) is not None:
+            summary[k] = summary[k].isoformat()
+
+    hist = {b["_id"]: b["count"] for b in facets.get("diff_histogram", [])}
+    return {
+        "candidate_version": candidate_version,
+        "summary": summary,
+        "diff_histogram": [
+            {"min": lo, "max": min(hi, 1.0), "count": hist.get(lo, 0)}
+            for lo, hi in zip(DRIFT_BOUNDARIES[:-1], DRIFT_BOUNDARIES[1:])
+        ],
+        "versions": [
+            {"primary": v["_id"].get("primary"), "candidate": v["_id"].get("candidate"),
+             "count": v["count"]}
+            for v in facets.get("versions", [])
+        ],
+    }
+
+
+def init_shadow(app):
+    """
+    Attach a ShadowScorer as app.shadow when a candidate is configured, else None.
+    It is started by server.start_background (per worker under a pre-forking server).
+    """
+    app.shadow = None
+    if not SHADOW_MODEL or SHADOW_SAMPLE_PCT <= 0:
+        ml.remove_prediction_hook(HOOK_KEY)
+        return None
+    app.shadow = ShadowScorer(app.mongo.shadow_scores, SHADOW_MODEL)
+    # one shadow hook per process: a later create_app() replaces the earlier scorer's
+    ml.add_prediction_hook(app.shadow.offer, key=HOOK_KEY)
+    return app.shadow
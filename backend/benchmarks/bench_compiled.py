@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Benchmark: sklearn/XGBoost pipeline vs the compiled NumPy evaluator.
+
+Reports single-row latency and batch latency/throughput for both engines.
+Requires models/xgb_loan_model.compiled.npz (python export_compiled_model.py).
+
+    cd backend
+    python benchmarks/bench_compiled.py --batch-sizes 1 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import joblib  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app import ml  # noqa: E402
+from export_compiled_model import random_rows, _pipeline_parts  # noqa: E402
+
+
+def timeit(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    model = joblib.load(ml.MODEL_PATH)
+    pre, clf = _pipeline_parts(model)
+    with np.load(ml.COMPILED_MODEL_PATH, allow_pickle=False) as arrays:
+        compiled = ml.CompiledModel(arrays)
+
+    print(f"{'rows':>7} {'pipeline p50':>14} {'compiled p50':>14} {'speedup':>8} {'compiled rows/s':>16}")
+    for n in args.batch_sizes:
+        rows = random_rows(compiled, n, seed=n)
+        columns = {c: [r.get(c) for r in rows] for c in compiled.columns}
+        repeat = max(3, args.repeat if n <= 1000 else args.repeat // 10)
+
+        def run_pipeline():
+            X = pd.DataFrame(columns, columns=compiled.columns)
+            clf.predict_proba(pre.transform(X))
+
+        def run_compiled():
+            compiled.predict_proba(columns, n)
+
+        run_pipeline()
+        run_compiled()
+        p50_pipe, _ = timeit(run_pipeline, repeat)
+        p50_comp, p99_comp = timeit(run_compiled, repeat)
+        print(f"{n:>7} {p50_pipe * 1000:>12.3f}ms {p50_comp * 1000:>12.3f}ms "
+              f"{p50_pipe / p50_comp:>7.1f}x {n / p50_comp:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
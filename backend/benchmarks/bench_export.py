@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark: streaming export of loan applications.
+
+Seeds N synthetic applications, then streams /api/admin/loan/applications/export
+through the Flask test client, reporting rows/s, bytes written and RSS growth
+while the export runs (memory should stay flat regardless of N).
+
+    cd backend
+    python benchmarks/bench_export.py --rows 1000000 --mongo-uri mongodb://localhost:27017/loan_bench
+    python benchmarks/bench_export.py --rows 100000 --mongomock     # no mongod needed
+
+Note: mongomock copies every matching document when a cursor is opened, so RSS
+growth is only meaningful against a real mongod.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def rss_mb():
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def seed(collection, n, chunk=10000):
+    rng = random.Random(42)
+    base = datetime.datetime(2024, 1, 1)
+    statuses = ["PENDING", "APPROVED", "REJECTED"]
+    t0 = time.perf_counter()
+    for start in range(0, n, chunk):
+        docs = []
+        for i in range(start, min(n, start + chunk)):
+            score = rng.random()
+            docs.append({
+                "full_name": f"Applicant {i}",
+                "age": rng.randint(18, 70),
+                "employment_type": rng.choice(["Full-time", "Part-time", "Self-employed"]),
+                "monthly_income": float(rng.randint(1000, 20000)),
+                "loan_amount": float(rng.randint(5000, 500000)),
+                "loan_purpose": rng.choice(["Home", "Auto", "Business", "Education"]),
+                "existing_debts": float(rng.randint(0, 50000)),
+                "credit_history_flag": rng.random() < 0.8,
+                "credit_score": rng.randint(300, 850),
+                "marital_status": rng.choice(["Married", "Single", "Divorced"]),
+                "ml_score": score,
+                "ml_label": int(score > 0.5),
+                "decision_status": rng.choice(statuses),
+                "created_at": base + datetime.timedelta(seconds=i)
+            })
+        collection.insert_many(docs, ordered=False)
+    print(f"Seeded {n} documents in {time.perf_counter() - t0:.1f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1000000)
+    ap.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017/loan_bench"))
+    ap.add_argument("--mongomock", action="store_true", help="use an in-memory mongomock database")
+    ap.add_argument("--formats", nargs="+", default=["ndjson", "csv", "csv-gzip"])
+    args = ap.parse_args()
+
+    os.environ["MONGO_URI"] = args.mongo_uri
+    import app as app_module
+    if args.mongomock:
+        import mongomock
+        app_module.MongoClient = lambda uri, **kw: mongomock.MongoClient(uri)
+
+    from flask_jwt_extended import create_access_token
+    app = app_module.create_app()
+    app.scoring.stop()
+    col = app.mongo.loan_applications
+    col.delete_many({})
+    seed(col, args.rows)
+
+    with app.app_context():
+        token = create_access_token(identity="bench", additional_claims={"role": "admin"})
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for fmt in args.formats:
+        query = {"format": fmt.split("-")[0]}
+        if fmt.endswith("-gzip"):
+            query["gzip"] = "1"
+        before = rss_mb()
+        peak = before
+        total = 0
+        t0 = time.perf_counter()
+        resp = client.get("/api/admin/loan/applications/export", query_string=query,
+                          headers=headers, buffered=False)
+        for chunk in resp.response:
+            total += len(chunk)
+            peak = max(peak, rss_mb())
+        resp.close()
+        elapsed = time.perf_counter() - t0
+        print(f"{fmt:<10} rows={args.rows:<8} time={elapsed:7.2f}s rows/s={args.rows / elapsed:10.0f} "
+              f"bytes={total / 1e6:8.1f}MB rss_before={before:7.1f}MB rss_peak={peak:7.1f}MB "
+              f"growth={peak - before:6.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+Feature-engineering parity check and per-row cost (app/features.py).
+
+Parity: writes a synthetic Loan_default-shaped CSV (plus edge rows: zero /
+missing income, credit scores on and outside the bin edges, missing and
+oddly-cased flags), then derives loan_to_income, credit_bin,
+has_cosigner_flag and is_salaried three ways and requires them to match
+exactly:
+
+  training   train/data.py's .npy cache (load_dataset), checked against the
+             pandas add_features it replaced
+  serving    ModelSchema.canonical + vectorize on the CSV rows sent as request
+             dicts, once with string values and once with typed ones
+  row        features.derive_row on every row vs the batch derive_columns
+
+With --model (a training output with its .schema.json), the model's
+probabilities for the request dicts (app/ml.py's pipeline path) must also
+equal its probabilities for the cached training frame.
+
+Defaults: for --model (else the served model) without its schema, i.e. with
+defaults from the pipeline and the shipped models/feature_defaults.json, the
+scores for the request dicts must equal the scores with the missing values
+left to the pipeline's imputers, over all rows and for the row with no
+CreditScore, whose credit_bin default must be a category the model knows.
+
+Exits 1 on any mismatch. Cost: derive_row per row, derive_columns per row at
+several batch sizes, and what deriving adds to ModelSchema.vectorize.
+
+    cd backend
+    python benchmarks/bench_features.py
+    python benchmarks/bench_features.py --rows 200000 --batch-sizes 1 100 10000
+    python benchmarks/bench_features.py --model models/trained/xgb_improved.joblib --skip-bench
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import features, ml  # noqa: E402
+from app.ml import ModelSchema  # noqa: E402
+from train.data import load_dataset, sniff_dtypes  # noqa: E402
+from train.synthetic import synthetic_frame  # noqa: E402
+
+DERIVED = ("loan_to_income", "credit_bin", "has_cosigner_flag", "is_salaried")
+NUMERIC = ("Age", "Income", "LoanAmount", "CreditScore", "MonthsEmployed", "NumCreditLines",
+           "InterestRate", "LoanTerm", "DTIRatio")
+
+EDGE_ROWS = [
+    {"Income": 0}, {"Income": None}, {"LoanAmount": None}, {"Income": 0, "LoanAmount": None},
+    {"LoanAmount": 1, "Income": 3}, {"LoanAmount": 123457, "Income": 98765.43},
+    {"CreditScore": 0}, {"CreditScore": 0.5}, {"CreditScore": 580}, {"CreditScore": 580.01},
+    {"CreditScore": 670}, {"CreditScore": 740}, {"CreditScore": 800}, {"CreditScore": 1000},
+    {"CreditScore": 1000.5}, {"CreditScore": -3}, {"CreditScore": None},
+    {"HasDependents": None}, {"HasDependents": "yes"}, {"HasDependents": "TRUE"},
+    {"HasDependents": "1"}, {"HasDependents": "Y"}, {"HasDependents": "n"},
+    {"EmploymentType": "Salaried"}, {"EmploymentType": "SALARIED staff"}, {"EmploymentType": None},
+]
+
+
+def legacy_add_features(df):
+    """train/data.py's pandas add_features before app/features.py, for the training check."""
+    if 'LoanAmount' in df.columns and 'Income' in df.columns:
+        ratio = df['LoanAmount'] / df['Income'].replace(0, np.nan)
+        df['loan_to_income'] = ratio.fillna(0).astype(np.float32)
+    if 'CreditScore' in df.columns:
+        df['credit_bin'] = pd.cut(df['CreditScore'], bins=features.CREDIT_BINS, labels=features.CREDIT_LABELS)
+    for col in features.COSIGNER_COLUMNS:
+        if col in df.columns:
+            df['has_cosigner_flag'] = df[col].astype(str).str.lower() \
+                .isin(['1', 'yes', 'true', 'y']).astype(np.int8)
+            break
+    for col in features.EMPLOYMENT_COLUMNS:
+        if col in df.columns:
+            df['is_salaried'] = df[col].astype(str).str.lower().str.contains('salar').astype(np.int8)
+            break
+    return df
+
+
+def write_csv(path, rows):
+    df = synthetic_frame(rows)
+    edges = []
+    for i, edge in enumerate(EDGE_ROWS):
+        row = df.iloc[i % len(df)].to_dict()
+        row.update(edge)
+        edges.append(row)
+    df = pd.concat([df, pd.DataFrame(edges)], ignore_index=True)
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+def request_rows(csv_path, typed):
+    """CSV rows as request dicts: empty -> None, numbers as strings or floats."""
+    out = []
+    with open(csv_path, newline="") as fh:
+        for r in csv.DictReader(fh):
+            row = {}
+            for k, v in r.items():
+                if v == "":
+                    row[k] = None
+                elif typed and k in NUMERIC:
+                    row[k] = float(v)
+                else:
+                    row[k] = v
+            out.append(row)
+    return out
+
+
+def schema_for(frame):
+    """ModelSchema over the training frame's columns, defaults = medians / modes."""
+    dtypes, defaults, categories = {}, {}, {}
+    for c in frame.columns:
+        s = frame[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            dtypes[c] = "categorical"
+            defaults[c] = str(s.mode().iloc[0])
+            categories[c] = [str(v) for v in s.cat.categories]
+        else:
+            dtypes[c] = "numeric"
+            defaults[c] = float(np.nanmedian(s.to_numpy(np.float64)))
+    num = {c: d for c, d in defaults.items() if dtypes[c] == "numeric"}
+    cat = {c: d for c, d in defaults.items() if dtypes[c] == "categorical"}
+    return ModelSchema(list(frame.columns), dtypes, defaults, num, cat, True, "bench", categories)
+
+
+def compare(name, expected, got):
+    """Count of rows where got != expected; NaN == NaN, None == NaN."""
+    bad = 0
+    for e, g in zip(expected, got):
+        e_missing = e is None or (isinstance(e, float) and e != e)
+        g_missing = g is None or (isinstance(g, float) and g != g)
+        if e_missing != g_missing or (not e_missing and e != g):
+            bad += 1
+    if len(expected) != len(got):
+        bad += abs(len(expected) - len(got))
+    print(f"  {name:<36} {'ok' if not bad else f'{bad} MISMATCHED'}")
+    return bad
+
+
+def check_model(model_path, cached, rows):
+    """Mismatches between the model's scores for the training frame and for the request dicts."""
+    import joblib
+    model = joblib.load(model_path)
+    serving = ml._read_serving_schema(ml.serving_schema_path_for(model_path))
+    if serving is None:
+        print(f"model: no serving schema next to {model_path}")
+        return 1
+    schema = ml._build_schema(model, "bench", serving=serving)
+    expected = model.predict_proba(cached[list(schema.columns)])[:, 1]
+    rows = [schema.canonical(r) for r in rows]
+    got = ml._predict_proba(model, ml._build_frame(schema, rows, schema.vectorize(rows)))
+    bad = int((got != expected).sum())
+    print(f"model (pipeline on requests vs training frame): "
+          f"{'ok' if not bad else f'{bad} MISMATCHED'} (max |diff| {np.abs(got - expected).max():.3g})")
+    return bad
+
+
+def check_defaults(model_path, cached, rows):
+    """
+    Without the serving schema (defaults from the pipeline + feature_defaults.json),
+    the model's scores for the request dicts must equal its scores with the
+    missing values left to its own imputers.
+    """
+    import joblib
+    model = joblib.load(model_path)
+    schema = ml._build_schema(model, "bench", defaults_path=ml.DEFAULTS_PATH)
+    bad = 0
+    if "credit_bin" in schema.defaults:
+        default = schema.defaults["credit_bin"]
+        known = default in schema.categories.get("credit_bin", ())
+        print(f"defaults: credit_bin default {default!r} {'ok' if known else 'NOT A TRAINED CATEGORY'}")
+        bad += not known
+    no_score = np.array([r.get("CreditScore") is None for r in rows])
+    rows = [schema.canonical(r) for r in rows]
+    served = ml._build_frame(schema, rows, schema.vectorize(rows))
+    got = ml._predict_proba(model, served)
+    # The same frame with the cells missing in training blanked again, for the
+    # pipeline's imputer to fill. (Not the cache itself: without a schema the
+    # served frame is float64 and the cache float32, which moves rows across splits.)
+    missing = cached[list(schema.columns)].isna().to_numpy()
+    expected = model.predict_proba(served.mask(missing))[:, 1]
+    for name, mask in (("all rows", np.ones(len(rows), dtype=bool)), ("CreditScore None", no_score)):
+        n_bad = int((got[mask] != expected[mask]).sum())
+        print(f"defaults (schema defaults vs pipeline imputers, {name}): "
+              f"{'ok' if not n_bad else f'{n_bad} MISMATCHED'} ({int(mask.sum())} rows)")
+        bad += n_bad
+    return bad
+
+
+def check_parity(csv_path, cache_root, chunk_rows, model_path=None):
+    failures = 0
+    ds = load_dataset(csv_path, cache_root, chunk_rows=chunk_rows, rebuild=True)
+    cached = ds.frame(drop_missing_above=None)
+    n = len(cached)
+
+    print("training (cache vs pandas add_features):")
+    dtypes = sniff_dtypes(csv_path)
+    legacy = legacy_add_features(pd.read_csv(csv_path, usecols=list(dtypes), dtype=dtypes))
+    for c in DERIVED:
+        failures += compare(c, legacy[c].astype(object).tolist(), cached[c].astype(object).tolist())
+
+    schema = schema_for(cached.drop(columns=[ds.target_name], errors="ignore"))
+    assert set(schema.derived) == set(DERIVED), schema.derived
+    for typed in (False, True):
+        print(f"serving (vectorize, {'typed' if typed else 'string'} values vs cache):")
+        rows = [schema.canonical(r) for r in request_rows(csv_path, typed)]
+        data = schema.vectorize(rows)
+        for c in DERIVED:
+            expected = cached[c].astype(object).tolist()
+            if schema.dtypes[c] == "categorical":
+                # missing in training = the imputer's mode = the schema default at serving
+                expected = [schema.defaults[c] if e is None or e != e else e for e in expected]
+            else:
+                expected = [float(e) for e in expected]
+            failures += compare(c, expected, list(data[c]))
+
+    print("row (derive_row vs derive_columns):")
+    raw = request_rows(csv_path, typed=False)
+    batch = features.derive_columns({k: [r[k] for r in raw] for k in raw[0]})
+    per_row = [features.derive_row(r) for r in raw]
+    for c in DERIVED:
+        failures += compare(c, batch[c].tolist(), [r[c].item() if hasattr(r[c], "item") else r[c]
+                                                   for r in per_row])
+    if model_path:
+        failures += check_model(model_path, cached, request_rows(csv_path, typed=False))
+    defaults_model = model_path or ml.MODEL_PATH
+    if os.path.exists(defaults_model):
+        failures += check_defaults(defaults_model, cached, request_rows(csv_path, typed=False))
+    print(f"{n} rows, {failures} mismatches")
+    return failures, schema, request_rows(csv_path, typed=True)
+
+
+def per_row_us(fn, n, min_seconds=0.3):
+    loops, t0 = 0, time.perf_counter()
+    while True:
+        fn()
+        loops += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_seconds:
+            return elapsed / loops / n * 1e6
+
+
+def bench(schema, rows, batch_sizes):
+    print(f"\n{'batch':>7} {'derive_row':>11} {'derive_columns':>15} {'vectorize':>10} "
+          f"{'no derive':>10} {'derive cost':>12}   (us/row)")
+    for n in batch_sizes:
+        batch = [schema.canonical(r) for r in (rows * (n // len(rows) + 1))[:n]]
+        inputs = {c: [r.get(c) for r in batch] for c in schema.derived_inputs}
+        t_row = per_row_us(lambda: [features.derive_row(r) for r in batch], n)
+        t_cols = per_row_us(lambda: features.derive_columns(inputs), n)
+        t_vec = per_row_us(lambda: schema.vectorize(batch), n)
+        derived, derived_inputs = schema.derived, schema.derived_inputs
+        schema.derived, schema.derived_inputs = {}, frozenset()
+        try:
+            t_plain = per_row_us(lambda: schema.vectorize(batch), n)
+        finally:
+            schema.derived, schema.derived_inputs = derived, derived_inputs
+        print(f"{n:>7} {t_row:>11.2f} {t_cols:>15.2f} {t_vec:>10.2f} {t_plain:>10.2f} {t_vec - t_plain:>12.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=20_000, help="synthetic rows (plus the edge rows)")
+    ap.add_argument("--chunk-rows", type=int, default=7_000, help="cache build chunk size (several chunks)")
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    ap.add_argument("--model", help="also check a trained model's scores (needs its .schema.json)")
+    ap.add_argument("--skip-bench", action="store_true", help="parity check only")
+    args = ap.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_features-")
+    try:
+        csv_path = os.path.join(work, "Loan_default.csv")
+        write_csv(csv_path, args.rows)
+        failures, schema, rows = check_parity(csv_path, os.path.join(work, "cache"), args.chunk_rows,
+                                                model_path=args.model)
+        if not args.skip_bench:
+            bench(schema, rows, args.batch_sizes)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
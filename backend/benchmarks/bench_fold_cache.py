@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Benchmark: RandomizedSearchCV over the full pipeline vs the fold cache.
+
+Builds a synthetic Loan_default-shaped dataset (same columns and feature
+engineering, via train/data.py), the same pre -> SMOTE -> XGBClassifier
+pipeline as train/boosted.py and the same search space, then runs
+the same --trials candidates on the same folds both ways:
+
+  sklearn  RandomizedSearchCV: pre + SMOTE refit for every trial x fold
+  cached   train/folds.py: pre + SMOTE fit once per fold, booster per trial x fold
+
+  halving  train/folds.py halving_search: --halving-candidates on few rounds, the
+           best third promoted to 3x the rounds, XGBoost early stopping on a
+           holdout of each fold's training rows
+  native   train/native.py: each cached fold quantised once into a QuantileDMatrix
+           (--max-bin), xgb.train with tree_method="hist" per trial x fold
+  pool     train/pool.py: cached, with each fold preprocessed and searched in its
+           own worker process (--n-jobs split between the workers)
+  pool-native  the same with native training inside the workers
+
+Reports wall-clock, best CV AUC and boosting rounds spent; sklearn and cached
+should find the same best AUC, native the same up to the binning. With native
+in --modes it also times the final refit of the best candidate:
+pipeline.fit (XGBClassifier) vs fit_native, on all threads.
+--max-trees caps n_estimators to keep the run short (boosting cost is the same
+in both modes, so the cap shrinks the denominator, not the saving).
+
+    cd backend
+    python benchmarks/bench_fold_cache.py --rows 100000 --trials 6
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from imblearn.over_sampling import SMOTE  # noqa: E402
+from imblearn.pipeline import Pipeline as ImbPipeline  # noqa: E402
+from scipy.stats import randint, uniform  # noqa: E402
+from sklearn.base import clone  # noqa: E402
+from sklearn.compose import ColumnTransformer  # noqa: E402
+from sklearn.impute import SimpleImputer  # noqa: E402
+from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+from sklearn.preprocessing import OneHotEncoder, StandardScaler  # noqa: E402
+from xgboost import XGBClassifier  # noqa: E402
+
+from train.data import load_dataset  # noqa: E402
+from train.folds import FoldCache, cached_search, halving_search, thread_budget  # noqa: E402
+from train.native import DMatrixFolds, fit_native, native_search  # noqa: E402
+from train.pool import fold_pool_search  # noqa: E402
+from train.synthetic import write_synthetic_csv  # noqa: E402
+
+RNG = 42
+
+
+def build(X, max_trees, xgb_threads, max_bin):
+    num_cols = X.select_dtypes(include=['number']).columns.tolist()
+    cat_cols = X.select_dtypes(include=['object', 'category', 'bool']).columns.tolist()
+    num_pipe = Pipeline([('imputer', SimpleImputer(strategy='median')), ('scaler', StandardScaler(with_mean=False))])
+    cat_pipe = Pipeline([('imputer', SimpleImputer(strategy='most_frequent')),
+                         ('ohe', OneHotEncoder(handle_unknown='ignore', sparse_output=True))])
+    pre = ColumnTransformer([('num', num_pipe, num_cols), ('cat', cat_pipe, cat_cols)], sparse_threshold=0.3)
+    base = XGBClassifier(eval_metric='logloss', tree_method='hist', max_bin=max_bin, n_jobs=xgb_threads,
+                         random_state=RNG)
+    pipeline = ImbPipeline([('pre', pre), ('smote', SMOTE(random_state=RNG)), ('clf', base)])
+    param_dist = {
+        'clf__n_estimators': randint(50, max_trees),
+        'clf__max_depth': randint(3, 10),
+        'clf__learning_rate': uniform(0.01, 0.25),
+        'clf__subsample': uniform(0.6, 0.4),
+        'clf__colsample_bytree': uniform(0.6, 0.4),
+        'clf__min_child_weight': randint(1, 10)
+    }
+    return pre, pipeline, param_dist
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--trials", type=int, default=6)
+    ap.add_argument("--folds", type=int, default=3)
+    ap.add_argument("--max-trees", type=int, default=150)
+    ap.add_argument("--n-jobs", type=int, default=-1)
+    ap.add_argument("--halving-candidates", type=int, default=27)
+    ap.add_argument("--max-bin", type=int, default=256)
+    ap.add_argument("--modes", default="sklearn,cached,halving,native")
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    with tempfile.TemporaryDirectory() as work:
+        csv_path = write_synthetic_csv(os.path.join(work, "Loan_default.csv"), args.rows)
+        ds = load_dataset(csv_path, os.path.join(work, "cache"))
+        X, y = ds.frame(), ds.target()
+
+    parallel, xgb_threads = thread_budget(args.n_jobs)
+    _, all_threads = thread_budget(args.n_jobs, per_model=None)
+    pre, pipeline, param_dist = build(X, args.max_trees, xgb_threads, args.max_bin)
+    cv = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=RNG)
+    print(f"{args.rows} rows, {args.trials} trials x {args.folds} folds, n_estimators < {args.max_trees}, "
+          f"{parallel} parallel fits x {xgb_threads} threads")
+
+    results, best_params = {}, None
+    for mode in args.modes.split(","):
+        t = time.perf_counter()
+        if mode == "sklearn":
+            rs = RandomizedSearchCV(pipeline, param_dist, n_iter=args.trials, scoring='roc_auc',
+                                    n_jobs=parallel, cv=cv, random_state=RNG)
+            rs.fit(X, y)
+            score = rs.best_score_
+            extra = f"  ({sum(rs.cv_results_['param_clf__n_estimators']) * args.folds} rounds)"
+        elif mode.startswith("pool"):
+            res = fold_pool_search(pipeline.named_steps['clf'], param_dist, pre, X, y, cv, n_iter=args.trials,
+                                   sampler=SMOTE(random_state=RNG), n_jobs=args.n_jobs, xgb_threads=xgb_threads,
+                                   random_state=RNG, native=(mode == "pool-native"), max_bin=args.max_bin,
+                                   verbose=False)
+            score = res["best_score"]
+            extra = (f"  ({res['budget_rounds']} rounds, {res['workers']} workers x {res['parallel_fits']} fits "
+                     f"x {res['xgb_threads']} threads)")
+        else:
+            folds = FoldCache(pre, X, y, cv, sampler=SMOTE(random_state=RNG),
+                              es_fraction=0.1 if mode == "halving" else 0.0, random_state=RNG)
+            if mode == "native":
+                folds = DMatrixFolds(folds, max_bin=args.max_bin, nthread=all_threads)
+                res = native_search(pipeline.named_steps['clf'], param_dist, folds, n_iter=args.trials,
+                                    n_jobs=parallel, xgb_threads=xgb_threads, random_state=RNG, verbose=False)
+                best_params = res["best_params"]
+            elif mode == "halving":
+                res = halving_search(pipeline.named_steps['clf'], param_dist, folds,
+                                     n_candidates=args.halving_candidates, max_rounds=args.max_trees,
+                                     n_jobs=parallel, random_state=RNG, verbose=False)
+            else:
+                res = cached_search(pipeline.named_steps['clf'], param_dist, folds, n_iter=args.trials,
+                                    n_jobs=parallel, random_state=RNG, verbose=False)
+            score = res["best_score"]
+            extra = (f"  ({res['budget_rounds']} rounds, {res['trials']} candidates; preprocess "
+                     f"{res['preprocess_seconds']:.1f}s, boosting {res['boost_seconds']:.1f}s)")
+        results[mode] = time.perf_counter() - t
+        print(f"{mode:<11} {results[mode]:>8.1f}s  best CV AUC {score:.4f}{extra}")
+
+    if "sklearn" in results and "cached" in results:
+        print(f"speedup  {results['sklearn'] / results['cached']:.2f}x")
+
+    if best_params is not None:
+        t = time.perf_counter()
+        clone(pipeline).set_params(**best_params, clf__n_jobs=all_threads).fit(X, y)
+        wrapped = time.perf_counter() - t
+        t = time.perf_counter()
+        fit_native(pipeline, X, y, best_params, max_bin=args.max_bin, nthread=all_threads)
+        native = time.perf_counter() - t
+        print(f"refit    pipeline.fit {wrapped:.1f}s  fit_native {native:.1f}s  ({all_threads} threads)")
+
+
+if __name__ == "__main__":
+    main()
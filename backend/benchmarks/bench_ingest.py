@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmark: bulk ingestion (app/ingest.py) vs replaying rows one at a time.
+
+Generates a partner CSV with --rows applications (about 1% invalid rows) and loads it:
+
+  replay  per row: validate, insert_one, predict_many([row]), update_one
+          (what replaying the file through POST /api/loan/applications did)
+  bulk    ingest_rows: streamed, chunked predict_many + unordered insert_many
+
+Runs against mongomock by default (measures the app side only) or a real
+mongod with --uri. Replay is slow, so it only gets --replay-rows rows.
+
+    cd backend
+    python benchmarks/bench_ingest.py --rows 50000
+    python benchmarks/bench_ingest.py --rows 200000 --uri mongodb://localhost:27017
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from bson import ObjectId  # noqa: E402
+
+from app.ingest import application_doc, ingest_rows, read_rows  # noqa: E402
+from app.ml import predict_many  # noqa: E402
+from app.scoring import application_features  # noqa: E402
+
+COLUMNS = ["full_name", "age", "employment_type", "monthly_income", "loan_amount", "loan_purpose",
+           "existing_debts", "credit_history_flag", "credit_score", "marital_status", "location", "gender"]
+
+
+def make_csv(rows, seed=0):
+    rng = random.Random(seed)
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(COLUMNS)
+    for i in range(rows):
+        w.writerow([
+            f"Applicant {i}",
+            "forty" if rng.random() < 0.01 else rng.randint(21, 70),
+            rng.choice(["Full-time", "Part-time", "Self-employed", "Unemployed"]),
+            rng.randint(1500, 20000), rng.randint(1000, 250000),
+            rng.choice(["Home", "Auto", "Education", "Business", "Other"]),
+            rng.randint(0, 50000), rng.choice(["true", "false"]), rng.randint(300, 850),
+            rng.choice(["Single", "Married", "Divorced"]), rng.choice(["Urban", "Rural"]),
+            rng.choice(["Male", "Female"]),
+        ])
+    return buf.getvalue()
+
+
+def replay(collection, text, limit, owner):
+    t = time.perf_counter()
+    n = 0
+    for _, row in read_rows(io.StringIO(text), "csv"):
+        if n >= limit:
+            break
+        n += 1
+        try:
+            doc = application_doc(row, owner)
+        except ValueError:
+            continue
+        app_id = collection.insert_one(doc).inserted_id
+        res = predict_many([application_features(doc)])[0]
+        collection.update_one({"_id": app_id}, {"$set": {
+            "ml_score": res["default_probability"], "ml_label": res["predicted_label"],
+            "model_version": res.get("model_version")}})
+    return n, time.perf_counter() - t
+
+
+def bulk(collection, text, chunk_size, owner):
+    t = time.perf_counter()
+    report = ingest_rows(collection, read_rows(io.StringIO(text), "csv"),
+                         default_user=owner, chunk_size=chunk_size)
+    return report, time.perf_counter() - t
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--replay-rows", type=int, default=2000)
+    ap.add_argument("--chunk-size", type=int, default=1000)
+    ap.add_argument("--uri", help="real mongod; default is in-memory mongomock")
+    args = ap.parse_args()
+
+    if args.uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+    db = client["loansdb_bench_ingest"]
+    db.loan_applications.drop()
+
+    text = make_csv(args.rows)
+    owner = ObjectId()
+    predict_many([{"Age": 30}])  # load the model outside the timed runs
+
+    try:
+        n, secs = replay(db.loan_applications, text, args.replay_rows, owner)
+        print(f"replay  {n:>8} rows  {secs:>8.2f}s  {n / secs * 60:>12,.0f} rows/min")
+        db.loan_applications.drop()
+
+        report, secs = bulk(db.loan_applications, text, args.chunk_size, owner)
+        print(f"bulk    {report.received:>8} rows  {secs:>8.2f}s  {report.received / secs * 60:>12,.0f} rows/min"
+              f"  ({report.inserted} inserted, {report.scored} scored, {report.failed} rejected)")
+    finally:
+        if args.uri:
+            client.drop_database("loansdb_bench_ingest")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Benchmark: password verification throughput vs hashing-pool size.
+
+For each worker count, C client threads verify passwords for a fixed time
+through app.passwords (process pool) and, as a baseline, inline on the client
+threads the way auth.login used to. A probe thread measures the latency of a
+small unrelated task meanwhile, showing how much a login spike slows other work.
+
+    cd backend
+    python benchmarks/bench_login.py --clients 16 --seconds 5
+    PASSWORD_HASH_METHOD=pbkdf2:sha256:600000 python benchmarks/bench_login.py
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from werkzeug.security import generate_password_hash, check_password_hash  # noqa: E402
+
+from app import passwords  # noqa: E402
+
+
+def probe(stop, samples):
+    while not stop.is_set():
+        t = time.perf_counter()
+        sum(i * i for i in range(2000))
+        samples.append(time.perf_counter() - t)
+        time.sleep(0.005)
+
+
+def run(label, verify, clients, seconds):
+    stop = threading.Event()
+    counts = [0] * clients
+    probe_samples = []
+
+    def client(i):
+        while not stop.is_set():
+            verify()
+            counts[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    threads.append(threading.Thread(target=probe, args=(stop, probe_samples)))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    probe_samples.sort()
+    p99 = probe_samples[min(len(probe_samples) - 1, int(len(probe_samples) * 0.99))] * 1000 if probe_samples else 0
+    print(f"{label:<22} logins/s={sum(counts) / seconds:8.1f}   probe p99={p99:7.2f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    method = passwords.PASSWORD_HASH_METHOD
+    stored = generate_password_hash("correct horse", method)
+    print(f"method={method} cores={os.cpu_count()} clients={args.clients}")
+
+    run("inline (request thread)", lambda: check_password_hash(stored, "correct horse"),
+        args.clients, args.seconds)
+
+    counts = sorted({min(1 << i, args.max_workers) for i in range(args.max_workers.bit_length() + 1)})
+    for workers in counts:
+        passwords.PASSWORD_HASH_WORKERS = workers
+        passwords.PASSWORD_HASH_QUEUE_PER_WORKER = max(args.clients, 1)
+        passwords._pool = None
+        passwords.init_password_pool()
+        run(f"pool workers={workers}", lambda: passwords.verify_password(stored, "correct horse"),
+            args.clients, args.seconds)
+        passwords.get_pool().shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-request predict_default vs the micro-batching scheduler.
+
+Runs N concurrent client threads, each issuing single-row predictions, and
+reports p50/p99 latency and throughput for both paths.
+
+    cd backend
+    python benchmarks/bench_microbatch.py --clients 32 --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import ml  # noqa: E402
+from app.batcher import MicroBatcher  # noqa: E402
+
+
+SAMPLE_ROWS = [
+    {"Age": 35, "Income": 60000, "LoanAmount": 200000, "CreditScore": 650,
+     "EmploymentType": "Full-time", "MaritalStatus": "Married"},
+    {"Age": 52, "Income": 120000, "LoanAmount": 50000, "CreditScore": 780},
+    {"Age": 23, "Income": 18000, "LoanAmount": 90000, "LoanTerm": 60},
+]
+
+
+def _per_request(row):
+    # predict_default without its per-call logging, so both paths do the same work
+    return ml.predict_many([row])[0]
+
+
+def run(label, fn, clients, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(i):
+        local = []
+        for j in range(requests_per_client):
+            row = SAMPLE_ROWS[(i + j) % len(SAMPLE_ROWS)]
+            t = time.perf_counter()
+            fn(row)
+            local.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(local)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as ex:
+        list(ex.map(client, range(clients)))
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    n = len(latencies)
+    p50 = latencies[n // 2] * 1000
+    p99 = latencies[min(n - 1, int(n * 0.99))] * 1000
+    print(f"{label:<28} n={n:<6} p50={p50:8.2f}ms  p99={p99:8.2f}ms  "
+          f"mean={statistics.mean(latencies) * 1000:8.2f}ms  throughput={n / wall:9.1f} req/s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=100, help="requests per client")
+    ap.add_argument("--window-ms", type=float, default=2.0)
+    ap.add_argument("--max-size", type=int, default=64)
+    args = ap.parse_args()
+
+    ml.load_model()
+    _per_request(SAMPLE_ROWS[0])  # warm up
+
+    print(f"clients={args.clients} requests/client={args.requests}")
+    run("per-request predict", _per_request, args.clients, args.requests)
+
+    batcher = MicroBatcher(ml.predict_many, window_ms=args.window_ms, max_size=args.max_size)
+    run(f"microbatch {args.window_ms}ms/{args.max_size}", batcher.predict, args.clients, args.requests)
+
+    stats = batcher.stats()
+    print(f"batches={stats['batches']} avg_batch_size={stats['avg_batch_size']:.1f} "
+          f"max_batch_size={stats['max_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+Benchmark: MongoDB client settings vs tail latency under concurrent clients.
+
+Needs a running mongod (MONGO_URI or --uri; a throwaway database is used and
+dropped). Each config gets its own MongoClient; --clients threads then run a
+mix modelled on the API for --seconds:
+
+  * 70% my_applications - find by user_id, sort created_at desc, limit 20
+  * 20% create          - insert_one of an application document
+  * 10% score update    - update_one by _id
+
+and the report shows throughput, operation latency percentiles and the time
+spent waiting for a pooled connection (from a ConnectionPoolListener).
+
+Configs:
+  driver      MongoClient(uri) with library defaults (what create_app used to do)
+  small-pool  app settings with maxPoolSize=8: clients queue for connections
+  app         app/mongo.py client_options() (MONGO_* env vars)
+  app-zlib    app settings with zlib wire compression (zstd/snappy if installed)
+
+    cd backend
+    python benchmarks/bench_mongo_pool.py --uri mongodb://localhost:27017 --clients 64
+    MONGO_MAX_POOL_SIZE=16 python benchmarks/bench_mongo_pool.py --configs driver,app
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+
+from app.mongo import client_options, available_compressors
+
+DB_NAME = "loansdb_bench_pool"
+
+
+class WaitRecorder(monitoring.ConnectionPoolListener):
+    """Collects check-out wait durations for one client."""
+
+    def __init__(self):
+        self.waits = []
+        self.failures = 0
+
+    def connection_checked_out(self, event):
+        if event.duration is not None:
+            self.waits.append(event.duration)
+
+    def connection_check_out_failed(self, event):
+        self.failures += 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_checked_in(self, event): pass
+
+
+def config_options(name):
+    if name == "driver":
+        return {}
+    if name == "small-pool":
+        return client_options({"maxPoolSize": 8})
+    if name == "app":
+        return client_options()
+    if name == "app-zlib":
+        return client_options({"compressors": ",".join(available_compressors("zstd,snappy") or ["zlib"])})
+    raise SystemExit(f"unknown config {name}")
+
+
+def seed(uri, users, docs):
+    client = MongoClient(uri)
+    coll = client[DB_NAME].loan_applications
+    coll.drop()
+    coll.create_index([("user_id", 1), ("created_at", -1)])
+    now = datetime.datetime.utcnow()
+    user_ids = [ObjectId() for _ in range(users)]
+    batch = [{"user_id": random.choice(user_ids), "amount": random.randint(1000, 250000),
+              "created_at": now - datetime.timedelta(minutes=i), "decision_status": "pending",
+              "payload": {"Age": 30, "Income": 50000, "EmploymentType": "Full-time"}}
+             for i in range(docs)]
+    coll.insert_many(batch, ordered=False)
+    ids = [d["_id"] for d in batch]
+    client.close()
+    return user_ids, ids
+
+
+def drive(uri, options, user_ids, doc_ids, clients, seconds):
+    recorder = WaitRecorder()
+    client = MongoClient(uri, event_listeners=[recorder], **options)
+    coll = client[DB_NAME].loan_applications
+    coll.find_one()  # connect + server selection outside the timed window
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+
+    def worker(i):
+        rng = random.Random(i)
+        while not stop.is_set():
+            r = rng.random()
+            t = time.perf_counter()
+            try:
+                if r < 0.7:
+                    list(coll.find({"user_id": rng.choice(user_ids)}).sort("created_at", -1).limit(20))
+                elif r < 0.9:
+                    coll.insert_one({"user_id": rng.choice(user_ids), "amount": rng.randint(1000, 250000),
+                                     "created_at": datetime.datetime.utcnow(), "decision_status": "pending"})
+                else:
+                    coll.update_one({"_id": rng.choice(doc_ids)},
+                                    {"$set": {"risk_score": rng.random(), "decision_status": "scored"}})
+            except Exception:
+                errors[i] += 1
+                continue
+            latencies[i].append(time.perf_counter() - t)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join(timeout=30)
+    client.close()
+
+    lat = sorted(x for per in latencies for x in per)
+    waits = sorted(recorder.waits)
+    pct = lambda xs, p: xs[min(len(xs) - 1, int(p * len(xs)))] * 1000 if xs else float("nan")
+    return {"ops": len(lat) / seconds, "p50": pct(lat, 0.50), "p95": pct(lat, 0.95),
+            "p99": pct(lat, 0.99), "max": lat[-1] * 1000 if lat else float("nan"),
+            "wait_p99": pct(waits, 0.99), "errors": sum(errors) + recorder.failures}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--configs", default="driver,small-pool,app,app-zlib")
+    ap.add_argument("--clients", type=int, default=64)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--docs", type=int, default=100000)
+    args = ap.parse_args()
+
+    try:
+        MongoClient(args.uri, serverSelectionTimeoutMS=3000).admin.command("ping")
+    except Exception as e:
+        raise SystemExit(f"No mongod reachable at {args.uri}: {e}")
+
+    user_ids, doc_ids = seed(args.uri, args.users, args.docs)
+    print(f"{args.clients} clients, {args.seconds:g}s per config, {args.docs} seeded documents")
+    print(f"{'config':<11} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'wait p99':>9} {'errors':>7}")
+    try:
+        for name in args.configs.split(","):
+            r = drive(args.uri, config_options(name), user_ids, doc_ids, args.clients, args.seconds)
+            print(f"{name:<11} {r['ops']:>9.0f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} "
+                  f"{r['max']:>8.1f} {r['wait_p99']:>9.2f} {r['errors']:>7}")
+    finally:
+        MongoClient(args.uri).drop_database(DB_NAME)
+
+
+if __name__ == "__main__":
+    main()
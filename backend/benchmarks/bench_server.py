@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""
+Load test: Flask development server (run.py) vs gunicorn (gunicorn.conf.py).
+
+Starts each server in a subprocess, waits for GET /api/auth/ready, then drives
+POST /api/predict (optionally mixed with GET /api/auth/health) from
+--clients keep-alive connections for --seconds and reports throughput and
+latency percentiles.
+
+    cd backend
+    python benchmarks/bench_server.py --mongomock                   # no mongod needed
+    python benchmarks/bench_server.py --clients 64 --seconds 20
+    GUNICORN_WORKERS=4 python benchmarks/bench_server.py --servers gunicorn
+
+The client runs in this process; on a small machine it competes with the
+server for CPU, so compare servers with the same --clients on the same host.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+
+# ----------------------------------------------------------------------
+# SERVER SIDE (runs in a child process)
+# ----------------------------------------------------------------------
+
+def _patch_mongomock():
+    import mongomock
+    import app as app_module
+    app_module.MongoClient = lambda uri, **kw: mongomock.MongoClient(uri)
+
+
+def serve(kind, port, mongomock):
+    os.chdir(BACKEND_DIR)
+    if mongomock:
+        _patch_mongomock()
+
+    if kind == "dev":
+        from app import create_app
+        app = create_app()  # loads and warms the model on a background thread
+        # Same call as run.py, on the benchmark port
+        app.run(debug=False, host="127.0.0.1", port=port)
+        return
+
+    from gunicorn.app.base import Application
+
+    class BenchServer(Application):
+        def init(self, parser, opts, args):
+            return None
+
+        def load_config(self):
+            self.load_config_from_file(os.path.join(BACKEND_DIR, "gunicorn.conf.py"))
+            self.cfg.set("bind", f"127.0.0.1:{port}")
+            self.cfg.set("accesslog", None)
+
+        def load(self):
+            import wsgi
+            return wsgi.app
+
+    BenchServer().run()
+
+
+# ----------------------------------------------------------------------
+# CLIENT SIDE
+# ----------------------------------------------------------------------
+
+def wait_ready(port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/auth/ready")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.25)
+    return False
+
+
+def random_row(rng):
+    return {
+        "Age": rng.randint(21, 70),
+        "Income": rng.randint(15000, 200000),
+        "LoanAmount": rng.randint(1000, 250000),
+        "CreditScore": rng.randint(300, 850),
+        "EmploymentType": rng.choice(["Full-time", "Part-time", "Self-employed", "Unemployed"]),
+    }
+
+
+def drive(port, clients, seconds, health_ratio):
+    stop = threading.Event()
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+
+    def client(i):
+        rng = random.Random(i)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        headers = {"Content-Type": "application/json"}
+        while not stop.is_set():
+            t = time.perf_counter()
+            try:
+                if rng.random() < health_ratio:
+                    conn.request("GET", "/api/auth/health")
+                else:
+                    conn.request("POST", "/api/predict", json.dumps(random_row(rng)), headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    errors[i] += 1
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            latencies[i].append(time.perf_counter() - t)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join(timeout=35)
+
+    lat = sorted(x for per in latencies for x in per)
+    pct = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else float("nan")
+    return {"requests": len(lat), "rps": len(lat) / seconds, "errors": sum(errors),
+            "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--servers", default="dev,gunicorn")
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--health-ratio", type=float, default=0.0,
+                    help="share of requests that hit /api/auth/health instead of /api/predict")
+    ap.add_argument("--port", type=int, default=5055)
+    ap.add_argument("--mongomock", action="store_true", help="serve from an in-memory mongomock database")
+    ap.add_argument("--serve", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.mongomock)
+        return
+
+    print(f"{args.clients} clients, {args.seconds:g}s per server")
+    print(f"{'server':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for kind in args.servers.split(","):
+        cmd = [sys.executable, os.path.abspath(__file__), "--serve", kind, "--port", str(args.port)]
+        if args.mongomock:
+            cmd.append("--mongomock")
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_ready(args.port):
+                print(f"{kind:<10} did not become ready")
+                continue
+            r = drive(args.port, args.clients, args.seconds, args.health_ratio)
+            print(f"{kind:<10} {r['rps']:>9.1f} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f} {r['errors']:>7}")
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Benchmark: cold-start time of the backend.
+
+Runs a fresh `python -X importtime` interpreter per run and reports:
+
+  * import app        - importing the app package (create_app's module imports)
+  * create_app        - building the app (Mongo client, indexes, blueprints)
+  * first auth / admin - first GET /api/auth/health and GET /api/admin/loan/applications
+  * ready             - until /api/auth/ready turns 200 (model loaded + warmed
+                        on create_app's background thread)
+
+and checks that the auth and admin requests are served without importing
+pandas, sklearn or xgboost (the model is loaded separately, so that check runs
+with create_app(start_background=False)). The slowest imports come from the
+-X importtime log of the last run.
+
+    cd backend
+    python benchmarks/bench_startup.py --mongomock
+    python benchmarks/bench_startup.py --mongomock --runs 5 --budget-ms 1500   # exit 1 over budget
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("pandas", "sklearn", "xgboost", "scipy", "joblib")
+
+
+def child(mongomock, background):
+    t_start = time.perf_counter()
+    sys.path.insert(0, BACKEND_DIR)
+    out = {}
+
+    t = time.perf_counter()
+    import app as app_module
+    out["import_ms"] = (time.perf_counter() - t) * 1000
+    if mongomock:
+        import mongomock as mm
+        app_module.MongoClient = lambda uri, **kw: mm.MongoClient(uri)
+
+    t = time.perf_counter()
+    app = app_module.create_app(start_background=background)
+    out["create_app_ms"] = (time.perf_counter() - t) * 1000
+    client = app.test_client()
+
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        token = create_access_token(identity="000000000000000000000001",
+                                    additional_claims={"role": "admin"})
+
+    t = time.perf_counter()
+    client.get("/api/auth/health")
+    out["first_auth_ms"] = (time.perf_counter() - t) * 1000
+    t = time.perf_counter()
+    client.get("/api/admin/loan/applications", headers={"Authorization": f"Bearer {token}"})
+    out["first_admin_ms"] = (time.perf_counter() - t) * 1000
+    out["heavy_after_routes"] = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    if background:
+        deadline = time.monotonic() + 120
+        while client.get("/api/auth/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        out["ready_ms"] = (time.perf_counter() - t_start) * 1000
+    print(json.dumps(out))
+
+
+def run_child(mongomock, background):
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child"]
+    if mongomock:
+        cmd.append("--mongomock")
+    if not background:
+        cmd.append("--no-background")
+    t = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=BACKEND_DIR)
+    wall = (time.perf_counter() - t) * 1000
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise SystemExit(f"child failed:\n{proc.stderr[-2000:]}")
+    res = json.loads(lines[-1])
+    res["process_ms"] = wall
+    return res, proc.stderr
+
+
+def slowest_imports(importtime_log, top):
+    """Top-level (un-nested) imports by cumulative microseconds."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):  # nested import, already counted in its parent
+            continue
+        rows.append((int(cum_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--mongomock", action="store_true", help="use an in-memory mongomock database")
+    ap.add_argument("--budget-ms", type=float, help="fail if import + create_app exceeds this (median)")
+    ap.add_argument("--top", type=int, default=12)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--no-background", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args.mongomock, not args.no_background)
+        return
+
+    results, log = [], ""
+    for _ in range(args.runs):
+        res, log = run_child(args.mongomock, background=True)
+        results.append(res)
+    routes, _ = run_child(args.mongomock, background=False)
+
+    med = lambda k: statistics.median(r[k] for r in results)
+    print(f"median of {args.runs} runs (ms)")
+    for key, label in (("import_ms", "import app"), ("create_app_ms", "create_app"),
+                       ("first_auth_ms", "first auth request"), ("first_admin_ms", "first admin request"),
+                       ("ready_ms", "ready (model warmed)"), ("process_ms", "process wall time")):
+        print(f"  {label:<22} {med(key):>9.1f}")
+    heavy = routes["heavy_after_routes"]
+    print(f"heavy modules after auth/admin requests: {', '.join(heavy) if heavy else 'none'}")
+
+    print("\nslowest top-level imports (last run, cumulative ms):")
+    for us, name in slowest_imports(log, args.top):
+        print(f"  {us / 1000:>9.1f}  {name}")
+
+    if args.budget_ms is not None:
+        spent = med("import_ms") + med("create_app_ms")
+        if spent > args.budget_ms or heavy:
+            print(f"\nOVER BUDGET: import + create_app = {spent:.1f} ms (budget {args.budget_ms:g} ms)"
+                  + (f", heavy modules imported: {', '.join(heavy)}" if heavy else ""))
+            sys.exit(1)
+        print(f"\nWithin budget: {spent:.1f} ms <= {args.budget_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
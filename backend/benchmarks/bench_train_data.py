@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Benchmark: peak memory and time to get training data ready.
+
+Each mode runs in a fresh interpreter and ends with a feature DataFrame + 0/1
+target ready for the train/holdout split:
+
+  pandas       pd.read_csv of the whole file, df.copy(), derived columns added
+               as full-frame operations (what train_boosted_improved.py did)
+  cache-build  train/data.py: stream the CSV in chunks into the .npy cache,
+               then memory-map it into a frame
+  cache-load   the same with the cache already built (every later run)
+
+"baseline" is the RSS after imports, before touching the data. Uses
+--csv, or writes a synthetic Loan_default-shaped file with --rows rows.
+
+    cd backend
+    python benchmarks/bench_train_data.py --rows 1000000
+    python benchmarks/bench_train_data.py --csv /data/Loan_default.csv
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+MODES = ("pandas", "cache-build", "cache-load")
+
+
+def load_pandas(csv_path):
+    """The original in-memory path, kept verbatim in spirit."""
+    import numpy as np
+    import pandas as pd
+    df = pd.read_csv(csv_path, low_memory=True)
+    df = df.copy()
+    df = df.drop(columns=[c for c in df.columns if 'id' in c.lower()], errors='ignore')
+    df['loan_to_income'] = (df['LoanAmount'] / df['Income'].replace(0, np.nan)).fillna(0)
+    df['credit_bin'] = pd.cut(df['CreditScore'], bins=[0, 580, 670, 740, 800, 1000],
+                              labels=['poor', 'fair', 'good', 'very_good', 'excellent']).astype(object)
+    df['has_cosigner_flag'] = df['HasDependents'].astype(str).str.lower().isin(['1', 'yes', 'true', 'y']).astype(int)
+    df['is_salaried'] = df['EmploymentType'].astype(str).str.lower().str.contains('salar').astype(int)
+    y = df['Default']
+    X = df.drop(columns=['Default'])
+    X = X.drop(columns=X.columns[X.isna().mean() > 0.9].tolist())
+    return X, y
+
+
+def child(mode, csv_path, cache_root):
+    import pandas  # noqa: F401  (baseline includes the imports every mode needs)
+    from train.data import load_dataset, peak_rss_mb
+    baseline = peak_rss_mb()
+    t = time.perf_counter()
+    if mode == "pandas":
+        X, y = load_pandas(csv_path)
+    else:
+        ds = load_dataset(csv_path, cache_root, rebuild=(mode == "cache-build"))
+        X, y = ds.frame(), ds.target()
+    out = {"seconds": time.perf_counter() - t, "baseline": baseline, "peak": peak_rss_mb(),
+           "frame_mb": X.memory_usage(deep=True).sum() / 2 ** 20, "rows": len(X)}
+    print(json.dumps(out))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--csv")
+    ap.add_argument("--rows", type=int, default=500_000)
+    ap.add_argument("--modes", default=",".join(MODES))
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--cache-root", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args.child, args.csv, args.cache_root)
+        return
+
+    work = tempfile.mkdtemp(prefix="bench_train_data-")
+    try:
+        csv_path = args.csv
+        if not csv_path:
+            from train.synthetic import write_synthetic_csv
+            csv_path = write_synthetic_csv(os.path.join(work, "Loan_default.csv"), args.rows)
+        size_mb = os.path.getsize(csv_path) / 2 ** 20
+        print(f"{csv_path}: {size_mb:.0f} MiB on disk")
+        print(f"{'mode':<12} {'rows':>9} {'seconds':>8} {'baseline':>9} {'peak RSS':>9} {'over base':>10} {'frame':>8}   (MiB)")
+        for mode in args.modes.split(","):
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode,
+                                   "--csv", csv_path, "--cache-root", os.path.join(work, "cache")],
+                                  capture_output=True, text=True, cwd=BACKEND_DIR)
+            lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                print(f"{mode:<12} failed: {proc.stderr.strip().splitlines()[-1:] or proc.returncode}")
+                continue
+            r = json.loads(lines[-1])
+            print(f"{mode:<12} {r['rows']:>9} {r['seconds']:>8.2f} {r['baseline']:>9.0f} {r['peak']:>9.0f} "
+                  f"{r['peak'] - r['baseline']:>10.0f} {r['frame_mb']:>8.0f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark: memory per worker process for the ways a worker can get its model.
+
+Each mode runs in a fresh interpreter that imports app.ml (like create_app),
+forks --workers children the way gunicorn does, lets every child score some
+rows, then reads /proc/<pid>/smaps_rollup for each child:
+
+  * RSS - resident pages, shared ones counted in full in every worker
+  * PSS - shared pages split between the processes mapping them
+  * USS - pages private to the worker (what each extra worker really costs)
+
+Modes:
+  pipeline          every worker joblib.loads the pipeline after the fork (before)
+  pipeline-preload  the master loads it once (ml.preload) and workers inherit it
+  mmap              ML_ENGINE=compiled, workers memory-map models/*.compiled.mmap
+  mmap-preload      the master maps it before forking
+
+    cd backend
+    python export_compiled_model.py                    # writes the .mmap directory
+    python benchmarks/bench_worker_rss.py --workers 4
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+
+MODES = ("pipeline", "pipeline-preload", "mmap", "mmap-preload")
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def smaps_rollup(pid):
+    """{"rss", "pss", "uss"} in MiB for a process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"rss": fields.get("Rss", 0) / 1024, "pss": fields.get("Pss", 0) / 1024, "uss": uss / 1024}
+
+
+def child_main(mode, workers, rows):
+    """Runs in a fresh interpreter: acts as the pre-fork master for one mode."""
+    os.environ["ML_ENGINE"] = "compiled" if mode.startswith("mmap") else "pipeline"
+    os.environ["ML_MODEL_WATCH"] = "0"
+    sys.path.insert(0, BACKEND_DIR)
+    from app import ml
+
+    if mode.endswith("preload"):
+        ml.preload()
+
+    sample = [{"Age": 20 + i % 50, "Income": 20000 + 137 * i, "LoanAmount": 5000 + 11 * i,
+               "CreditScore": 300 + i % 550, "EmploymentType": "Full-time"} for i in range(rows)]
+
+    pids, ready_r = [], []
+    for _ in range(workers):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            ml.predict_many(sample[:1])
+            ml.predict_many(sample)
+            os.write(w, b"1")
+            signal.pause()
+            os._exit(0)
+        os.close(w)
+        pids.append(pid)
+        ready_r.append(r)
+
+    for r in ready_r:
+        os.read(r, 1)
+    out = {"master": smaps_rollup(os.getpid()), "workers": [smaps_rollup(p) for p in pids]}
+    for p in pids:
+        os.kill(p, signal.SIGTERM)
+        os.waitpid(p, 0)
+    print(json.dumps(out))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rows", type=int, default=2000, help="rows each worker scores before measuring")
+    ap.add_argument("--modes", default=",".join(MODES))
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child_main(args.child, args.workers, args.rows)
+        return
+
+    print(f"{'mode':<18} {'master RSS':>10} {'worker RSS':>11} {'worker PSS':>11} "
+          f"{'worker USS':>11} {'total PSS':>10}   (MiB, worker columns are averages)")
+    for mode in args.modes.split(","):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode,
+                               "--workers", str(args.workers), "--rows", str(args.rows)],
+                              capture_output=True, text=True, cwd=BACKEND_DIR)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{mode:<18} failed: {proc.stderr.strip().splitlines()[-1:] or proc.returncode}")
+            continue
+        res = json.loads(lines[-1])
+        ws = res["workers"]
+        avg = {k: sum(w[k] for w in ws) / len(ws) for k in ("rss", "pss", "uss")}
+        total = res["master"]["pss"] + sum(w["pss"] for w in ws)
+        print(f"{mode:<18} {res['master']['rss']:>10.1f} {avg['rss']:>11.1f} {avg['pss']:>11.1f} "
+              f"{avg['uss']:>11.1f} {total:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Check an existing compiled export against its pipeline, without re-exporting.
+
+For the model file and its .compiled.npz (and the .compiled.mmap directory
+when present) it checks that:
+
+  * the export was made from this model file (sha256 recorded at export time)
+  * CompiledModel.predict_proba matches the pipeline's predict_proba within
+    --tolerance on random rows (export_compiled_model.random_rows) and on rows
+    placed on every split threshold and 1 ulp either side (cut_point_rows)
+  * with --dataset, it also matches on a sample of the real training rows,
+    read through train/data.py's cache like training read them: real values
+    sit on the trees' cut points, where random ones almost never land
+
+Exits 1 on a stale export or a parity failure. Run it after every retrain or
+deploy; app/ml.py refuses a stale export but cannot check parity at startup.
+
+    cd backend
+    python benchmarks/check_compiled.py
+    python benchmarks/check_compiled.py --model models/registry/v3/model.joblib \\
+        --compiled models/registry/v3/model.compiled.npz --rows 20000
+    python benchmarks/check_compiled.py --model models/trained/xgb_improved.joblib \\
+        --dataset /data/Loan_default.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import joblib  # noqa: E402
+
+from app import ml  # noqa: E402
+from export_compiled_model import check_parity  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default=ml.MODEL_PATH)
+    ap.add_argument("--compiled", help="compiled export (default: <model stem>.compiled.npz, "
+                                       "or the served xgb_loan_model.compiled.npz)")
+    ap.add_argument("--rows", type=int, default=5000, help="rows used for the parity check")
+    ap.add_argument("--tolerance", type=float, default=1e-5)
+    ap.add_argument("--dataset", help="training CSV: also check parity on its real rows")
+    ap.add_argument("--cache-dir", default=os.path.join(os.path.dirname(ml.MODEL_PATH), "cache"),
+                    help="train/data.py's columnar cache of --dataset (default: %(default)s)")
+    args = ap.parse_args()
+
+    compiled_path = args.compiled or (ml.COMPILED_MODEL_PATH if args.model == ml.MODEL_PATH
+                                      else os.path.splitext(args.model)[0] + ".compiled.npz")
+    for path in (args.model, compiled_path):
+        if not os.path.exists(path):
+            print(f"{path} not found")
+            return 1
+
+    frame = None
+    if args.dataset:
+        from train.data import load_dataset
+        frame = load_dataset(args.dataset, args.cache_dir).frame(drop_missing_above=None)
+
+    model = joblib.load(args.model)
+    model_sha256 = ml._file_sha256(args.model)
+    # the pipeline side gets the training dtypes app/ml.py serves it with
+    serving = ml._read_serving_schema(ml.serving_schema_path_for(args.model), model_sha256)
+    frame_dtypes = ml.serving_frame_dtypes(serving) if serving else None
+    exports = []
+    with np.load(compiled_path, allow_pickle=False) as arrays:
+        exports.append((compiled_path, ml.CompiledModel(arrays)))
+    mmap_dir = ml.mmap_path_for(compiled_path)
+    if os.path.isdir(mmap_dir):
+        exports.append((mmap_dir, ml.CompiledModel.load_mmap(mmap_dir)))
+
+    failures = 0
+    for path, compiled in exports:
+        print(f"{path}:")
+        if compiled.source_sha256 != model_sha256:
+            print(f"  STALE: exported from sha256 {compiled.source_sha256[:12]}, "
+                  f"{args.model} is {model_sha256[:12]}")
+            failures += 1
+            continue
+        if not check_parity(model, compiled, args.rows, args.tolerance,
+                            frame=frame, frame_dtypes=frame_dtypes):
+            print("  PARITY CHECK FAILED")
+            failures += 1
+    print("Compiled export OK" if not failures else f"{failures} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from app import create_app
-from werkzeug.security import generate_password_hash
+from app.passwords import hash_password
 
 app = create_app()
 
@@ -8,7 +8,7 @@ with app.app_context():
     admin_password = "karthik01"
     admin_name = "Administrator"
 
-    hashed = generate_password_hash(admin_password)
+    hashed = hash_password(admin_password)
 
     users = app.mongo.users
 
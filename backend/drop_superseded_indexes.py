@@ -0,0 +1,16 @@
+# backend/drop_superseded_indexes.py
+#
+# One-off: drop the indexes listed in app/indexes.py's SUPERSEDED (made
+# redundant by a compound index with the same leading key). The app only
+# reports them at startup, so run this once the replacing index is built:
+#
+#     cd backend
+#     python drop_superseded_indexes.py
+
+from app import create_app
+from app.indexes import drop_superseded_indexes
+
+app = create_app(start_background=False)
+
+dropped = drop_superseded_indexes(app.mongo)
+print(f"Dropped {len(dropped)} superseded index(es)" if dropped else "No superseded indexes to drop")
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""
+Export the fitted pipeline (models/xgb_loan_model.joblib) to flat NumPy arrays
+that app.ml.CompiledModel scores without sklearn or xgboost:
+
+  * preprocessing: imputer medians / modes, scaler mean + scale, one-hot vocabularies
+  * trees: left/right child, split feature, threshold, default direction, leaf value
+
+After writing models/xgb_loan_model.compiled.npz it checks parity against
+model.predict_proba on randomly generated rows and on rows placed on every
+split threshold (and 1 ulp either side), and exits non-zero on mismatch.
+On success it also writes models/xgb_loan_model.compiled.mmap/: the re-laid
+trees and preprocessing arrays as plain .npy files that every worker
+memory-maps read-only, so N workers share one copy in the page cache.
+
+    cd backend
+    python export_compiled_model.py [--rows 5000] [--tolerance 1e-5]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from app import ml
+
+
+# ----------------------------------------------------------------------
+# PREPROCESSING
+# ----------------------------------------------------------------------
+
+def _pipeline_parts(model):
+    steps = getattr(model, "named_steps", None)
+    if not steps:
+        raise RuntimeError("Expected a fitted Pipeline with 'pre' and 'clf' steps")
+    pre = steps.get('pre') or steps.get('preprocessor')
+    clf = steps.get('clf')
+    if pre is None or clf is None:
+        raise RuntimeError(f"Pipeline steps {list(steps)} lack 'pre'/'clf'")
+    return pre, clf
+
+
+def _step(pipe, cls_name):
+    for _, step in getattr(pipe, "steps", []):
+        if type(step).__name__ == cls_name:
+            return step
+    return None
+
+
+def export_preprocessor(pre, frame_dtypes=None):
+    """
+    Flatten a fitted ColumnTransformer of (imputer, scaler) and (imputer, one-hot)
+    branches. frame_dtypes ({column -> np.float32}, ml.serving_frame_dtypes) marks
+    the numeric columns the training frame held as float32; a branch made only of
+    those is imputed and scaled in float32, which CompiledModel has to reproduce.
+    """
+    frame_dtypes = frame_dtypes or {}
+    num_columns, num_fill, num_mean, num_scale, num_positions = [], [], [], [], []
+    num_input_float32, num_math_float32 = [], []
+    cat_columns, cat_fill, cat_offsets, cat_vocab, cat_bounds = [], [], [], [], [0]
+
+    pos = 0
+    for name, trans, cols in pre.transformers_:
+        if trans == 'drop' or name == 'remainder':
+            continue
+        if not isinstance(cols, (list, tuple)):
+            raise RuntimeError(f"Unsupported column spec for transformer '{name}': {cols!r}")
+        cols = list(cols)
+        imputer = _step(trans, "SimpleImputer")
+        ohe = _step(trans, "OneHotEncoder")
+
+        if ohe is not None:
+            if ohe.drop is not None or getattr(ohe, "infrequent_categories_", None):
+                raise RuntimeError("One-hot encoders with drop/infrequent categories are not supported")
+            fills = imputer.statistics_ if imputer is not None else [None] * len(cols)
+            for c, fill, cats in zip(cols, fills, ohe.categories_):
+                cat_columns.append(c)
+                cat_fill.append(str(fill))
+                cat_offsets.append(pos)
+                cat_vocab.extend(str(v) for v in cats)
+                cat_bounds.append(len(cat_vocab))
+                pos += len(cats)
+        else:
+            scaler = _step(trans, "StandardScaler")
+            fills = imputer.statistics_ if imputer is not None else np.zeros(len(cols))
+            if len(fills) != len(cols):
+                raise RuntimeError(f"Imputer in '{name}' dropped all-missing columns; not supported")
+            means = scaler.mean_ if scaler is not None and scaler.with_mean else np.zeros(len(cols))
+            scales = scaler.scale_ if scaler is not None and scaler.with_std else np.ones(len(cols))
+            branch_float32 = all(c in frame_dtypes for c in cols)
+            for j, c in enumerate(cols):
+                num_columns.append(c)
+                num_input_float32.append(c in frame_dtypes)
+                num_math_float32.append(branch_float32)
+                num_fill.append(float(fills[j]))
+                num_mean.append(float(means[j]))
+                num_scale.append(float(scales[j]))
+                num_positions.append(pos)
+                pos += 1
+
+    return {
+        "num_columns": np.array(num_columns, dtype=str),
+        "num_fill": np.array(num_fill, dtype=np.float64),
+        "num_mean": np.array(num_mean, dtype=np.float64),
+        "num_scale": np.array(num_scale, dtype=np.float64),
+        "num_positions": np.array(num_positions, dtype=np.int64),
+        "num_input_float32": np.array(num_input_float32, dtype=bool),
+        "num_math_float32": np.array(num_math_float32, dtype=bool),
+        "cat_columns": np.array(cat_columns, dtype=str),
+        "cat_fill": np.array(cat_fill, dtype=str),
+        "cat_offsets": np.array(cat_offsets, dtype=np.int64),
+        "cat_vocab": np.array(cat_vocab, dtype=str),
+        "cat_vocab_bounds": np.array(cat_bounds, dtype=np.int64),
+        "n_features": np.array(pos, dtype=np.int64),
+        "sparse": np.array(bool(getattr(pre, "sparse_output_", False))),
+    }
+
+
+# ----------------------------------------------------------------------
+# TREES
+# ----------------------------------------------------------------------
+
+def _parse_base_score(raw):
+    # XGBoost >= 3 stores it as "[5E-1]", older versions as "5E-1"
+    return float(str(raw).strip("[]").split(",")[0])
+
+
+def export_booster(clf):
+    booster = clf.get_booster()
+    config = json.loads(booster.save_config())
+    learner = config["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise RuntimeError(f"Only binary:logistic is supported, got {objective}")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise RuntimeError("Only gbtree boosters are supported")
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+    model = json.loads(booster.save_raw(raw_format="json"))
+    trees = model["learner"]["gradient_booster"]["model"]["trees"]
+
+    # Respect early stopping the same way XGBClassifier.predict_proba does
+    best_iteration = getattr(clf, "best_iteration", None)
+    if best_iteration is not None:
+        trees = trees[:best_iteration + 1]
+
+    left, right, feature, threshold, default_left, leaf_value, roots = [], [], [], [], [], [], []
+    depth = 0
+    offset = 0
+    for tree in trees:
+        lc = np.asarray(tree["left_children"], dtype=np.int64)
+        rc = np.asarray(tree["right_children"], dtype=np.int64)
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        n = len(lc)
+        is_leaf = lc == -1
+        own = np.arange(n, dtype=np.int64)
+
+        left.append(np.where(is_leaf, own, lc) + offset)
+        right.append(np.where(is_leaf, own, rc) + offset)
+        feature.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)))
+        threshold.append(np.where(is_leaf, np.float32(0), cond))
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        leaf_value.append(np.where(is_leaf, cond, np.float32(0)))
+        roots.append(offset)
+
+        # depth of the deepest leaf
+        level = {0: 0}
+        for i in range(n):
+            if not is_leaf[i]:
+                level[int(lc[i])] = level[i] + 1
+                level[int(rc[i])] = level[i] + 1
+        depth = max(depth, max(level.values()))
+        offset += n
+
+    return {
+        "tree_left": np.concatenate(left),
+        "tree_right": np.concatenate(right),
+        "tree_feature": np.concatenate(feature),
+        "tree_threshold": np.concatenate(threshold).astype(np.float32),
+        "tree_default_left": np.concatenate(default_left),
+        "tree_leaf_value": np.concatenate(leaf_value).astype(np.float32),
+        "tree_roots": np.array(roots, dtype=np.int64),
+        "tree_depth": np.array(depth, dtype=np.int64),
+        "base_margin": np.array(base_margin, dtype=np.float64),
+    }
+
+
+def export_pipeline(model, frame_dtypes=None):
+    pre, clf = _pipeline_parts(model)
+    arrays = export_preprocessor(pre, frame_dtypes)
+    arrays.update(export_booster(clf))
+    return arrays
+
+
+# ----------------------------------------------------------------------
+# PARITY CHECK
+# ----------------------------------------------------------------------
+
+def random_rows(compiled, n, seed=0):
+    """Rows around the imputer statistics, with unknown categories and missing values mixed in."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        row = {}
+        for j, c in enumerate(compiled.num_columns):
+            r = rng.random()
+            if r < 0.05:
+                continue
+            base = compiled.num_fill[j] or 1.0
+            row[c] = None if r < 0.08 else float(base * rng.uniform(0.0, 2.0))
+        for j, c in enumerate(compiled.cat_columns):
+            r = rng.random()
+            if r < 0.05:
+                continue
+            vocab = list(compiled.cat_lookup[j])
+            row[c] = "unseen-category" if r < 0.08 else vocab[rng.integers(len(vocab))]
+        rows.append(row)
+    return rows
+
+
+def cut_point_rows(compiled, seed=0):
+    """
+    Rows that put each numeric column on every split threshold of its feature
+    (mapped back through the scaler) and 1 ulp either side, in the column's
+    input dtype; the other columns are random_rows values. Real data sits on
+    XGBoost's hist cut points, where uniform random values almost never land.
+    """
+    values = []  # (column, raw value)
+    for j, c in enumerate(compiled.num_columns):
+        position = int(compiled.num_positions[j])
+        dtype = np.float32 if compiled.num_input_float32[j] else np.float64
+        for f, a, b in compiled.split_groups:
+            if f != position:
+                continue
+            raw = np.unique(compiled.split_threshold[a:b].astype(np.float64)
+                            * compiled.num_scale[j] + compiled.num_mean[j]).astype(dtype)
+            for v in (np.nextafter(raw, dtype(-np.inf)), raw, np.nextafter(raw, dtype(np.inf))):
+                values.extend((c, float(x)) for x in v)
+    rows = random_rows(compiled, len(values), seed=seed)
+    for row, (c, v) in zip(rows, values):
+        row[c] = v
+    return rows
+
+
+def frame_for(compiled, columns, frame_dtypes=None):
+    """
+    The pipeline's input frame for {column -> values}, numerics cast to the
+    training dtypes (frame_dtypes, ml.serving_frame_dtypes) as app/ml.py serves them.
+    """
+    frame_dtypes = frame_dtypes or {}
+    X = pd.DataFrame(columns, columns=compiled.columns)
+    for c in compiled.num_columns:
+        X[c] = pd.to_numeric(X[c], errors="coerce").astype(frame_dtypes.get(c, np.float64))
+    return X
+
+
+def max_diff(model, compiled, columns, n, frame_dtypes=None):
+    """max |compiled - pipeline predict_proba| over n rows given as {column -> values}."""
+    pre, clf = _pipeline_parts(model)
+    expected = clf.predict_proba(pre.transform(frame_for(compiled, columns, frame_dtypes)))[:, 1]
+    got = compiled.predict_proba(columns, n)
+    return float(np.max(np.abs(expected - got)))
+
+
+def training_rows(frame, compiled, n, seed=0):
+    """{column -> values} for a sample of n rows of a training frame (train.data's cache), None = missing."""
+    sample = frame.sample(min(n, len(frame)), random_state=seed)
+    columns = {}
+    for c in compiled.columns:
+        values = sample[c].astype(object) if c in sample else pd.Series([None] * len(sample), dtype=object)
+        columns[c] = [None if v is None or v != v else v for v in values.tolist()]
+    return columns, len(sample)
+
+
+def check_parity(model, compiled, n_rows, tolerance, frame=None, frame_dtypes=None):
+    """
+    Parity on random rows, on rows at every split threshold (cut_point_rows)
+    and, with frame (a training DataFrame), on a sample of its real rows; the
+    pipeline gets frame_dtypes like the served frame. Prints the max difference
+    of each; True when all are within tolerance.
+    """
+    cases = []
+    for name, rows in (("random", random_rows(compiled, n_rows)), ("cut-point", cut_point_rows(compiled))):
+        if rows:
+            cases.append((name, {c: [r.get(c) for r in rows] for c in compiled.columns}, len(rows)))
+    if frame is not None:
+        cases.append(("training",) + training_rows(frame, compiled, n_rows))
+    ok = True
+    for name, columns, n in cases:
+        diff = max_diff(model, compiled, columns, n, frame_dtypes)
+        print(f"Parity on {n} {name} rows: max |compiled - predict_proba| = {diff:.3g}")
+        ok = ok and diff <= tolerance
+    return ok
+
+
+def export_model_file(model_path, out_path, rows=5000, tolerance=1e-5):
+    """Export model_path to out_path (written atomically) and parity-check it. Returns True on success."""
+    import joblib
+    model = joblib.load(model_path)
+    model_sha256 = ml._file_sha256(model_path)
+    # the training frame's numeric dtypes come from the serving schema written with the model
+    serving = ml._read_serving_schema(ml.serving_schema_path_for(model_path), model_sha256)
+    frame_dtypes = ml.serving_frame_dtypes(serving) if serving else None
+    arrays = export_pipeline(model, frame_dtypes)
+    arrays["source_sha256"] = np.array(model_sha256)
+
+    tmp = out_path + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, out_path)
+    print(f"Wrote {out_path}: {len(arrays['tree_roots'])} trees, "
+          f"{int(arrays['n_features'])} features, depth {int(arrays['tree_depth'])}")
+
+    with np.load(out_path, allow_pickle=False) as loaded:
+        compiled = ml.CompiledModel(loaded)
+    if not check_parity(model, compiled, rows, tolerance, frame_dtypes=frame_dtypes):
+        return False
+
+    # Runtime layout that workers memory-map and share through the page cache
+    mmap_dir = ml.mmap_path_for(out_path)
+    compiled.save_mmap(mmap_dir)
+    print(f"Wrote {mmap_dir}")
+    return check_parity(model, ml.CompiledModel.load_mmap(mmap_dir), rows, tolerance,
+                        frame_dtypes=frame_dtypes)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default=ml.MODEL_PATH)
+    ap.add_argument("--out", default=ml.COMPILED_MODEL_PATH)
+    ap.add_argument("--rows", type=int, default=5000, help="rows used for the parity check")
+    ap.add_argument("--tolerance", type=float, default=1e-5)
+    args = ap.parse_args()
+
+    if not export_model_file(args.model, args.out, args.rows, args.tolerance):
+        print("PARITY CHECK FAILED")
+        sys.exit(1)
+    print("Parity OK")
+
+
+if __name__ == "__main__":
+    main()
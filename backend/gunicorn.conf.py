@@ -0,0 +1,62 @@
+# backend/gunicorn.conf.py
+#
+#     gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Workers and threads are derived from the container's CPU quota (cgroup),
+# not the node's core count, so a pod limited to 500m does not start one
+# worker per host CPU. Every value can be overridden with a GUNICORN_* env var.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Workers write their metric samples here and any worker's /metrics merges them
+# (app/metrics.py); set before the app is imported, which reads it once
+if not os.getenv("METRICS_MULTIPROC_DIR"):
+    os.environ["METRICS_MULTIPROC_DIR"] = "/dev/shm/loan-metrics" if os.path.isdir("/dev/shm") else "/tmp/loan-metrics"
+
+from app.server import cpu_quota, worker_count  # noqa: E402
+
+_cpus = cpu_quota()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS") or worker_count(_cpus))
+# Threads cover I/O waits (MongoDB, the hashing pool) inside each worker
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Load + warm the model once in the master; workers inherit it copy-on-write
+# (the MongoClient is not: each worker opens its own, see wsgi.py)
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").lower() in ("1", "true", "yes")
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Heartbeat files on tmpfs: a slow container filesystem must not stall workers
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+# Split the remaining CPU budget between the workers' native thread pools and
+# hashing pools instead of letting each worker size them for the whole node
+_per_worker = max(1, int(_cpus // max(workers, 1)))
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "PASSWORD_HASH_WORKERS"):
+    os.environ.setdefault(_var, str(_per_worker))
+
+
+def on_starting(server):
+    """Drop the metric files of a previous run before any worker forks."""
+    from app.metrics import reset_multiproc_dir
+    reset_multiproc_dir()
+
+
+def post_worker_init(worker):
+    """Runs in each worker once the app is loaded: open its MongoClient, start its threads and pools."""
+    from app.server import start_worker
+    start_worker(worker.wsgi)
+
+
+def when_ready(server):
+    server.log.info("cpu quota %.2f -> %d workers x %d threads (preload=%s)",
+                    _cpus, workers, threads, preload_app)
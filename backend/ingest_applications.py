@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Bulk-load loan applications from a partner file (CSV or NDJSON, optionally .gz).
+
+Same validation, scoring and writes as POST /api/loan/applications/bulk
+(app/ingest.py): rows are coerced like single applications, scored a chunk
+at a time and inserted with unordered insert_many. Rows that fail are listed
+in the report with their row number; the rest are loaded.
+
+    cd backend
+    python ingest_applications.py partner.csv --user-id <owner ObjectId>
+    python ingest_applications.py partner.ndjson.gz --row-user-id --report report.json
+    python ingest_applications.py partner.csv --user-id <id> --no-score   # score later in the worker
+
+Applications inserted unscored (--no-score, or scoring failed) are picked up by
+the backend's scoring recovery sweep (SCORING_SWEEP_INTERVAL).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from app.ingest import INGEST_CHUNK_SIZE, detect_format, ingest_rows, open_text, read_rows
+from app.mongo import client_options
+
+
+def main():
+    load_dotenv()
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("file")
+    ap.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    ap.add_argument("--user-id", help="owner of every row (ObjectId of the partner / user account)")
+    ap.add_argument("--row-user-id", action="store_true", help="take the owner from each row's user_id column")
+    ap.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    ap.add_argument("--no-score", action="store_true", help="insert unscored")
+    ap.add_argument("--report", help="write the full JSON report here")
+    ap.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017/loansdb"))
+    args = ap.parse_args()
+
+    fmt = args.format or detect_format(args.file)
+    if fmt is None:
+        raise SystemExit("Cannot tell the format from the file name; pass --format csv|ndjson")
+    if not args.user_id and not args.row_user_id:
+        raise SystemExit("Pass --user-id or --row-user-id")
+    owner = ObjectId(args.user_id) if args.user_id else None
+
+    client = MongoClient(args.mongo_uri, **client_options())
+    db = client.get_default_database()
+    db = db if db is not None else client["loansdb"]
+
+    with open(args.file, "rb") as fh:
+        rows = read_rows(open_text(fh, gzipped=args.file.endswith(".gz")), fmt)
+        report = ingest_rows(db.loan_applications, rows, default_user=owner,
+                             allow_row_user=args.row_user_id, chunk_size=args.chunk_size,
+                             score=not args.no_score).to_dict()
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    print(f"{report['received']} rows: {report['inserted']} inserted, {report['scored']} scored, "
+          f"{report['failed']} failed in {report['seconds']}s ({report['rows_per_minute']} rows/min)")
+    for err in report["errors"][:20]:
+        print(f"  row {err['row']}: {err['error']}")
+    if report["failed"] > 20:
+        print(f"  ... {report['failed'] - 20} more" + (f" (see {args.report})" if args.report else ""))
+    if report["stopped_at_row"] is not None:
+        print(f"Stopped at row {report['stopped_at_row']}: {report['stop_error']} "
+              f"(rows before it are loaded)")
+        return 1
+    return 1 if report["failed"] and not report["inserted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Manage the local model registry (models/registry, or ML_REGISTRY_DIR).
+
+Each published version is an immutable directory:
+
+    models/registry/<version>/model.joblib
+                              model.schema.json       (serving schema, when training wrote one)
+                              feature_defaults.json   (optional)
+                              model.compiled.npz      (optional, --compile)
+                              model.compiled.mmap/    (memory-mapped layout, with --compile)
+
+and models/registry/manifest.json names the active version. Running backends
+poll the manifest (ML_SCHEMA_CHECK_INTERVAL) and hot-swap to a newly activated
+version without a restart; requests already in flight finish on the old one.
+
+    cd backend
+    python model_registry.py publish models/xgb_loan_model.joblib --defaults models/feature_defaults.json --compile --activate
+    python model_registry.py list
+    python model_registry.py activate <version>
+    python model_registry.py rollback
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+
+from app import ml
+
+
+def _manifest_path(registry):
+    return os.path.join(registry, "manifest.json")
+
+
+def load_manifest(registry):
+    return ml.read_manifest(_manifest_path(registry)) or {"active": None, "previous": None, "versions": {}}
+
+
+def write_manifest(registry, manifest):
+    """Write the manifest atomically so a polling backend never reads half a file."""
+    path = _manifest_path(registry)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def publish(registry, model_path, version=None, defaults_path=None, compile_model=False):
+    sha = ml._file_sha256(model_path)
+    version = version or datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S-") + sha[:8]
+    manifest = load_manifest(registry)
+    final_dir = os.path.join(registry, version)
+    if version in manifest["versions"] or os.path.exists(final_dir):
+        raise SystemExit(f"Version {version} already exists; versions are immutable.")
+
+    # Stage everything, then rename into place: a version directory is complete or absent
+    staging = os.path.join(registry, f".staging-{version}")
+    os.makedirs(staging)
+    try:
+        shutil.copy2(model_path, os.path.join(staging, "model.joblib"))
+        files = ["model.joblib"]
+        schema_path = ml.serving_schema_path_for(model_path)
+        if os.path.exists(schema_path):
+            shutil.copy2(schema_path, os.path.join(staging, "model.schema.json"))
+            files.append("model.schema.json")
+        if defaults_path:
+            shutil.copy2(defaults_path, os.path.join(staging, "feature_defaults.json"))
+            files.append("feature_defaults.json")
+        if compile_model:
+            from export_compiled_model import export_model_file
+            if not export_model_file(os.path.join(staging, "model.joblib"),
+                                     os.path.join(staging, "model.compiled.npz")):
+                raise SystemExit("Compiled export failed its parity check; nothing published.")
+            files += ["model.compiled.npz", "model.compiled.mmap"]
+        os.rename(staging, final_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    manifest["versions"][version] = {
+        "published_at": datetime.datetime.utcnow().isoformat() + "Z",
+        "sha256": sha,
+        "source": os.path.abspath(model_path),
+        "files": files,
+    }
+    write_manifest(registry, manifest)
+    print(f"Published {version} ({', '.join(files)})")
+    return version
+
+
+def activate(registry, version):
+    manifest = load_manifest(registry)
+    if version not in manifest["versions"]:
+        raise SystemExit(f"Unknown version {version}. Known: {', '.join(sorted(manifest['versions'])) or 'none'}")
+    if manifest.get("active") != version:
+        manifest["previous"] = manifest.get("active")
+        manifest["active"] = version
+        write_manifest(registry, manifest)
+    print(f"Active version: {version}")
+
+
+def rollback(registry):
+    manifest = load_manifest(registry)
+    previous = manifest.get("previous")
+    if not previous:
+        raise SystemExit("No previous version to roll back to.")
+    activate(registry, previous)
+
+
+def list_versions(registry):
+    manifest = load_manifest(registry)
+    for version, info in sorted(manifest["versions"].items()):
+        mark = "*" if version == manifest.get("active") else " "
+        print(f"{mark} {version}  {info.get('published_at', '')}  {', '.join(info.get('files', []))}")
+    if not manifest["versions"]:
+        print("(registry is empty)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--registry", default=ml.REGISTRY_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("publish", help="copy a model into the registry as a new version")
+    p.add_argument("model")
+    p.add_argument("--version")
+    p.add_argument("--defaults", help="feature_defaults.json to ship with this version")
+    p.add_argument("--compile", action="store_true", help="also build model.compiled.npz")
+    p.add_argument("--activate", action="store_true", help="make it the active version")
+
+    p = sub.add_parser("activate", help="point the manifest at a published version")
+    p.add_argument("version")
+
+    sub.add_parser("rollback", help="re-activate the previously active version")
+    sub.add_parser("list", help="list published versions")
+
+    args = ap.parse_args()
+    os.makedirs(args.registry, exist_ok=True)
+
+    if args.cmd == "publish":
+        version = publish(args.registry, args.model, args.version, args.defaults, args.compile)
+        if args.activate:
+            activate(args.registry, version)
+    elif args.cmd == "activate":
+        activate(args.registry, args.version)
+    elif args.cmd == "rollback":
+        rollback(args.registry)
+    else:
+        list_versions(args.registry)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+# backend/train/__init__.py
+#
+# Training for the loan default model: python -m backend.train (see __main__.py).
+# Nothing here is imported by the Flask app.
+
+import os
+import sys
+
+# backend/ on sys.path, so the package also works as backend.train from the repo root
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
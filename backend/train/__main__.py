@@ -0,0 +1,91 @@
+"""
+Train the boosted loan-default model.
+
+Reads the Loan_default-shaped CSV through the columnar cache, searches the
+XGBoost hyperparameters with cross-validation, refits the winner, evaluates
+it on a 20% holdout and writes into --output:
+
+    <model-name>                 the fitted ('pre', ['smote',] 'clf') pipeline
+    <model stem>.schema.json     serving schema: column order, dtypes, medians /
+                                 modes, known categories (read by app/ml.py)
+    feature_defaults.json        the imputer medians / modes
+    <report-name>                CV / holdout metrics, search and thread settings
+
+Each file is written under a temporary name and renamed into place.
+
+--n-jobs is the total thread budget (-1 = the CPUs this process may use).
+With --parallel processes (cached / native modes) the CV folds run in a
+process pool with --n-jobs split evenly between the workers; inside each
+worker --xgb-threads threads per fit.
+
+    python -m backend.train --dataset /data/Loan_default.csv --output /jobs/42/model
+    cd backend && python -m train --dataset /data/Loan_default.csv --trials 50 --folds 5 --n-jobs 32
+"""
+
+import argparse
+import os
+import sys
+
+from train import BACKEND_DIR
+
+# Not models/ itself: feature_defaults.json there belongs to the model being served
+DEFAULT_OUTPUT = os.path.join(BACKEND_DIR, "models", "trained")
+SEARCH_MODES = ("cached", "sklearn", "halving", "native")
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.train", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dataset", default=os.environ.get("TRAIN_DATASET"),
+                    help="training CSV (default: $TRAIN_DATASET)")
+    ap.add_argument("--output", dest="output_dir", default=DEFAULT_OUTPUT,
+                    help="directory for the model, feature_defaults.json and report (default: %(default)s)")
+    ap.add_argument("--model-name", default="xgb_improved.joblib")
+    ap.add_argument("--report-name", default="training_report_boosted.json")
+    ap.add_argument("--cache-dir", default=os.path.join(BACKEND_DIR, "models", "cache"),
+                    help="columnar .npy cache of the CSV (default: %(default)s)")
+    ap.add_argument("--sample-rows", type=int, default=None, help="only read the first N rows (quick runs)")
+    ap.add_argument("--chunk-rows", type=int, default=100_000, help="CSV rows parsed per chunk")
+    ap.add_argument("--seed", type=int, default=42)
+
+    search = ap.add_argument_group("search")
+    search.add_argument("--search-mode", choices=SEARCH_MODES, default="cached")
+    search.add_argument("--trials", type=int, default=20, help="random-search candidates (cached/sklearn/native)")
+    search.add_argument("--folds", type=int, default=3, help="CV folds")
+    search.add_argument("--max-rounds", type=int, default=600,
+                        help="upper bound of n_estimators; rounds of the last halving rung")
+    search.add_argument("--max-bin", type=int, default=256, help="histogram bins per feature")
+    search.add_argument("--halving-candidates", type=int, default=27)
+    search.add_argument("--halving-factor", type=int, default=3)
+    search.add_argument("--early-stopping-rounds", type=int, default=30, help="halving mode")
+    search.add_argument("--early-stopping-fraction", type=float, default=0.1,
+                        help="halving mode: share of each fold's training rows held out for early stopping")
+
+    threads = ap.add_argument_group("threads")
+    threads.add_argument("--n-jobs", type=int, default=-1,
+                         help="total thread budget (-1 = all CPUs available to the process)")
+    threads.add_argument("--xgb-threads", type=int, default=4, help="threads per XGBoost fit")
+    threads.add_argument("--parallel", choices=("processes", "threads"), default="processes",
+                         help="run CV folds in worker processes or on threads of this one (cached/native)")
+
+    cfg = ap.parse_args(argv)
+    if not cfg.dataset:
+        ap.error("--dataset is required (or set TRAIN_DATASET)")
+    if not os.path.exists(cfg.dataset):
+        ap.error(f"dataset not found: {cfg.dataset}")
+    if cfg.folds < 2:
+        ap.error("--folds must be at least 2")
+    if not 0 < cfg.early_stopping_fraction < 1:
+        ap.error("--early-stopping-fraction must be between 0 and 1")
+    return cfg
+
+
+def main(argv=None):
+    cfg = parse_args(argv)
+    from train.boosted import train
+    train(cfg)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# backend/train/artifacts.py
+#
+# Training outputs: the model .joblib, its serving schema (<model>.schema.json),
+# feature_defaults.json and the report. Each file is written to a temporary
+# name in the output directory and
+# os.replace()d into place, so a backend (or model_registry.py publish)
+# never picks up a half-written model, and a failed run leaves the previous
+# outputs untouched. The model goes last: its mtime is what app/ml.py
+# watches, and by then the schema and defaults next to it are already current.
+
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+
+def _write_atomic(path, write):
+    """write(tmp_path), then rename over path; the temporary file never survives a failure."""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_json_atomic(path, obj):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(obj, fh, indent=2, default=_json_default)
+            fh.flush()
+            os.fsync(fh.fileno())
+    _write_atomic(path, write)
+
+
+def _json_default(v):
+    # numpy scalars from scipy.stats samples / sklearn statistics_
+    if isinstance(v, np.generic):
+        return v.item()
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+def schema_path_for(model_path):
+    """Serving schema written next to a model (x.joblib -> x.schema.json), like x.compiled.npz."""
+    return os.path.splitext(model_path)[0] + ".schema.json"
+
+
+def serving_schema(model, dtypes):
+    """
+    The serving schema of a fitted ('pre', ...) pipeline: its input columns in
+    order, each with kind, training dtype, the value its imputer fills in
+    (numeric median / categorical mode) and, for categoricals, the categories
+    the one-hot encoder knows. `dtypes` maps column -> training dtype name.
+    app/ml.py validates and vectorizes requests against it.
+    """
+    pre = model.named_steps["pre"]
+    specs = {}
+    for name, trans, cols in pre.transformers_:
+        kind = "numeric" if name.startswith("num") else "categorical" if name.startswith("cat") else None
+        if kind is None or not hasattr(trans, "named_steps"):
+            continue
+        stats = trans.named_steps["imputer"].statistics_
+        ohe = trans.named_steps.get("ohe")
+        for j, (col, value) in enumerate(zip(cols, stats)):
+            dtype = dtypes.get(col, "float32" if kind == "numeric" else "category")
+            spec = {"name": col, "kind": kind, "dtype": str(dtype)}
+            if kind == "numeric":
+                # the cache holds float32 columns: keep their shortest repr (13.46, not 13.4600000381)
+                spec["default"] = float(str(np.float32(value)))
+            else:
+                spec["default"] = str(value)
+                if ohe is not None:
+                    spec["categories"] = [str(c) for c in ohe.categories_[j]]
+            specs[col] = spec
+    order = [c for c in getattr(pre, "feature_names_in_", specs) if c in specs]
+    return {"version": SCHEMA_VERSION, "columns": [specs[c] for c in order]}
+
+
+def feature_defaults(schema):
+    """feature_defaults.json content (numeric medians, categorical modes) from a serving schema."""
+    out = {"numeric": {}, "categorical": {}}
+    for spec in schema["columns"]:
+        out[spec["kind"]][spec["name"]] = spec["default"]
+    return out
+
+
+def save_outputs(model, out_dir, model_name, report, report_name, dtypes):
+    """
+    Write the model, its serving schema, feature_defaults.json and the report
+    into out_dir; return their paths. The model is dumped first (the schema
+    records its sha256) but renamed into place last.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    model_path = os.path.join(out_dir, model_name)
+    paths = {
+        "model": model_path,
+        "schema": schema_path_for(model_path),
+        "defaults": os.path.join(out_dir, "feature_defaults.json"),
+        "report": os.path.join(out_dir, report_name),
+    }
+
+    def write_all(tmp_model):
+        joblib.dump(model, tmp_model)
+        schema = serving_schema(model, dtypes)
+        schema.update(model=model_name, model_sha256=_sha256(tmp_model), target=report.get("target"))
+        write_json_atomic(paths["schema"], schema)
+        write_json_atomic(paths["defaults"], feature_defaults(schema))
+        write_json_atomic(paths["report"], report)
+    _write_atomic(model_path, write_all)
+    return paths
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
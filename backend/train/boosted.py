@@ -0,0 +1,225 @@
+# backend/train/boosted.py
+#
+# The boosted loan-default model, end to end: cached feature-engineered
+# dataset (train/data.py) -> ('pre', ['smote',] 'clf') pipeline -> random /
+# halving search -> refit -> holdout evaluation -> model, serving schema,
+# feature_defaults.json and report (train/artifacts.py). Every setting comes from the CLI in
+# train/__main__.py; train_boosted_improved.py is a thin wrapper around it.
+
+import time
+
+import pandas as pd
+from scipy.stats import randint, uniform
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import accuracy_score, classification_report, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from xgboost import XGBClassifier
+
+from train.artifacts import save_outputs
+from train.data import load_dataset, peak_rss_mb
+from train.folds import FoldCache, cached_search, halving_search, thread_budget
+from train.native import DMatrixFolds, fit_native, native_search
+from train.pool import fold_pool_search
+
+# optional imblearn
+USE_SMOTE = False
+try:
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline as ImbPipeline
+    USE_SMOTE = True
+except Exception:
+    from sklearn.pipeline import Pipeline as ImbPipeline
+
+THRESHOLDS = [0.5, 0.4, 0.35, 0.3, 0.25]
+
+
+# ----------------------------------------------------------------------
+# MODEL
+# ----------------------------------------------------------------------
+
+def build_pipeline(X, y_train, cfg, xgb_threads):
+    """(pre, unfitted pipeline, clf__* search space) for the columns of X."""
+    num_cols = X.select_dtypes(include=['number']).columns.tolist()
+    cat_cols = X.select_dtypes(include=['object', 'category', 'bool']).columns.tolist()
+    print("Numeric:", len(num_cols), "Categorical:", len(cat_cols))
+
+    num_pipe = Pipeline([('imputer', SimpleImputer(strategy='median')), ('scaler', StandardScaler(with_mean=False))])
+    cat_pipe = Pipeline([('imputer', SimpleImputer(strategy='most_frequent')),
+                         ('ohe', OneHotEncoder(handle_unknown='ignore', sparse_output=True))])
+    pre = ColumnTransformer([('num', num_pipe, num_cols), ('cat', cat_pipe, cat_cols)], sparse_threshold=0.3)
+
+    base = XGBClassifier(eval_metric='logloss', tree_method='hist', max_bin=cfg.max_bin, n_jobs=xgb_threads,
+                         random_state=cfg.seed)
+    param_dist = {
+        'clf__n_estimators': randint(100, cfg.max_rounds),
+        'clf__max_depth': randint(3, 10),
+        'clf__learning_rate': uniform(0.01, 0.25),
+        'clf__subsample': uniform(0.6, 0.4),
+        'clf__colsample_bytree': uniform(0.6, 0.4),
+        'clf__min_child_weight': randint(1, 10)
+    }
+
+    if USE_SMOTE:
+        print("Using SMOTE in pipeline.")
+        pipeline = ImbPipeline([('pre', pre), ('smote', SMOTE(random_state=cfg.seed)), ('clf', base)])
+    else:
+        # set initial scale_pos_weight heuristic
+        neg = int((y_train == 0).sum())
+        pos = int((y_train == 1).sum())
+        scale_pos = (neg / pos) if pos > 0 else 1.0
+        base.set_params(scale_pos_weight=scale_pos)
+        pipeline = Pipeline([('pre', pre), ('clf', base)])
+        print("SMOTE not available. Using scale_pos_weight:", scale_pos)
+    return pre, pipeline, param_dist
+
+
+# ----------------------------------------------------------------------
+# SEARCH
+# ----------------------------------------------------------------------
+
+def search(cfg, pre, pipeline, param_dist, X_train, y_train, parallel_fits, xgb_threads, refit_threads):
+    """
+    Run cfg.search_mode and refit the winner on the whole training split.
+    Returns (fitted pipeline, best CV AUC, best params, search info).
+
+    cached / native with --parallel processes spread the CV folds over a
+    process pool (train/pool.py); with --parallel threads they share one
+    process's fold cache (train/folds.py, train/native.py). halving always
+    runs on the fold cache; sklearn is RandomizedSearchCV over the pipeline.
+    """
+    cv = StratifiedKFold(n_splits=cfg.folds, shuffle=True, random_state=cfg.seed)
+    sampler = SMOTE(random_state=cfg.seed) if USE_SMOTE else None
+    clf = pipeline.named_steps['clf']
+    mode = cfg.search_mode
+
+    if mode in ("cached", "native") and cfg.parallel == "processes":
+        res = fold_pool_search(clf, param_dist, pre, X_train, y_train, cv, n_iter=cfg.trials, sampler=sampler,
+                               n_jobs=cfg.n_jobs, xgb_threads=cfg.xgb_threads, random_state=cfg.seed,
+                               native=(mode == "native"), max_bin=cfg.max_bin)
+    elif mode in ("cached", "halving", "native"):
+        # halving early-stops on a holdout of each fold's training rows, never on the scored fold
+        es_fraction = cfg.early_stopping_fraction if mode == "halving" else 0.0
+        folds = FoldCache(pre, X_train, y_train, cv, sampler=sampler, es_fraction=es_fraction,
+                          random_state=cfg.seed)
+        print("Fold cache: %.0f MiB" % (folds.nbytes() / 2**20))
+        if mode == "native":
+            folds = DMatrixFolds(folds, max_bin=cfg.max_bin, nthread=refit_threads)  # frees the float32 copies
+            res = native_search(clf, param_dist, folds, n_iter=cfg.trials, n_jobs=parallel_fits,
+                                xgb_threads=xgb_threads, random_state=cfg.seed)
+        elif mode == "halving":
+            res = halving_search(clf, param_dist, folds, n_candidates=cfg.halving_candidates,
+                                 factor=cfg.halving_factor, max_rounds=cfg.max_rounds,
+                                 early_stopping_rounds=cfg.early_stopping_rounds, n_jobs=parallel_fits,
+                                 random_state=cfg.seed)
+        else:
+            res = cached_search(clf, param_dist, folds, n_iter=cfg.trials, n_jobs=parallel_fits,
+                                random_state=cfg.seed)
+        del folds
+    else:
+        rs = RandomizedSearchCV(pipeline, param_distributions=param_dist, n_iter=cfg.trials, scoring='roc_auc',
+                                n_jobs=parallel_fits, cv=cv, verbose=2, random_state=cfg.seed, refit=False)
+        rs.fit(X_train, y_train)
+        res = {"best_score": rs.best_score_, "best_params": rs.best_params_, "trials": cfg.trials,
+               "fits": cfg.trials * cfg.folds,
+               "budget_rounds": int(sum(rs.cv_results_['param_clf__n_estimators']) * cfg.folds)}
+
+    best_score, best_params = res["best_score"], res["best_params"]
+    if mode == "native":
+        best = fit_native(pipeline, X_train, y_train, best_params, max_bin=cfg.max_bin, nthread=refit_threads)
+    else:
+        best = clone(pipeline).set_params(**best_params, clf__n_jobs=refit_threads).fit(X_train, y_train)
+    info = {"parallel_fits": parallel_fits, "xgb_threads": xgb_threads}
+    info.update((k, res[k]) for k in ("trials", "fits", "budget_rounds", "rungs", "workers", "parallel_fits",
+                                      "xgb_threads") if k in res)
+    return best, best_score, best_params, info
+
+
+# ----------------------------------------------------------------------
+# RUN
+# ----------------------------------------------------------------------
+
+def evaluate(model, X_hold, y_hold):
+    y_pred = model.predict(X_hold)
+    y_proba = model.predict_proba(X_hold)[:, 1]
+    metrics = {
+        "holdout_acc": float(accuracy_score(y_hold, y_pred)),
+        "holdout_auc": float(roc_auc_score(y_hold, y_proba)),
+        "holdout_recall": float(recall_score(y_hold, y_pred)),
+    }
+    print("Holdout — Acc:%.4f AUC:%.4f Recall:%.4f Precision:%.4f" % (
+        metrics["holdout_acc"], metrics["holdout_auc"], metrics["holdout_recall"],
+        precision_score(y_hold, y_pred)))
+    print(classification_report(y_hold, y_pred))
+
+    # try lowering threshold to increase recall (show a few options)
+    for t in THRESHOLDS:
+        p = (y_proba >= t).astype(int)
+        print(f"Threshold {t}: Acc {accuracy_score(y_hold, p):.4f}, Recall {recall_score(y_hold, p):.4f}, "
+              f"Precision {precision_score(y_hold, p):.4f}")
+    return metrics
+
+
+def train(cfg):
+    """Train, evaluate and save one model as configured by the CLI; returns the report."""
+    print("Loading data...")
+    # Streams the CSV in chunks with compact dtypes, applies the feature engineering
+    # (ID columns dropped, loan_to_income, dti, credit_bin, has_cosigner_flag,
+    # is_salaried) per chunk and caches the result as .npy columns; later runs
+    # memory-map the cache. See train/data.py.
+    dataset = load_dataset(cfg.dataset, cfg.cache_dir, nrows=cfg.sample_rows, chunk_rows=cfg.chunk_rows)
+    print("Target:", dataset.target_name)
+
+    # columns more than 90% missing are dropped; y is already 0/1
+    drop_cols = dataset.high_missing(0.9)
+    if drop_cols:
+        print("Dropping high-missing columns:", drop_cols)
+    X = dataset.frame(drop_missing_above=0.9)
+    y = pd.Series(dataset.target(), name=dataset.target_name)
+    print("Loaded %d rows, peak RSS %.0f MiB" % (len(X), peak_rss_mb()))
+    print("Positive ratio:", float(y.mean()))
+
+    X_train, X_hold, y_train, y_hold = train_test_split(X, y, test_size=0.2, random_state=cfg.seed, stratify=y)
+    print("Train/hold sizes:", X_train.shape, X_hold.shape)
+
+    # parallel fits x XGBoost threads stays within the thread budget; the refit gets all of it
+    parallel_fits, xgb_threads = thread_budget(cfg.n_jobs, cfg.xgb_threads)
+    _, refit_threads = thread_budget(cfg.n_jobs, per_model=None)
+    print("Parallel fits:", parallel_fits, "x XGBoost threads:", xgb_threads, "(refit:", refit_threads, "threads)")
+    pre, pipeline, param_dist = build_pipeline(X, y_train, cfg, xgb_threads)
+
+    print("Starting search (mode=", cfg.search_mode, ")")
+    t0 = time.time()
+    best, best_score, best_params, search_info = search(cfg, pre, pipeline, param_dist, X_train, y_train,
+                                                        parallel_fits, xgb_threads, refit_threads)
+    t1 = time.time()
+    print("Search time (s):", t1 - t0)
+    print("Best CV AUC:", best_score)
+    print("Best params:", best_params)
+
+    report = {"best_cv_auc": float(best_score)}
+    report.update(evaluate(best, X_hold, y_hold))
+    report.update({
+        "best_params": best_params,
+        "search_mode": cfg.search_mode,
+        "search_time_seconds": float(t1 - t0),
+        "search": dict(search_info, parallel=cfg.parallel, refit_threads=refit_threads, tree_method="hist",
+                       max_bin=cfg.max_bin),
+        "dataset": cfg.dataset,
+        "target": dataset.target_name,
+        "seed": cfg.seed,
+        "folds": cfg.folds,
+        "rows": int(len(X)),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    })
+
+    dtypes = {c: X[c].dtype.name for c in X.columns}
+    paths = save_outputs(best, cfg.output_dir, cfg.model_name, report, cfg.report_name, dtypes)
+    print("Saved model to", paths["model"])
+    print("Saved serving schema to", paths["schema"])
+    print("Saved feature defaults to", paths["defaults"])
+    print("Saved report to", paths["report"])
+    return report
@@ -0,0 +1,286 @@
+# backend/train/data.py
+#
+# Out-of-core training data: the CSV is streamed in chunks with compact
+# dtypes (float32 numerics, categorical strings), feature-engineered per
+# chunk and appended to a columnar cache of .npy files:
+#
+#     <cache dir>/<csv name>-<key>/meta.json
+#                                  <column>.npy   float32 values / int16 category codes
+#                                  __target__.npy int8
+#
+# The key covers the CSV's path, size and mtime, the row limit and
+# CACHE_VERSION, so a changed file or loader gets a fresh cache. Training
+# memory-maps the cache instead of holding pandas' object columns, and no
+# stage ever has more than one chunk of the CSV in memory.
+
+import hashlib
+import json
+import os
+import resource
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app import features
+
+
+# ----------------------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------------------
+
+CACHE_VERSION = 1
+CHUNK_ROWS = 100_000
+TARGET_FILE = "__target__"
+
+TARGET_CANDIDATES = ['Default', 'default', 'loan_default', 'LoanDefault', 'Label', 'label',
+                     'target', 'is_default']
+POSITIVE_LABELS = ['1', 'yes', 'y', 'true', 't', 'default', 'd']
+
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    # VmHWM belongs to this process image; ru_maxrss survives exec() and can
+    # report the parent's peak for a freshly spawned child
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ----------------------------------------------------------------------
+# SCHEMA SNIFFING
+# ----------------------------------------------------------------------
+
+def _is_id_column(name):
+    return 'id' in name.lower()
+
+
+def sniff_dtypes(csv_path, sample_rows=2000):
+    """
+    read_csv dtypes from a sample: float32 for numeric columns, category for
+    the rest. ID columns are left out entirely (never parsed).
+    """
+    sample = pd.read_csv(csv_path, nrows=sample_rows)
+    dtypes = {}
+    for col in sample.columns:
+        if _is_id_column(col):
+            continue
+        dtypes[col] = "float32" if pd.api.types.is_numeric_dtype(sample[col]) else "category"
+    return dtypes
+
+
+def detect_target(columns):
+    target = next((c for c in TARGET_CANDIDATES if c in columns), None)
+    if target is None:
+        raise RuntimeError("No target column found; expected one of " + ", ".join(TARGET_CANDIDATES))
+    return target
+
+
+def encode_target(s):
+    """0/1 int8 target for one chunk (string labels or a 0/1 numeric column)."""
+    if s.dtype == object or s.dtype.name == 'category' or s.dtype == bool:
+        return s.astype(str).str.lower().isin(POSITIVE_LABELS).to_numpy(np.int8)
+    values = s.dropna().unique()
+    if not set(values) <= {0, 1}:
+        # A chunk can't see the whole column, so only 0/1 numeric targets are safe to stream
+        raise ValueError(f"Numeric target {s.name!r} must be 0/1, found {sorted(values)[:5]}")
+    return s.fillna(0).to_numpy(np.int8)
+
+
+# ----------------------------------------------------------------------
+# FEATURE ENGINEERING (per chunk)
+# ----------------------------------------------------------------------
+
+def add_features(df):
+    """
+    Derived training columns (app/features.py), added in place to one chunk.
+    The serving path derives the same columns from each request.
+    """
+    derived = features.derive_columns({c: df[c].to_numpy() for c in df.columns})
+    for name, values in derived.items():
+        if name == 'credit_bin':
+            # every label as a category, whether or not this chunk has it (as pd.cut did)
+            values = pd.Categorical(values, categories=features.CREDIT_LABELS)
+        df[name] = values
+    return df
+
+
+# ----------------------------------------------------------------------
+# CACHE
+# ----------------------------------------------------------------------
+
+def cache_key(csv_path, nrows=None):
+    st = os.stat(csv_path)
+    raw = json.dumps([os.path.abspath(csv_path), st.st_size, st.st_mtime_ns, nrows, CACHE_VERSION])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def cache_dir_for(csv_path, cache_root, nrows=None):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_root, f"{name}-{cache_key(csv_path, nrows)}")
+
+
+class _ColumnWriter:
+    """Appends one column's chunks to a raw file; finish() turns it into a .npy."""
+
+    def __init__(self, directory, name, dtype, kind):
+        self.name = name
+        self.kind = kind
+        self.dtype = np.dtype(dtype)
+        self.raw_path = os.path.join(directory, name + ".raw")
+        self.fh = open(self.raw_path, "wb")
+        self.rows = 0
+        self.missing = 0
+        self.vocab = {} if kind == "cat" else None
+
+    def append(self, series):
+        if self.kind == "cat":
+            cat = series if series.dtype.name == 'category' else series.astype('category')
+            # chunk-local category codes -> codes in this column's global vocabulary
+            local = np.array([self.vocab.setdefault(c, len(self.vocab)) for c in cat.cat.categories]
+                             + [-1], dtype=np.int64)
+            if len(self.vocab) > np.iinfo(np.int16).max:
+                raise ValueError(f"Column {self.name!r} has more than 32767 categories; drop it")
+            values = local[cat.cat.codes.to_numpy()].astype(self.dtype)
+            self.missing += int((values < 0).sum())
+        else:
+            values = series.to_numpy(self.dtype, na_value=np.nan) if self.dtype.kind == 'f' \
+                else series.to_numpy(self.dtype)
+            if self.dtype.kind == 'f':
+                self.missing += int(np.isnan(values).sum())
+        self.fh.write(np.ascontiguousarray(values).tobytes())
+        self.rows += len(values)
+
+    def finish(self):
+        self.fh.close()
+        npy_path = self.raw_path[:-4] + ".npy"
+        with open(npy_path, "wb") as out, open(self.raw_path, "rb") as src:
+            np.lib.format.write_array_header_1_0(out, {
+                "descr": np.lib.format.dtype_to_descr(self.dtype),
+                "fortran_order": False,
+                "shape": (self.rows,),
+            })
+            shutil.copyfileobj(src, out, 16 * 1024 * 1024)
+        os.remove(self.raw_path)
+        meta = {"name": self.name, "kind": self.kind, "dtype": self.dtype.str,
+                "missing": self.missing}
+        if self.kind == "cat":
+            meta["categories"] = [str(c) for c in self.vocab]
+        return meta
+
+
+def build_cache(csv_path, cache_root, nrows=None, chunk_rows=CHUNK_ROWS):
+    """Stream csv_path into a new cache directory and return it."""
+    final_dir = cache_dir_for(csv_path, cache_root, nrows)
+    tmp_dir = final_dir + f".tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    t0 = time.perf_counter()
+    dtypes = sniff_dtypes(csv_path)
+    target = detect_target(dtypes)
+    writers = {}
+    rows = 0
+    try:
+        reader = pd.read_csv(csv_path, usecols=list(dtypes), dtype=dtypes,
+                             chunksize=chunk_rows, nrows=nrows)
+        for chunk in reader:
+            y = encode_target(chunk.pop(target))
+            add_features(chunk)
+            if not writers:
+                writers[TARGET_FILE] = _ColumnWriter(tmp_dir, TARGET_FILE, np.int8, "target")
+                for col in chunk.columns:
+                    s = chunk[col]
+                    if s.dtype.name in ('category', 'object', 'bool'):
+                        writers[col] = _ColumnWriter(tmp_dir, col, np.int16, "cat")
+                    else:
+                        dtype = np.int8 if s.dtype == np.int8 else np.float32
+                        writers[col] = _ColumnWriter(tmp_dir, col, dtype, "num")
+            writers[TARGET_FILE].append(pd.Series(y))
+            for col, w in writers.items():
+                if col != TARGET_FILE:
+                    w.append(chunk[col])
+            rows += len(chunk)
+            print(f"[data] {rows} rows cached (peak RSS {peak_rss_mb():.0f} MiB)")
+
+        columns = [w.finish() for w in writers.values()]
+        meta = {
+            "source": os.path.abspath(csv_path),
+            "rows": rows,
+            "target": target,
+            "version": CACHE_VERSION,
+            "columns": [c for c in columns if c["kind"] != "target"],
+            "positive_ratio": float(np.load(os.path.join(tmp_dir, TARGET_FILE + ".npy")).mean()) if rows else 0.0,
+            "build_seconds": round(time.perf_counter() - t0, 2),
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.rename(tmp_dir, final_dir)
+    finally:
+        for w in writers.values():
+            if not w.fh.closed:
+                w.fh.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"[data] Cache written to {final_dir} in {meta['build_seconds']}s")
+    return final_dir
+
+
+class CachedDataset:
+    """A cache directory, read through memory maps."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        self.rows = self.meta["rows"]
+        self.target_name = self.meta["target"]
+        self.columns = {c["name"]: c for c in self.meta["columns"]}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.directory, name + ".npy"), mmap_mode="r")
+
+    def target(self):
+        return np.asarray(self._load(TARGET_FILE), dtype=np.int8)
+
+    def high_missing(self, threshold):
+        """Columns with more than `threshold` (fraction) missing values."""
+        if not self.rows:
+            return []
+        return [c["name"] for c in self.meta["columns"] if c["missing"] / self.rows > threshold]
+
+    def frame(self, columns=None, drop_missing_above=0.9):
+        """
+        Feature DataFrame: float32 / int8 numerics and pandas categoricals
+        (int16 codes), without the columns missing more than drop_missing_above.
+        """
+        drop = set(self.high_missing(drop_missing_above)) if drop_missing_above is not None else set()
+        names = [n for n in (columns or self.columns) if n not in drop]
+        data = {}
+        for name in names:
+            col = self.columns[name]
+            values = self._load(name)
+            if col["kind"] == "cat":
+                data[name] = pd.Categorical.from_codes(np.asarray(values), categories=col["categories"])
+            else:
+                data[name] = np.asarray(values)
+        return pd.DataFrame(data, copy=False)
+
+
+def load_dataset(csv_path, cache_root, nrows=None, chunk_rows=CHUNK_ROWS, rebuild=False):
+    """CachedDataset for csv_path, building the cache first if needed."""
+    directory = cache_dir_for(csv_path, cache_root, nrows)
+    if rebuild or not os.path.exists(os.path.join(directory, "meta.json")):
+        build_cache(csv_path, cache_root, nrows=nrows, chunk_rows=chunk_rows)
+    else:
+        print(f"[data] Using cache {directory}")
+    return CachedDataset(directory)
@@ -0,0 +1,240 @@
+# backend/train/folds.py
+#
+# Hyperparameter search that fits the preprocessing once per CV fold.
+#
+# RandomizedSearchCV over a ('pre', ['smote',] 'clf') pipeline refits the
+# ColumnTransformer (and SMOTE's nearest-neighbour resampling) for every
+# trial and every fold, although only clf__* parameters are searched.
+# FoldCache fits those steps once per fold and keeps the transformed float32
+# matrices; cached_search() then only trains the booster per (trial, fold).
+# The winner is refit as the usual full pipeline, so the saved artifact is
+# unchanged for app/ml.py. halving_search() is the successive-halving variant:
+# many candidates on few boosting rounds, the best third promoted to three
+# times the rounds, with XGBoost early stopping on a holdout carved out of each
+# fold's training rows (FoldCache(es_fraction=...)): the validation fold that
+# ranks the candidates stays untouched, so its AUC compares with the other modes.
+
+import math
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+
+
+def _float32(m):
+    if sp.issparse(m):
+        return m.astype(np.float32).tocsr()
+    return np.ascontiguousarray(m, dtype=np.float32)
+
+
+def prepare_fold(pre, sampler, X_tr, y_tr, X_val, y_val, X_es=None):
+    """
+    (X_train, y_train, X_val, y_val) for one split: `pre` (cloned) fit on the
+    training rows, `sampler` (cloned, optional) resampling them, float32.
+    With X_es (an early-stopping holdout), its transformed matrix is appended.
+    """
+    fold_pre = clone(pre)
+    y_tr = np.asarray(y_tr)
+    Xt_tr = fold_pre.fit_transform(X_tr, y_tr)
+    Xt_val = fold_pre.transform(X_val)
+    if sampler is not None:
+        Xt_tr, y_tr = clone(sampler).fit_resample(Xt_tr, y_tr)
+    fold = (_float32(Xt_tr), np.asarray(y_tr), _float32(Xt_val), np.asarray(y_val))
+    if X_es is not None:
+        fold += (_float32(fold_pre.transform(X_es)),)
+    return fold
+
+
+class FoldCache:
+    """
+    Preprocessed (train, validation) matrices for each CV split.
+
+    folds[i] = (X_train, y_train, X_val, y_val) after pre.fit on the fold's
+    training rows (and sampler.fit_resample when a sampler is given).
+
+    With es_fraction > 0, that share of each fold's training rows (stratified)
+    is held out before pre.fit and the sampler: early_stopping[i] = (X_es, y_es),
+    transformed by the fold's pre and never resampled, for early stopping.
+    """
+
+    def __init__(self, pre, X, y, cv, sampler=None, es_fraction=0.0, random_state=None):
+        self.folds = []
+        self.early_stopping = []
+        y = np.asarray(y)
+        t0 = time.perf_counter()
+        for train_idx, val_idx in cv.split(X, y):
+            es_idx = None
+            if es_fraction > 0:
+                train_idx, es_idx = train_test_split(train_idx, test_size=es_fraction, stratify=y[train_idx],
+                                                     random_state=random_state)
+            fold = prepare_fold(pre, sampler, X.iloc[train_idx], y[train_idx], X.iloc[val_idx], y[val_idx],
+                                X_es=None if es_idx is None else X.iloc[es_idx])
+            self.folds.append(fold[:4])
+            if es_idx is not None:
+                self.early_stopping.append((fold[4], y[es_idx]))
+        self.seconds = time.perf_counter() - t0
+        print(f"[folds] Preprocessed {len(self.folds)} folds in {self.seconds:.1f}s")
+
+    def __len__(self):
+        return len(self.folds)
+
+    def nbytes(self):
+        total = 0
+        matrices = [m for X_tr, _, X_val, _ in self.folds for m in (X_tr, X_val)]
+        matrices += [X_es for X_es, _ in self.early_stopping]
+        for m in matrices:
+            total += (m.data.nbytes + m.indices.nbytes + m.indptr.nbytes) if sp.issparse(m) else m.nbytes
+        return total
+
+
+def thread_budget(n_jobs=-1, per_model=4):
+    """
+    (parallel fits, threads per fit) for a total of n_jobs threads (-1 = the
+    CPUs this process may use), so that fits x threads never exceeds the cores.
+    per_model=None gives one fit all of them (final refits).
+    """
+    if n_jobs is None or n_jobs < 1:
+        from app.server import cpu_quota
+        n_jobs = max(1, int(cpu_quota()))
+    inner = n_jobs if per_model is None else max(1, min(per_model, n_jobs))
+    return max(1, n_jobs // inner), inner
+
+
+def strip_prefix(params, prefix="clf__"):
+    return {k[len(prefix):] if k.startswith(prefix) else k: v for k, v in params.items()}
+
+
+def _fit_score(estimator, params, fold):
+    X_tr, y_tr, X_val, y_val = fold
+    model = clone(estimator).set_params(**params)
+    model.fit(X_tr, y_tr)
+    return roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])
+
+
+def cached_search(estimator, param_distributions, fold_cache, n_iter, n_jobs=-1, random_state=None,
+                  verbose=True):
+    """
+    Random search over clf__* params on a FoldCache. Trials x folds run on a
+    thread pool (XGBoost releases the GIL while boosting, and threads share the
+    cached matrices without copying them). Returns a dict like
+    RandomizedSearchCV's best_params_ / best_score_ / cv_results_.
+    """
+    candidates = list(ParameterSampler(param_distributions, n_iter=n_iter, random_state=random_state))
+    tasks = [(i, f) for i in range(len(candidates)) for f in range(len(fold_cache))]
+
+    t0 = time.perf_counter()
+    scores = Parallel(n_jobs=n_jobs, prefer="threads", verbose=10 if verbose else 0)(
+        delayed(_fit_score)(estimator, strip_prefix(candidates[i]), fold_cache.folds[f]) for i, f in tasks)
+
+    per_trial = np.zeros((len(candidates), len(fold_cache)))
+    for (i, f), s in zip(tasks, scores):
+        per_trial[i, f] = s
+    mean = per_trial.mean(axis=1)
+    best = int(np.argmax(mean))
+    return {
+        "best_params": candidates[best],
+        "best_score": float(mean[best]),
+        "cv_results": {
+            "params": candidates,
+            "mean_test_score": mean.tolist(),
+            "std_test_score": per_trial.std(axis=1).tolist(),
+        },
+        "trials": len(candidates),
+        "fits": len(tasks),
+        "budget_rounds": int(sum(strip_prefix(c).get("n_estimators", estimator.n_estimators or 100)
+                                 for c in candidates) * len(fold_cache)),
+        "boost_seconds": time.perf_counter() - t0,
+        "preprocess_seconds": fold_cache.seconds,
+    }
+
+
+# ----------------------------------------------------------------------
+# SUCCESSIVE HALVING
+# ----------------------------------------------------------------------
+
+def _fit_score_es(estimator, params, fold, es_set, rounds, early_stopping_rounds):
+    X_tr, y_tr, X_val, y_val = fold
+    model = clone(estimator).set_params(**params, n_estimators=rounds,
+                                        early_stopping_rounds=early_stopping_rounds)
+    # stop on the holdout from the training rows; the validation fold only scores
+    model.fit(X_tr, y_tr, eval_set=[es_set], verbose=False)
+    score = roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])  # uses the best iteration
+    best_iteration = getattr(model, "best_iteration", None)
+    best_iteration = rounds - 1 if best_iteration is None else best_iteration
+    return score, best_iteration, model.get_booster().num_boosted_rounds()
+
+
+def halving_search(estimator, param_distributions, fold_cache, n_candidates, factor=3, max_rounds=600,
+                   early_stopping_rounds=30, n_jobs=1, random_state=None, resource="clf__n_estimators",
+                   verbose=True):
+    """
+    Successive halving over boosting rounds on a FoldCache.
+
+    `resource` is removed from the search space and becomes the budget: rung k
+    trains the surviving candidates for max_rounds / factor**(last - k) rounds
+    on every fold, early-stopping on the fold's holdout (fold_cache must be
+    built with es_fraction), and keeps the best 1/factor by mean validation
+    AUC. The winner's n_estimators is its mean best iteration over the folds
+    of the last rung. Returns the same keys as
+    cached_search() plus "rungs" and "budget_rounds" (rounds actually boosted).
+    """
+    space = {k: v for k, v in param_distributions.items() if k != resource}
+    candidates = list(ParameterSampler(space, n_iter=n_candidates, random_state=random_state))
+    n_rungs = 1  # enough rungs to go from len(candidates) down to one
+    while factor ** n_rungs <= len(candidates):
+        n_rungs += 1
+    folds = fold_cache.folds
+    if len(fold_cache.early_stopping) != len(folds):
+        raise ValueError("halving_search needs a FoldCache built with es_fraction > 0 "
+                         "(early stopping must not see the validation fold)")
+    es_sets = fold_cache.early_stopping
+
+    rungs = []
+    alive = list(range(len(candidates)))
+    budget = 0
+    t0 = time.perf_counter()
+    for k in range(n_rungs):
+        rounds = max(1, int(round(max_rounds / factor ** (n_rungs - 1 - k))))
+        t = time.perf_counter()
+        tasks = [(i, f) for i in alive for f in range(len(folds))]
+        out = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(_fit_score_es)(estimator, strip_prefix(candidates[i]), folds[f], es_sets[f], rounds,
+                                   early_stopping_rounds)
+            for i, f in tasks)
+
+        scores, iters = {}, {}
+        for (i, _), (score, best_it, boosted) in zip(tasks, out):
+            scores.setdefault(i, []).append(score)
+            iters.setdefault(i, []).append(best_it)
+            budget += boosted
+        ranked = sorted(alive, key=lambda i: np.mean(scores[i]), reverse=True)
+        keep = max(1, math.ceil(len(alive) / factor)) if k < n_rungs - 1 else 1
+        rungs.append({
+            "candidates": len(alive),
+            "rounds": rounds,
+            "fits": len(tasks),
+            "best_score": float(np.mean(scores[ranked[0]])),
+            "seconds": round(time.perf_counter() - t, 2),
+        })
+        if verbose:
+            print(f"[halving] rung {k}: {len(alive)} candidates x {len(folds)} folds at {rounds} rounds, "
+                  f"best AUC {rungs[-1]['best_score']:.4f} ({rungs[-1]['seconds']}s)")
+        alive = ranked[:keep]
+
+    best = alive[0]
+    best_params = dict(candidates[best])
+    best_params[resource] = int(round(np.mean(iters[best]))) + 1
+    return {
+        "best_params": best_params,
+        "best_score": float(np.mean(scores[best])),
+        "trials": len(candidates),
+        "fits": sum(r["fits"] for r in rungs),
+        "budget_rounds": int(budget),
+        "rungs": rungs,
+        "boost_seconds": time.perf_counter() - t0,
+        "preprocess_seconds": fold_cache.seconds,
+    }
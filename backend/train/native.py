@@ -0,0 +1,144 @@
+# backend/train/native.py
+#
+# Native XGBoost training on QuantileDMatrix.
+#
+# XGBClassifier.fit builds a fresh DMatrix from the (sparse, float32) input
+# on every call: the matrix is copied and re-quantised into histogram bins
+# for each trial x fold. DMatrixFolds quantises each FoldCache split once
+# (QuantileDMatrix with an explicit max_bin, validation bins taken from the
+# training split via ref=) and native_search() trains xgb.train boosters on
+# them with tree_method="hist" and a fixed nthread per fit. fit_native()
+# refits the winner the same way and returns the usual fitted
+# ('pre', ['smote',] 'clf') pipeline, with the booster loaded into an
+# XGBClassifier, so app/ml.py and export_compiled_model.py load it unchanged.
+
+import time
+
+import numpy as np
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler
+
+from train.folds import _float32, strip_prefix
+
+MAX_BIN = 256
+
+# XGBClassifier arguments that are not booster parameters
+_SKLEARN_ONLY = {"n_estimators", "n_jobs", "random_state", "early_stopping_rounds", "callbacks",
+                 "importance_type", "missing", "enable_categorical", "feature_types", "feature_weights",
+                 "max_cat_to_onehot", "multi_strategy", "device", "verbosity", "validate_parameters"}
+
+
+def booster_params(estimator, params, max_bin=MAX_BIN, nthread=1):
+    """
+    (xgb.train params, num_boost_round) for `estimator` (an XGBClassifier)
+    with `params` (clf__-stripped) applied on top.
+    """
+    merged = {k: v for k, v in estimator.get_params().items() if v is not None}
+    merged.update(params)
+    rounds = int(merged.get("n_estimators", 100))
+    out = {k: v for k, v in merged.items() if k not in _SKLEARN_ONLY}
+    out.update(objective=merged.get("objective") or "binary:logistic", tree_method="hist",
+               max_bin=int(max_bin), nthread=int(nthread))
+    if "random_state" in merged:
+        out["seed"] = int(merged["random_state"])
+    return out, rounds
+
+
+def quantise_fold(fold, max_bin=MAX_BIN, nthread=1):
+    """(train QuantileDMatrix, validation QuantileDMatrix, y_val) for a prepare_fold() split."""
+    X_tr, y_tr, X_val, y_val = fold
+    dtrain = xgb.QuantileDMatrix(X_tr, y_tr, max_bin=max_bin, nthread=nthread)
+    dval = xgb.QuantileDMatrix(X_val, y_val, ref=dtrain, max_bin=max_bin, nthread=nthread)
+    return dtrain, dval, np.asarray(y_val)
+
+
+class DMatrixFolds:
+    """
+    A QuantileDMatrix (train) and a QuantileDMatrix sharing its bins
+    (validation) per FoldCache split, built once for the whole search.
+    """
+
+    def __init__(self, fold_cache, max_bin=MAX_BIN, nthread=1):
+        self.max_bin = max_bin
+        self.folds = []
+        t0 = time.perf_counter()
+        for fold in fold_cache.folds:
+            self.folds.append(quantise_fold(fold, max_bin, nthread))
+        self.seconds = fold_cache.seconds + time.perf_counter() - t0
+        print(f"[native] Quantised {len(self.folds)} folds (max_bin={max_bin}) "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+    def __len__(self):
+        return len(self.folds)
+
+
+def _train_score(params, rounds, fold):
+    dtrain, dval, y_val = fold
+    booster = xgb.train(params, dtrain, num_boost_round=rounds)
+    return roc_auc_score(y_val, booster.predict(dval))
+
+
+def native_search(estimator, param_distributions, dmatrix_folds, n_iter, n_jobs=1, xgb_threads=1,
+                  random_state=None, verbose=True):
+    """
+    Random search over clf__* params on DMatrixFolds; samples the same
+    candidates as cached_search() for the same random_state and returns the
+    same keys. n_jobs fits run at once, each with xgb_threads threads.
+    """
+    candidates = list(ParameterSampler(param_distributions, n_iter=n_iter, random_state=random_state))
+    configs = [booster_params(estimator, strip_prefix(c), dmatrix_folds.max_bin, xgb_threads)
+               for c in candidates]
+    tasks = [(i, f) for i in range(len(candidates)) for f in range(len(dmatrix_folds))]
+
+    t0 = time.perf_counter()
+    scores = Parallel(n_jobs=n_jobs, prefer="threads", verbose=10 if verbose else 0)(
+        delayed(_train_score)(*configs[i], dmatrix_folds.folds[f]) for i, f in tasks)
+
+    per_trial = np.zeros((len(candidates), len(dmatrix_folds)))
+    for (i, f), s in zip(tasks, scores):
+        per_trial[i, f] = s
+    mean = per_trial.mean(axis=1)
+    best = int(np.argmax(mean))
+    return {
+        "best_params": candidates[best],
+        "best_score": float(mean[best]),
+        "cv_results": {
+            "params": candidates,
+            "mean_test_score": mean.tolist(),
+            "std_test_score": per_trial.std(axis=1).tolist(),
+        },
+        "trials": len(candidates),
+        "fits": len(tasks),
+        "budget_rounds": int(sum(rounds for _, rounds in configs) * len(dmatrix_folds)),
+        "boost_seconds": time.perf_counter() - t0,
+        "preprocess_seconds": dmatrix_folds.seconds,
+    }
+
+
+def fit_native(pipeline, X, y, params=None, max_bin=MAX_BIN, nthread=1):
+    """
+    Fit an unfitted ('pre', ['smote',] 'clf') pipeline with the booster
+    trained by xgb.train on a QuantileDMatrix. `params` are clf__* params as
+    returned by the searches. The result predicts like pipeline.fit(X, y)
+    would and pickles as the same pipeline class.
+    """
+    model = clone(pipeline)
+    if params:
+        model.set_params(**params)
+    steps = model.named_steps
+    y = np.asarray(y)
+
+    Xt = steps["pre"].fit_transform(X, y)
+    if "smote" in steps:
+        Xt, y = steps["smote"].fit_resample(Xt, y)
+    dtrain = xgb.QuantileDMatrix(_float32(Xt), y, max_bin=max_bin, nthread=nthread)
+    config, rounds = booster_params(steps["clf"], {}, max_bin, nthread)
+    booster = xgb.train(config, dtrain, num_boost_round=rounds)
+
+    clf = steps["clf"]
+    clf.set_params(tree_method="hist", max_bin=max_bin, n_jobs=nthread)
+    clf.load_model(bytearray(booster.save_raw("ubj")))
+    return model
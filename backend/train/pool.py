@@ -0,0 +1,100 @@
+# backend/train/pool.py
+#
+# Random search with the CV folds spread over a process pool.
+#
+# cached_search() and native_search() run every (trial, fold) fit on threads
+# of one process, over matrices prepared up front by the parent. On a build
+# node with many cores the parent's preprocessing (ColumnTransformer + SMOTE,
+# mostly single-threaded) and the GIL-bound parts of each fit become the
+# bottleneck. fold_pool_search() gives each fold its own worker process:
+# the worker preprocesses its split, then scores every candidate on it. The
+# thread budget is split between workers, and inside a worker between
+# parallel fits and XGBoost threads, so fits x threads never exceeds it.
+
+import time
+
+import numpy as np
+from joblib import Parallel, delayed, parallel_config
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler
+
+from train.folds import _fit_score, prepare_fold, strip_prefix, thread_budget
+
+
+def worker_budget(n_splits, n_jobs=-1, xgb_threads=4):
+    """
+    (workers, parallel fits per worker, XGBoost threads per fit) for n_jobs
+    threads in total (-1 = the CPUs this process may use).
+    """
+    _, total = thread_budget(n_jobs, per_model=None)
+    workers = max(1, min(n_splits, total))
+    inner, threads = thread_budget(max(1, total // workers), xgb_threads)
+    return workers, inner, threads
+
+
+def _search_fold(estimator, candidates, pre, sampler, X_tr, y_tr, X_val, y_val, inner, threads,
+                 native, max_bin):
+    t0 = time.perf_counter()
+    fold = prepare_fold(pre, sampler, X_tr, y_tr, X_val, y_val)
+    if native:
+        from train.native import _train_score, booster_params, quantise_fold
+        fold = quantise_fold(fold, max_bin, inner * threads)
+        configs = [booster_params(estimator, strip_prefix(c), max_bin, threads) for c in candidates]
+        tasks = [delayed(_train_score)(params, rounds, fold) for params, rounds in configs]
+    else:
+        estimator = clone(estimator).set_params(n_jobs=threads)
+        tasks = [delayed(_fit_score)(estimator, strip_prefix(c), fold) for c in candidates]
+    prep = time.perf_counter() - t0
+    scores = Parallel(n_jobs=inner, prefer="threads")(tasks)
+    return scores, prep, time.perf_counter() - t0 - prep
+
+
+def fold_pool_search(estimator, param_distributions, pre, X, y, cv, n_iter, sampler=None, n_jobs=-1,
+                     xgb_threads=4, random_state=None, native=False, max_bin=256, verbose=True):
+    """
+    Random search over clf__* params with one worker process per CV fold.
+    Samples the same candidates as cached_search() / native_search() for the
+    same random_state and returns the same keys, plus "workers" and the
+    per-worker "parallel_fits" x "xgb_threads". `native`
+    trains with xgb.train on a per-fold QuantileDMatrix (train/native.py).
+    """
+    candidates = list(ParameterSampler(param_distributions, n_iter=n_iter, random_state=random_state))
+    y = np.asarray(y)
+    splits = list(cv.split(X, y))
+    workers, inner, threads = worker_budget(len(splits), n_jobs, xgb_threads)
+    if verbose:
+        print(f"[pool] {len(splits)} folds on {workers} worker processes, "
+              f"{inner} parallel fits x {threads} XGBoost threads each")
+
+    t0 = time.perf_counter()
+    # inner_max_num_threads caps OpenMP/BLAS pools in the workers to their share
+    with parallel_config(backend="loky", inner_max_num_threads=inner * threads):
+        out = Parallel(n_jobs=workers, verbose=10 if verbose else 0)(
+            delayed(_search_fold)(estimator, candidates, pre, sampler, X.iloc[tr], y[tr], X.iloc[va], y[va],
+                                  inner, threads, native, max_bin)
+            for tr, va in splits)
+
+    wall = time.perf_counter() - t0
+    prep = max(p for _, p, _ in out)  # folds are prepared concurrently
+    per_trial = np.array([scores for scores, _, _ in out]).T
+    mean = per_trial.mean(axis=1)
+    best = int(np.argmax(mean))
+    default_rounds = estimator.n_estimators or 100
+    return {
+        "best_params": candidates[best],
+        "best_score": float(mean[best]),
+        "cv_results": {
+            "params": candidates,
+            "mean_test_score": mean.tolist(),
+            "std_test_score": per_trial.std(axis=1).tolist(),
+        },
+        "trials": len(candidates),
+        "fits": len(candidates) * len(splits),
+        "budget_rounds": int(sum(strip_prefix(c).get("n_estimators", default_rounds)
+                                 for c in candidates) * len(splits)),
+        "workers": workers,
+        "parallel_fits": inner,  # per worker
+        "xgb_threads": threads,
+        "boost_seconds": wall - prep,
+        "preprocess_seconds": prep,
+    }
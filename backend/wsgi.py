@@ -0,0 +1,17 @@
+# backend/wsgi.py
+#
+# WSGI entry point for gunicorn (see gunicorn.conf.py):
+#
+#     gunicorn -c gunicorn.conf.py wsgi:app
+#
+# With preload_app this module is imported once in the master: the app is
+# created (indexes ensured on a MongoClient that is closed again) and the model
+# loaded and warmed before any worker is forked. No Mongo connection survives
+# into the workers: each opens its own client, and starts its background
+# threads and hashing pool, in gunicorn.conf.py's post_worker_init hook.
+
+from app import create_app
+from app.server import warmup
+
+app = create_app(start_background=False, prefork=True)
+warmup(app)
@@ -24,7 +24,7 @@ export default function AdminDashboard() {
   const { user } = useAuth();
   const token = user?.token;
 
-  const [apps, setApps] = useState([]);
+  const [apps, setApps] = useState([]); // applications on the current server page
   const [loading, setLoading] = useState(false);
   const [selected, setSelected] = useState(null); // selected app for modal
   const [query, setQuery] = useState("");
@@ -32,16 +32,30 @@ export default function AdminDashboard() {
   const [sortKey, setSortKey] = useState("created_at");
   const [sortDir, setSortDir] = useState("desc");
   const [page, setPage] = useState(1);
+  // cursors[i] fetches page i + 1; the server hands out next_cursor for the following page
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [reloadKey, setReloadKey] = useState(0);
+  const [stats, setStats] = useState(null); // server-side aggregates (/api/admin/loan/stats)
   const perPage = 8;
 
+  function buildListPath(cursor) {
+    const params = new URLSearchParams({ limit: String(perPage) });
+    if (statusFilter !== "ALL") params.set("status", statusFilter);
+    if (cursor) params.set("cursor", cursor);
+    return `/api/admin/loan/applications?${params.toString()}`;
+  }
+
   useEffect(() => {
     let mounted = true;
     (async function load() {
       setLoading(true);
       try {
-        // original used /api/admin/loan/applications — keep that path
-        const res = await apiFetch("/api/admin/loan/applications", { method: "GET", token });
-        if (mounted) setApps(Array.isArray(res) ? res : []);
+        const res = await apiFetch(buildListPath(cursors[page - 1]), { method: "GET", token });
+        if (mounted) {
+          setApps(Array.isArray(res?.items) ? res.items : []);
+          setNextCursor(res?.next_cursor || null);
+        }
       } catch (err) {
         alert("Failed to load applications");
       } finally {
@@ -49,23 +63,55 @@ export default function AdminDashboard() {
       }
     })();
     return () => { mounted = false; };
-  }, [token]);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [token, page, statusFilter, reloadKey]);
+
+  async function loadStats() {
+    try {
+      const res = await apiFetch("/api/admin/loan/stats", { method: "GET", token });
+      setStats(res || null);
+    } catch (err) {
+      setStats(null);
+    }
+  }
+
+  useEffect(() => {
+    loadStats();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [token, reloadKey]);
+
+  function resetPaging() {
+    setCursors([null]);
+    setNextCursor(null);
+    setPage(1);
+  }
+
+  function nextPage() {
+    if (!nextCursor) return;
+    setCursors(prev => {
+      const out = prev.slice(0, page);
+      out.push(nextCursor);
+      return out;
+    });
+    setPage(p => p + 1);
+  }
 
   async function decide(id, status) {
     try {
       await apiFetch(`/api/admin/loan/applications/${id}/decision`, { method: "PATCH", body: { status }, token });
-      // optimistic refresh: update local state quickly
+      // optimistic refresh: update local state quickly (the header aggregates are
+      // cached server-side for ADMIN_STATS_TTL and catch up on the next load)
       setApps(prev => prev.map(a => (a.id === id ? { ...a, decision_status: status } : a)));
     } catch (err) {
       alert("Failed to update status");
     }
   }
 
-  // derived: filtered + sorted
+  // derived: search + sort within the current server page only. The server pages
+  // newest first by keyset cursor; the controls say so rather than imply a global search.
   const filtered = useMemo(() => {
     const q = query.trim().toLowerCase();
     let out = apps.filter(a => {
-      if (statusFilter !== "ALL" && (a.decision_status || "").toUpperCase() !== statusFilter) return false;
       if (!q) return true;
       // search across name, purpose, id
       return (
@@ -96,14 +142,10 @@ export default function AdminDashboard() {
     });
 
     return out;
-  }, [apps, query, statusFilter, sortKey, sortDir]);
+  }, [apps, query, sortKey, sortDir]);
 
-  const totalPages = Math.max(1, Math.ceil(filtered.length / perPage));
-  const rows = filtered.slice((page - 1) * perPage, page * perPage);
-
-  useEffect(() => {
-    if (page > totalPages) setPage(1);
-  }, [totalPages, page]);
+  const rows = filtered;
+  const firstIndex = (page - 1) * perPage;
 
   function openDetails(app) {
     setSelected(app);
@@ -117,18 +159,24 @@ export default function AdminDashboard() {
       <div className="adm-header">
         <h1>Admin Dashboard</h1>
         <div className="adm-controls">
-          <div className="stats">
+          <div className="stats" title={stats ? `As of ${stats.generated_at} UTC` : undefined}>
             <div className="stat">
               <div className="stat-title">Total Apps</div>
-              <div className="stat-value">{apps.length}</div>
+              <div className="stat-value">{stats ? stats.total : "—"}</div>
             </div>
             <div className="stat">
               <div className="stat-title">Pending</div>
-              <div className="stat-value">{apps.filter(a => (a.decision_status || "").toUpperCase() === "PENDING").length}</div>
+              <div className="stat-value">{stats ? (stats.by_status.PENDING || 0) : "—"}</div>
             </div>
             <div className="stat">
               <div className="stat-title">Approved</div>
-              <div className="stat-value">{apps.filter(a => (a.decision_status || "").toUpperCase() === "APPROVED").length}</div>
+              <div className="stat-value">{stats ? (stats.by_status.APPROVED || 0) : "—"}</div>
+            </div>
+            <div className="stat">
+              <div className="stat-title">Approval Rate</div>
+              <div className="stat-value">
+                {stats && stats.approval_rate != null ? `${(stats.approval_rate * 100).toFixed(1)}%` : "—"}
+              </div>
             </div>
           </div>
         </div>
@@ -138,46 +186,41 @@ export default function AdminDashboard() {
         <div className="filter-left">
           <input
             className="search"
-            placeholder="Search by name, purpose or id..."
+            placeholder="Search this page by name, purpose or id..."
+            title="Filters the applications on the current page only"
             value={query}
-            onChange={(e) => { setQuery(e.target.value); setPage(1); }}
+            onChange={(e) => setQuery(e.target.value)}
           />
 
-          <select value={statusFilter} onChange={e => { setStatusFilter(e.target.value); setPage(1); }}>
+          <select value={statusFilter} onChange={e => { setStatusFilter(e.target.value); resetPaging(); }}>
             <option value="ALL">All statuses</option>
             <option value="PENDING">Pending</option>
             <option value="APPROVED">Approved</option>
             <option value="REJECTED">Rejected</option>
           </select>
 
-          <select value={sortKey} onChange={e => setSortKey(e.target.value)}>
-            <option value="created_at">Date</option>
-            <option value="monthly_income">Income</option>
-            <option value="loan_amount">Loan Amount</option>
-            <option value="ml_score">ML Score</option>
+          <select
+            value={sortKey}
+            onChange={e => setSortKey(e.target.value)}
+            title="Sorts the current page only; pages are always newest first"
+          >
+            <option value="created_at">Page by date</option>
+            <option value="monthly_income">Page by income</option>
+            <option value="loan_amount">Page by loan amount</option>
+            <option value="ml_score">Page by ML score</option>
           </select>
 
           <button
             className="btn small"
             onClick={() => setSortDir(prev => (prev === "asc" ? "desc" : "asc"))}
-            title="Toggle sort direction"
+            title="Toggle sort direction within the current page"
           >
-            Sort: {sortDir.toUpperCase()}
+            Sort page: {sortDir.toUpperCase()}
           </button>
         </div>
 
         <div className="filter-right">
-          <button className="btn" onClick={async () => {
-            setLoading(true);
-            try {
-              const res = await apiFetch("/api/admin/loan/applications", { method: "GET", token });
-              setApps(Array.isArray(res) ? res : []);
-            } catch {
-              alert("Failed to refresh");
-            } finally {
-              setLoading(false);
-            }
-          }}>
+          <button className="btn" onClick={() => { resetPaging(); setReloadKey(k => k + 1); }}>
             Refresh
           </button>
         </div>
@@ -245,12 +288,16 @@ export default function AdminDashboard() {
 
       <div className="pager">
         <div className="pager-left">
-          <small>Showing {(filtered.length === 0) ? 0 : ( (page-1)*perPage + 1 )} - {Math.min(page*perPage, filtered.length)} of {filtered.length}</small>
+          <small>
+            {query.trim()
+              ? `${rows.length} of ${apps.length} on this page match`
+              : `Showing ${rows.length === 0 ? 0 : firstIndex + 1} - ${firstIndex + rows.length}`}
+          </small>
         </div>
         <div className="pager-right">
-          <button className="btn small" disabled={page <= 1} onClick={() => setPage(p => p-1)}>Prev</button>
-          <span className="page-num">Page {page} / {totalPages}</span>
-          <button className="btn small" disabled={page >= totalPages} onClick={() => setPage(p => p+1)}>Next</button>
+          <button className="btn small" disabled={page <= 1 || loading} onClick={() => setPage(p => p-1)}>Prev</button>
+          <span className="page-num">Page {page}</span>
+          <button className="btn small" disabled={!nextCursor || loading} onClick={nextPage}>Next</button>
         </div>
       </div>
 
@@ -178,6 +178,37 @@ def test_prediction():
         test_result("ML prediction", False, str(e))
         return None
 
+# Test 4b: Batch ML Prediction
+def test_batch_prediction():
+    print_test("Batch ML Prediction")
+    
+    rows = [
+        {"Age": 35, "Income": 60000, "LoanAmount": 200000, "CreditScore": 650},
+        {"Age": 52, "Income": 120000, "LoanAmount": 50000, "CreditScore": 780},
+        {"Age": 23, "Income": 18000, "LoanAmount": 90000}
+    ]
+    
+    try:
+        resp = requests.post(f"{API_URL}/predict/batch", json={"rows": rows})
+        
+        if resp.status_code == 200:
+            data = resp.json()
+            print_json(data)
+            
+            results_list = data.get("results") or []
+            if data.get("count") == len(rows) and all("default_probability" in r for r in results_list):
+                test_result("Batch ML prediction", True)
+                return data
+            else:
+                test_result("Batch ML prediction", False, "Result count or fields mismatch")
+                return None
+        else:
+            test_result("Batch ML prediction", False, f"Status {resp.status_code}: {resp.text}")
+            return None
+    except Exception as e:
+        test_result("Batch ML prediction", False, str(e))
+        return None
+
 # Test 5: Loan Application Submission
 def test_loan_application(token, ml_result):
     print_test("Loan Application Submission")
@@ -355,6 +386,7 @@ def run_all_tests():
         test_login(email)
         
         ml_result = test_prediction()
+        test_batch_prediction()
         
         app_id = test_loan_application(token, ml_result)
         